@@ -1,12 +1,28 @@
 """Agent implementations for different AI providers."""
+import importlib
+
 from .base import BaseAgent, AgentResponse, Message, MessageRole, ToolCall, ToolResult
-from .claude_agent import ClaudeAgent
-from .gpt_agent import GPTAgent
-from .gemini_agent import GeminiAgent
-from .kimi_agent import KimiAgent
-from .openrouter_agent import OpenRouterAgent
 from .factory import AgentFactory, Provider, Role
 
+# Provider agents pull in their SDKs, so they are imported on first access.
+_LAZY_AGENTS = {
+    "ClaudeAgent": ".claude_agent",
+    "GPTAgent": ".gpt_agent",
+    "GeminiAgent": ".gemini_agent",
+    "KimiAgent": ".kimi_agent",
+    "OpenRouterAgent": ".openrouter_agent",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_AGENTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
     "BaseAgent",
     "AgentResponse",
@@ -0,0 +1,88 @@
+"""Shared HTTP connection pools for provider clients."""
+import asyncio
+import atexit
+import threading
+from types import ModuleType
+from typing import Any, Dict, Optional, Tuple
+
+# (SDK module name, async?) -> httpx client
+_shared_clients: Dict[Tuple[str, bool], Any] = {}
+_lock = threading.Lock()
+
+
+def _shared_pool(sdk: ModuleType, asynchronous: bool) -> Any:
+    key = (sdk.__name__, asynchronous)
+    client = _shared_clients.get(key)
+    if client is None:
+        with _lock:
+            client = _shared_clients.get(key)
+            if client is None:
+                import httpx
+                from config import get_settings
+
+                settings = get_settings()
+                factory = sdk.DefaultAsyncHttpxClient if asynchronous else sdk.DefaultHttpxClient
+                client = factory(
+                    limits=httpx.Limits(
+                        max_connections=settings.http_max_connections,
+                        max_keepalive_connections=settings.http_max_keepalive_connections,
+                    ),
+                    timeout=httpx.Timeout(settings.http_timeout),
+                )
+                _shared_clients[key] = client
+    return client
+
+
+def get_shared_http_client(sdk: ModuleType) -> Any:
+    """Return the process-wide async HTTP client for an SDK module.
+
+    Every agent built on the same SDK (Anthropic, or OpenAI and the
+    OpenAI-compatible Kimi/OpenRouter agents) shares one connection pool, so
+    keep-alive connections and TLS sessions survive across roles and workflow
+    steps instead of each SDK client opening its own. The pool is built with
+    the SDK's ``DefaultAsyncHttpxClient`` so it matches the httpx flavour the
+    SDK was built against. Like any httpx async client it is bound to the
+    event loop that first uses it, so callers should drive agents from a
+    single loop.
+    """
+    return _shared_pool(sdk, asynchronous=True)
+
+
+def get_shared_sync_http_client(sdk: ModuleType) -> Any:
+    """Return the process-wide sync HTTP client for an SDK module.
+
+    The sync counterpart of get_shared_http_client(): SDK clients for
+    different API keys or base URLs (OpenAI, Kimi, OpenRouter) still draw on
+    one keep-alive pool. httpx sync clients are thread-safe, so parallel
+    workflow steps share it too.
+    """
+    return _shared_pool(sdk, asynchronous=False)
+
+
+def close_shared_http_clients(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """Close every shared pool (registered with atexit).
+
+    Pass the event loop that has been driving the async pools, if it is
+    still open, so their connections are closed on the loop they belong to.
+    """
+    with _lock:
+        clients = list(_shared_clients.items())
+        _shared_clients.clear()
+    for (_, asynchronous), client in clients:
+        if client.is_closed:
+            continue
+        if not asynchronous:
+            client.close()
+            continue
+        try:
+            if loop is not None and not loop.is_closed():
+                loop.run_until_complete(client.aclose())
+            else:
+                asyncio.run(client.aclose())
+        except Exception:
+            # The loop that owned the connections is already gone at interpreter
+            # shutdown; the sockets are released with the process either way.
+            pass
+
+
+atexit.register(close_shared_http_clients)
@@ -0,0 +1,36 @@
+"""JSON helpers for request payloads, cache keys and tool arguments.
+
+Uses orjson when it is installed (several times faster and allocation-light)
+and falls back to the stdlib encoder with matching compact output.
+"""
+from typing import Any, Union
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError  # orjson.JSONDecodeError subclasses it
+
+
+def dumps_bytes(obj: Any, *, sort_keys: bool = False) -> bytes:
+    """Serialize *obj* to compact UTF-8 JSON; unknown types fall back to str()."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option)
+    return json.dumps(
+        obj, default=str, sort_keys=sort_keys, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps(obj: Any, *, sort_keys: bool = False) -> str:
+    return dumps_bytes(obj, sort_keys=sort_keys).decode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,42 @@
+"""Rolling per-model request latencies, used to time hedged requests."""
+from collections import deque
+from statistics import median
+from typing import Deque, Dict, Optional, Tuple
+import threading
+
+WINDOW_SIZE = 50
+MIN_SAMPLES = 5
+
+LatencyKey = Tuple[str, str]  # (provider, model)
+
+
+class LatencyTracker:
+    """Keep the last WINDOW_SIZE request latencies per (provider, model)."""
+
+    def __init__(self, window: int = WINDOW_SIZE, min_samples: int = MIN_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[LatencyKey, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: LatencyKey, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def p50(self, key: LatencyKey) -> Optional[float]:
+        """Median latency, or None until enough requests have been seen."""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            return median(samples)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+latency_tracker = LatencyTracker()
@@ -1,13 +1,19 @@
 """Base agent classes and tool-calling infrastructure."""
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Callable, Generator, Tuple, Union
 from enum import Enum
 from datetime import datetime
+import asyncio
+import hashlib
 import json
 import logging
+import random
+import threading
 import time
 
+from . import _json
+
 logger = logging.getLogger(__name__)
 
 MAX_TOOL_CALL_ITERATIONS = 25
@@ -15,6 +21,56 @@ MAX_TOOL_RESULT_CHARS = 4000
 DEFAULT_REQUEST_TIMEOUT = 300  # 5 minutes per LLM call
 DEFAULT_RETRY_ATTEMPTS = 3
 DEFAULT_RETRY_BASE_DELAY = 8.0
+# Timeouts, dropped connections and 5xx clear up quickly; retry them sooner
+TRANSIENT_RETRY_BASE_DELAY = 0.25
+TRANSIENT_RETRY_JITTER = 0.1
+# Message.metadata key holding (provider name, converted request entry)
+PROVIDER_ENTRY_KEY = "provider_entry"
+
+
+# Provider SDK clients shared by every agent in the process, keyed by their
+# constructor configuration. Building a client allocates an HTTP pool, so
+# agents for different roles (and repeated workflow steps) reuse them. Keys
+# are digests so API keys are not kept in plaintext in the cache.
+_CLIENT_CACHE: Dict[str, Any] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+
+def shared_client(factory: Callable[..., Any], **kwargs: Any) -> Any:
+    """Return a process-wide client built by ``factory(**kwargs)``.
+
+    Identical factory/kwargs pairs (same API key, base URL, headers, ...)
+    return the same instance.
+    """
+    config = json.dumps(
+        [f"{factory.__module__}.{factory.__qualname__}", kwargs],
+        sort_keys=True,
+        default=repr,
+    )
+    key = hashlib.sha256(config.encode("utf-8")).hexdigest()
+    client = _CLIENT_CACHE.get(key)
+    if client is None:
+        with _CLIENT_CACHE_LOCK:
+            client = _CLIENT_CACHE.get(key)
+            if client is None:
+                client = factory(**kwargs)
+                _CLIENT_CACHE[key] = client
+    return client
+
+
+def clear_client_cache() -> None:
+    """Drop all cached provider clients (e.g. after API keys change)."""
+    with _CLIENT_CACHE_LOCK:
+        _CLIENT_CACHE.clear()
+
+
+def _drain(gen: Generator[Any, None, Any]) -> Any:
+    """Exhaust *gen* and return its return value."""
+    while True:
+        try:
+            next(gen)
+        except StopIteration as stop:
+            return stop.value
 
 
 class MessageRole(Enum):
@@ -50,16 +106,22 @@ class ToolResult:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     role: MessageRole
     content: Union[str, List[Dict[str, Any]]]
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    # None until something is stored; most messages never carry metadata
+    metadata: Optional[Dict[str, Any]] = None
     tool_calls: Optional[List[ToolCall]] = None
     tool_result: Optional[ToolResult] = None
+    # role.value, resolved once; provider converters compare plain strings
+    role_str: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.role_str = self.role.value
 
     def to_dict(self) -> Dict[str, Any]:
-        d: Dict[str, Any] = {"role": self.role.value, "content": self.content}
+        d: Dict[str, Any] = {"role": self.role_str, "content": self.content}
         if self.tool_calls:
             d["tool_calls"] = [tc.to_dict() for tc in self.tool_calls]
         if self.tool_result:
@@ -67,7 +129,7 @@ class Message:
         return d
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentResponse:
     content: str
     model: str
@@ -75,9 +137,14 @@ class AgentResponse:
     usage: Dict[str, int] = field(default_factory=dict)
     finish_reason: Optional[str] = None
     raw_response: Optional[Any] = None
-    timestamp: datetime = field(default_factory=datetime.now)
+    # Epoch seconds; the datetime is only built if someone reads .timestamp
+    created_at: float = field(default_factory=time.time)
     tool_calls_made: List[ToolCall] = field(default_factory=list)
 
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.created_at)
+
     @property
     def total_tokens(self) -> int:
         return self.usage.get("total_tokens", 0)
@@ -87,6 +154,12 @@ class AgentResponse:
 
 
 class BaseAgent(ABC):
+    # Whether two identical requests may run at once (see _send_request_hedged)
+    supports_hedging = True
+    # Whether the system prompt is stable enough to mark for provider-side
+    # prompt caching (set from RoleConfig.cacheable by the factory)
+    prompt_caching = True
+
     def __init__(
         self,
         model: str,
@@ -110,7 +183,12 @@ class BaseAgent(ABC):
         self.tool_registry = tool_registry  # core.tool_registry.ToolRegistry
         self.conversation_history: List[Message] = []
         self._client = None
+        self._async_client = None
         self.max_tool_result_chars = MAX_TOOL_RESULT_CHARS
+        # Per-agent opt-out of the response cache (e.g. `clai --no-cache`)
+        self.use_response_cache = True
+        # (prompt, estimated tokens) so the system prompt is only encoded once
+        self._system_prompt_tokens: Tuple[Optional[str], int] = (None, 0)
 
     @staticmethod
     def _truncate_text(text: str, max_chars: int) -> str:
@@ -136,22 +214,62 @@ class BaseAgent(ABC):
             or "resourceexhausted" in name
         )
 
+    @staticmethod
+    def _is_transient_error(exc: Exception) -> bool:
+        """Check if an exception is a timeout, dropped connection or 5xx."""
+        msg = str(exc).lower()
+        name = type(exc).__name__.lower()
+        return (
+            "timeout" in name
+            or "connection" in name
+            or "internalserver" in name
+            or "serviceunavailable" in name
+            or "deadlineexceeded" in name
+            or "server_error" in msg
+            or "overloaded" in msg
+            or any(code in msg for code in ("500", "502", "503", "504", "529"))
+        )
+
+    def _retry_delay(self, exc: Exception, attempt: int, base_delay: float) -> Optional[float]:
+        """Seconds to wait before retrying after *exc*, or None to give up."""
+        if self._is_rate_limit_error(exc):
+            return base_delay * (2 ** attempt)
+        if self._is_transient_error(exc):
+            return TRANSIENT_RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, TRANSIENT_RETRY_JITTER)
+        return None
+
     def _retry_request(self, fn, *, attempts: int = DEFAULT_RETRY_ATTEMPTS, base_delay: float = DEFAULT_RETRY_BASE_DELAY):
-        """Call fn() with exponential-backoff retries on rate-limit errors."""
+        """Call fn() with exponential-backoff retries on rate-limit and transient errors."""
         for attempt in range(attempts):
             try:
                 return fn()
             except Exception as exc:
-                if not self._is_rate_limit_error(exc) or attempt >= (attempts - 1):
+                delay = self._retry_delay(exc, attempt, base_delay)
+                if delay is None or attempt >= (attempts - 1):
                     raise
-                delay = base_delay * (2 ** attempt)
                 logger.warning(
-                    "%s rate-limited (attempt %d/%d), retrying in %.1fs",
-                    self.provider_name, attempt + 1, attempts, delay,
+                    "%s request failed (attempt %d/%d: %s), retrying in %.1fs",
+                    self.provider_name, attempt + 1, attempts, type(exc).__name__, delay,
                 )
                 time.sleep(delay)
         raise RuntimeError(f"{self.provider_name} request failed after {attempts} retries.")
 
+    async def _retry_request_async(self, fn, *, attempts: int = DEFAULT_RETRY_ATTEMPTS, base_delay: float = DEFAULT_RETRY_BASE_DELAY):
+        """Await fn() with exponential-backoff retries on rate-limit and transient errors."""
+        for attempt in range(attempts):
+            try:
+                return await fn()
+            except Exception as exc:
+                delay = self._retry_delay(exc, attempt, base_delay)
+                if delay is None or attempt >= (attempts - 1):
+                    raise
+                logger.warning(
+                    "%s request failed (attempt %d/%d: %s), retrying in %.1fs",
+                    self.provider_name, attempt + 1, attempts, type(exc).__name__, delay,
+                )
+                await asyncio.sleep(delay)
+        raise RuntimeError(f"{self.provider_name} request failed after {attempts} retries.")
+
     @property
     @abstractmethod
     def provider_name(self) -> str:
@@ -166,6 +284,102 @@ class BaseAgent(ABC):
         """Send a single request (no tool loop). Provider-specific."""
         pass
 
+    def _stream_request(self, messages: List[Message]) -> Generator[str, None, AgentResponse]:
+        """Stream a single request, yielding text; returns the full response.
+
+        Default for providers without streaming support: one chunk.
+        """
+        response = self._send_request(messages)
+        if response.content:
+            yield response.content
+        return response
+
+    def _initialize_async_client(self) -> None:
+        """Create the provider's async client.
+
+        Providers without a native async SDK keep the sync client and let
+        _send_request_async run it in a worker thread.
+        """
+        if self._client is None:
+            self._initialize_client()
+
+    async def _send_request_async(self, messages: List[Message]) -> AgentResponse:
+        """Async counterpart of _send_request. Defaults to a worker thread."""
+        return await asyncio.to_thread(self._send_request, messages)
+
+    async def _send_request_hedged(self, messages: List[Message]) -> AgentResponse:
+        """_send_request_async(), optionally hedged against slow responses.
+
+        With request_hedging_enabled, a second identical request is fired
+        once the first has run longer than this model's median latency; the
+        first successful reply wins and the other is cancelled. This trades
+        extra tokens for a shorter latency tail.
+        """
+        from config import get_settings
+        from ._latency import latency_tracker
+
+        if not (self.supports_hedging and get_settings().request_hedging_enabled):
+            return await self._send_request_async(messages)
+
+        key = (self.provider_name, self.model)
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self._send_request_async(messages))
+        hedge_after = latency_tracker.p50(key)
+        if hedge_after is not None:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+            pending = set() if done else {primary, asyncio.ensure_future(self._send_request_async(messages))}
+            if pending:
+                logger.info("%s/%s slower than p50 (%.1fs), hedging request", *key, hedge_after)
+        else:
+            pending = {primary}
+
+        if not pending:
+            response = primary.result()
+        else:
+            error: Optional[BaseException] = None
+            response = None
+            while pending and response is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        response = task.result()
+                        break
+                    error = task.exception()
+            for task in pending:
+                task.cancel()
+            if response is None:
+                raise error
+
+        latency_tracker.record(key, time.perf_counter() - started)
+        return response
+
+    def _convert_messages(
+        self, messages: List[Message], convert: Callable[[Message], Any]
+    ) -> List[Any]:
+        """Convert *messages* to provider format, converting each Message once.
+
+        The entry is memoized in the Message's metadata under this provider's
+        name, so history carried from turn to turn is reused wherever it sits
+        in the list (e.g. after _fit_context drops the oldest messages).
+        Entries for which *convert* returns None (e.g. system messages) are
+        dropped.
+        """
+        provider = self.provider_name
+        out = []
+        for msg in messages:
+            metadata = msg.metadata
+            if metadata is None:
+                metadata = msg.metadata = {}
+            cached = metadata.get(PROVIDER_ENTRY_KEY)
+            if cached is not None and cached[0] == provider:
+                entry = cached[1]
+            else:
+                entry = convert(msg)
+                metadata[PROVIDER_ENTRY_KEY] = (provider, entry)
+            if entry is not None:
+                out.append(entry)
+        return out
+
     def _execute_tool(self, tool_call: ToolCall) -> ToolResult:
         """Execute a tool call via the registry and return the result."""
         if not self.tool_registry:
@@ -188,16 +402,103 @@ class BaseAgent(ABC):
                 is_error=True,
             )
 
+    async def achat(self, user_message: str, include_history: bool = True) -> AgentResponse:
+        """Async version of chat() — same tool loop, non-blocking provider calls."""
+        messages = self._history_for_request(include_history)
+        user_msg = Message(role=MessageRole.USER, content=user_message)
+        messages.append(user_msg)
+        messages = self._fit_context(messages)
+
+        cache_key, cached = self._cached_response(messages)
+        if cached is not None:
+            self._record_turn(user_msg, cached)
+            return cached
+
+        if self._async_client is None:
+            self._initialize_async_client()
+
+        all_tool_calls: List[ToolCall] = []
+        response = await self._send_request_hedged(messages)
+
+        iterations = 0
+        while (
+            response.finish_reason in ("tool_use", "tool_calls", "function_call")
+            and self.tool_registry
+            and iterations < MAX_TOOL_CALL_ITERATIONS
+        ):
+            iterations += 1
+            if not response.tool_calls_made:
+                break
+
+            all_tool_calls.extend(response.tool_calls_made)
+
+            if logger.isEnabledFor(logging.INFO):
+                for tc in response.tool_calls_made:
+                    logger.info("Tool call: %s(%s)", tc.name, _json.dumps(tc.arguments)[:200])
+
+            # Tools are blocking (filesystem, MCP, subprocess) — run them off the loop
+            tool_calls = response.tool_calls_made
+            tool_results = await asyncio.to_thread(
+                lambda: [self._execute_tool(tc) for tc in tool_calls]
+            )
+
+            for tr in tool_results:
+                logger.info("Tool result (%s): %s", tr.tool_call_id, tr.content[:200])
+
+            messages = self._append_tool_messages(messages, response, tool_results)
+            response = await self._send_request_hedged(messages)
+
+        if iterations >= MAX_TOOL_CALL_ITERATIONS:
+            logger.warning(f"Tool-call loop hit max iterations ({MAX_TOOL_CALL_ITERATIONS})")
+
+        response.tool_calls_made = all_tool_calls
+        self._store_response(cache_key, response)
+
+        self._record_turn(user_msg, response)
+        return response
+
     def chat(self, user_message: str, include_history: bool = True) -> AgentResponse:
-        if self._client is None:
-            self._initialize_client()
+        return _drain(self._run_chat(user_message, include_history, stream=False))
+
+    def stream_chat(
+        self, user_message: str, include_history: bool = True
+    ) -> Generator[str, None, AgentResponse]:
+        """Like chat(), but yields reply text as the provider streams it.
+
+        The final AgentResponse is the generator's return value, e.g.
+        ``response = yield from agent.stream_chat(prompt)``.
+        """
+        return (yield from self._run_chat(user_message, include_history, stream=True))
 
+    def _run_chat(
+        self, user_message: str, include_history: bool, stream: bool
+    ) -> Generator[str, None, AgentResponse]:
+        """Shared sync turn: cache lookup, tool loop, history update.
+
+        Only yields text when *stream* is set; chat() just drains it.
+        """
         messages = self._history_for_request(include_history)
         user_msg = Message(role=MessageRole.USER, content=user_message)
         messages.append(user_msg)
+        messages = self._fit_context(messages)
+
+        cache_key, cached = self._cached_response(messages)
+        if cached is not None:
+            if stream and cached.content:
+                yield cached.content
+            self._record_turn(user_msg, cached)
+            return cached
+
+        if self._client is None:
+            self._initialize_client()
+
+        def send(msgs: List[Message]):
+            if stream:
+                return (yield from self._stream_request(msgs))
+            return self._send_request(msgs)
 
         all_tool_calls: List[ToolCall] = []
-        response = self._send_request(messages)
+        response = yield from send(messages)
 
         # Tool-call loop: keep going while the model wants to call tools
         iterations = 0
@@ -212,31 +513,94 @@ class BaseAgent(ABC):
 
             all_tool_calls.extend(response.tool_calls_made)
 
-            for tc in response.tool_calls_made:
-                logger.info(f"Tool call: {tc.name}({json.dumps(tc.arguments, default=str)[:200]})")
+            if logger.isEnabledFor(logging.INFO):
+                for tc in response.tool_calls_made:
+                    logger.info("Tool call: %s(%s)", tc.name, _json.dumps(tc.arguments)[:200])
 
             # Execute tools and build result messages
             tool_results = [self._execute_tool(tc) for tc in response.tool_calls_made]
 
             for tr in tool_results:
-                logger.info(f"Tool result ({tr.tool_call_id}): {tr.content[:200]}")
+                logger.info("Tool result (%s): %s", tr.tool_call_id, tr.content[:200])
 
             # Append assistant + tool result messages (provider-specific formatting
             # happens in _send_request, but we store the canonical form here)
             messages = self._append_tool_messages(messages, response, tool_results)
-            response = self._send_request(messages)
+            response = yield from send(messages)
 
         if iterations >= MAX_TOOL_CALL_ITERATIONS:
             logger.warning(f"Tool-call loop hit max iterations ({MAX_TOOL_CALL_ITERATIONS})")
 
         response.tool_calls_made = all_tool_calls
+        self._store_response(cache_key, response)
 
         # Update history with the final user/assistant pair
+        self._record_turn(user_msg, response)
+        return response
+
+    def _record_turn(self, user_msg: Message, response: AgentResponse) -> None:
         self.conversation_history.append(user_msg)
         self.conversation_history.append(
             Message(role=MessageRole.ASSISTANT, content=response.content)
         )
-        return response
+
+    # ── response cache ───────────────────────────────────────────────
+
+    def _cached_response(self, messages: List[Message]):
+        """Return (cache_key, cached_response) for this exact request.
+
+        cache_key is None when the response cache is disabled in settings or
+        for this agent. Otherwise it is an opaque handle for _store_response():
+        the exact-match key plus, for single-turn requests with the semantic
+        cache on, the (scope, prompt) pair that cache matches on.
+        """
+        from config import get_settings
+
+        settings = get_settings()
+        if not (self.use_response_cache and settings.response_cache_enabled):
+            return None, None
+
+        from .cache import ResponseCache, get_response_cache
+
+        tools = self.tool_registry.list_tools() if self.tool_registry else []
+        scope = {
+            "provider": self.provider_name,
+            "model": self.model,
+            "system_prompt": self.system_prompt,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "tools": sorted(tools),
+        }
+        exact_key = ResponseCache.make_key({**scope, "messages": [m.to_dict() for m in messages]})
+        cached = get_response_cache().get(exact_key)
+
+        semantic_query = None
+        if (
+            settings.semantic_cache_enabled
+            and len(messages) == 1
+            and messages[0].role_str == "user"
+            and isinstance(messages[0].content, str)
+        ):
+            semantic_query = (ResponseCache.make_key(scope), messages[0].content)
+            if cached is None:
+                from .semantic_cache import get_semantic_cache
+
+                cached = get_semantic_cache().get(*semantic_query)
+        return (exact_key, semantic_query), cached
+
+    def _store_response(self, cache_key: Optional[tuple], response: AgentResponse) -> None:
+        # Turns that called tools had side effects (files written, issues
+        # opened, ...); replaying only their final text would skip those.
+        if cache_key is None or response.tool_calls_made:
+            return
+        from .cache import get_response_cache
+
+        exact_key, semantic_query = cache_key
+        get_response_cache().put(exact_key, response)
+        if semantic_query is not None:
+            from .semantic_cache import get_semantic_cache
+
+            get_semantic_cache().put(*semantic_query, response)
 
     def _history_for_request(self, include_history: bool) -> List[Message]:
         if not include_history:
@@ -255,6 +619,18 @@ class BaseAgent(ABC):
             max_chars=settings.cost_saver_history_char_limit,
         )
 
+    def _fit_context(self, messages: List[Message]) -> List[Message]:
+        """Trim the oldest history so the request fits max_context_tokens."""
+        from config import get_settings
+        from .tokens import count_tokens, trim_to_token_budget
+
+        if len(messages) <= 1:
+            return messages
+        if self._system_prompt_tokens[0] != self.system_prompt:
+            self._system_prompt_tokens = (self.system_prompt, count_tokens(self.system_prompt, self.model))
+        budget = get_settings().max_context_tokens - self.max_tokens - self._system_prompt_tokens[1]
+        return trim_to_token_budget(messages, max(budget, 1), self.model)
+
     def _append_tool_messages(
         self,
         messages: List[Message],
@@ -271,7 +647,6 @@ class BaseAgent(ABC):
             role=MessageRole.ASSISTANT,
             content=assistant_response.content or "",
             tool_calls=assistant_response.tool_calls_made,
-            metadata={"raw_response": assistant_response.raw_response},
         )
         messages.append(assistant_msg)
 
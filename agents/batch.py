@@ -0,0 +1,201 @@
+"""Provider batch APIs for latency-insensitive bulk requests.
+
+Anthropic Message Batches and the OpenAI Batch API accept many requests at
+once, process them asynchronously (minutes to hours) and bill them at a
+discount. BatchProcessor wraps both behind one call; providers without a
+batch endpoint fall back to concurrent regular requests.
+
+Batched requests are single-shot: no tool calls and no conversation history.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import asyncio
+import logging
+import time
+
+from . import _json
+from .base import AgentResponse, BaseAgent, Message, MessageRole
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 30.0
+DEFAULT_BATCH_TIMEOUT = 24 * 60 * 60  # both providers guarantee results within 24h
+DEFAULT_FALLBACK_CONCURRENCY = 4
+
+BatchOutcome = Union[AgentResponse, Exception]
+BatchRequest = Tuple[BaseAgent, str]  # (agent whose settings apply, prompt)
+
+
+class BatchProcessor:
+    """Run many independent prompts for one role through a provider batch API."""
+
+    def __init__(
+        self,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        timeout: float = DEFAULT_BATCH_TIMEOUT,
+        fallback_concurrency: int = DEFAULT_FALLBACK_CONCURRENCY,
+    ):
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.fallback_concurrency = fallback_concurrency
+
+    async def run_batch(self, role: Any, prompts: List[str]) -> List[BatchOutcome]:
+        """Send *prompts* to *role*'s model and return outcomes in input order.
+
+        Each outcome is an AgentResponse, or the Exception for that item
+        (same convention as ``asyncio.gather(..., return_exceptions=True)``).
+        """
+        from .factory import AgentFactory
+
+        if not prompts:
+            return []
+        agent = AgentFactory.create_by_role(role)
+        return await self.run_agent_batch(agent, prompts)
+
+    async def run_agent_batch(self, agent: BaseAgent, prompts: List[str]) -> List[BatchOutcome]:
+        """Like run_batch(), for an already configured agent."""
+        return await self.run_requests([(agent, prompt) for prompt in prompts])
+
+    async def run_requests(self, requests: Sequence[BatchRequest]) -> List[BatchOutcome]:
+        """Run (agent, prompt) pairs, one provider batch per provider.
+
+        Agents may differ in model, system prompt and sampling settings (e.g.
+        one per team role); each request is built from its own agent.
+        Outcomes come back in input order.
+        """
+        groups: Dict[str, List[int]] = {}
+        for i, (agent, _) in enumerate(requests):
+            groups.setdefault(agent.provider_name, []).append(i)
+
+        async def _run_group(provider: str, indices: List[int]) -> List[BatchOutcome]:
+            group = [requests[i] for i in indices]
+            if provider == "anthropic":
+                return await self._run_anthropic(group)
+            if provider == "openai":
+                return await self._run_openai(group)
+            return await self._run_concurrently(group)
+
+        results = await asyncio.gather(*(_run_group(p, idx) for p, idx in groups.items()))
+        outcomes: List[Optional[BatchOutcome]] = [None] * len(requests)
+        for indices, group_outcomes in zip(groups.values(), results):
+            for i, outcome in zip(indices, group_outcomes):
+                outcomes[i] = outcome
+        return outcomes
+
+    # ── Anthropic Message Batches ────────────────────────────────────
+
+    async def _run_anthropic(self, group: Sequence[BatchRequest]) -> List[BatchOutcome]:
+        first = group[0][0]
+        first._initialize_async_client()
+        client = first._async_client
+        requests = [
+            {"custom_id": f"req-{i}", "params": self._request_params(agent, prompt)}
+            for i, (agent, prompt) in enumerate(group)
+        ]
+        batch = await client.messages.batches.create(requests=requests)
+        logger.info("Submitted Anthropic batch %s (%d requests)", batch.id, len(requests))
+
+        deadline = time.monotonic() + self.timeout
+        while batch.processing_status != "ended":
+            self._check_deadline(deadline, batch.id)
+            await asyncio.sleep(self.poll_interval)
+            batch = await client.messages.batches.retrieve(batch.id)
+
+        outcomes: List[Optional[BatchOutcome]] = [None] * len(group)
+        async for entry in await client.messages.batches.results(batch.id):
+            index = self._index(entry.custom_id)
+            if entry.result.type == "succeeded":
+                outcomes[index] = group[index][0]._parse_response(entry.result.message)
+            else:
+                detail = getattr(entry.result, "error", None) or entry.result.type
+                outcomes[index] = RuntimeError(f"Batch request {entry.custom_id} {entry.result.type}: {detail}")
+        return self._fill_missing(outcomes)
+
+    # ── OpenAI Batch API ─────────────────────────────────────────────
+
+    async def _run_openai(self, group: Sequence[BatchRequest]) -> List[BatchOutcome]:
+        from openai.types.chat import ChatCompletion
+
+        first = group[0][0]
+        first._initialize_async_client()
+        client = first._async_client
+        lines = [
+            _json.dumps({
+                "custom_id": f"req-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._request_params(agent, prompt),
+            })
+            for i, (agent, prompt) in enumerate(group)
+        ]
+        input_file = await client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info("Submitted OpenAI batch %s (%d requests)", batch.id, len(lines))
+
+        deadline = time.monotonic() + self.timeout
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            self._check_deadline(deadline, batch.id)
+            await asyncio.sleep(self.poll_interval)
+            batch = await client.batches.retrieve(batch.id)
+
+        outcomes: List[Optional[BatchOutcome]] = [None] * len(group)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await client.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                entry = _json.loads(line)
+                index = self._index(entry["custom_id"])
+                response = entry.get("response") or {}
+                if entry.get("error") or response.get("status_code") != 200:
+                    detail = entry.get("error") or response.get("body")
+                    outcomes[index] = RuntimeError(f"Batch request {entry['custom_id']} failed: {detail}")
+                else:
+                    outcomes[index] = group[index][0]._parse_response(
+                        ChatCompletion.model_validate(response["body"])
+                    )
+
+        if batch.status != "completed":
+            logger.warning("OpenAI batch %s ended with status %s", batch.id, batch.status)
+        return self._fill_missing(outcomes)
+
+    # ── fallback ─────────────────────────────────────────────────────
+
+    async def _run_concurrently(self, group: Sequence[BatchRequest]) -> List[BatchOutcome]:
+        """No batch endpoint: regular requests, a few at a time."""
+        semaphore = asyncio.Semaphore(max(1, self.fallback_concurrency))
+
+        async def _one(agent: BaseAgent, prompt: str) -> AgentResponse:
+            async with semaphore:
+                return await agent.achat(prompt, include_history=False)
+
+        return await asyncio.gather(*(_one(a, p) for a, p in group), return_exceptions=True)
+
+    # ── helpers ──────────────────────────────────────────────────────
+
+    @staticmethod
+    def _request_params(agent: BaseAgent, prompt: str) -> dict:
+        return agent._build_request_params([Message(role=MessageRole.USER, content=prompt)])
+
+    @staticmethod
+    def _index(custom_id: str) -> int:
+        return int(custom_id.rsplit("-", 1)[1])
+
+    @staticmethod
+    def _fill_missing(outcomes: List[Optional[BatchOutcome]]) -> List[BatchOutcome]:
+        return [
+            outcome if outcome is not None else RuntimeError(f"Batch request req-{i} returned no result")
+            for i, outcome in enumerate(outcomes)
+        ]
+
+    def _check_deadline(self, deadline: float, batch_id: str) -> None:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Batch {batch_id} did not finish within {self.timeout:.0f}s")
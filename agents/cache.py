@@ -0,0 +1,217 @@
+"""Exact-match response cache for agent requests.
+
+Keys are a hash of the full canonical request (provider, model, system
+prompt, sampling settings, tools and every message), so a hit only ever
+happens for a byte-identical conversation prefix — never a "similar" one.
+
+The in-memory LRU can be backed by a SQLite file (RESPONSE_CACHE_PATH) so
+hits survive across CLI invocations; both tiers share the same keys.
+
+Response text is held zlib-compressed in both tiers: prose compresses
+3-4x, and inflating a hit costs microseconds next to a provider call.
+"""
+from collections import OrderedDict
+from dataclasses import replace
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import sqlite3
+import threading
+import time
+import zlib
+
+from ._json import dumps_bytes, loads
+from .base import AgentResponse
+
+# Shorter content is kept as-is; zlib's framing would eat the savings
+_COMPRESS_MIN_CHARS = 256
+
+
+class SQLiteCacheStore:
+    """On-disk second tier for ResponseCache, one row per cached response.
+
+    Rows carry an absolute expiry (wall clock, since they outlive the
+    process); expired rows are skipped on read and purged when opened.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 600.0):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, payload BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_expires_at ON responses(expires_at)")
+        self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[AgentResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM responses WHERE key = ? AND expires_at >= ?",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return AgentResponse(**loads(zlib.decompress(row[0])))
+
+    def put(self, key: str, response: AgentResponse) -> None:
+        payload = dumps_bytes({
+            "content": response.content,
+            "model": response.model,
+            "provider": response.provider,
+            "usage": response.usage,
+            "finish_reason": response.finish_reason,
+            "created_at": response.created_at,
+        })
+        payload = zlib.compress(payload)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, expires_at) VALUES (?, ?, ?)",
+                (key, payload, time.time() + self.ttl_seconds),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a per-entry TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 600.0,
+        store: Optional[SQLiteCacheStore] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        # key -> (expires, compressed content or None, response)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[bytes], AgentResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Provider tokens the hits would have cost
+        self.tokens_saved = 0
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        return blake2b(dumps_bytes(payload, sort_keys=True), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[AgentResponse]:
+        """Return a fresh copy of the cached response, or None."""
+        cached = self._lookup(key)
+        if cached is None and self.store is not None:
+            cached = self.store.get(key)
+            if cached is not None:
+                self._remember(key, cached)
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.tokens_saved += cached.total_tokens
+        # Served without a provider call: no tokens were spent on this turn.
+        return replace(cached, usage={}, created_at=time.time(), tool_calls_made=[])
+
+    def _lookup(self, key: str) -> Optional[AgentResponse]:
+        """In-memory tier only; drops the entry if it has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            _, packed, response = entry
+        if packed is None:
+            return response
+        return replace(response, content=zlib.decompress(packed).decode("utf-8"))
+
+    def put(self, key: str, response: AgentResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        stored = replace(response, raw_response=None, tool_calls_made=[])
+        self._remember(key, stored)
+        if self.store is not None:
+            self.store.put(key, stored)
+
+    def _remember(self, key: str, response: AgentResponse) -> None:
+        packed = None
+        if len(response.content) >= _COMPRESS_MIN_CHARS:
+            packed = zlib.compress(response.content.encode("utf-8"))
+            response = replace(response, content="")
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, packed, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        if self.store is not None:
+            self.store.clear()
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.tokens_saved = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "tokens_saved": self.tokens_saved,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache, sized from settings."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                from config import get_settings
+
+                settings = get_settings()
+                store = None
+                if settings.response_cache_path:
+                    store = SQLiteCacheStore(
+                        settings.response_cache_path,
+                        ttl_seconds=settings.response_cache_ttl_seconds,
+                    )
+                _response_cache = ResponseCache(
+                    max_entries=settings.response_cache_max_entries,
+                    ttl_seconds=settings.response_cache_ttl_seconds,
+                    store=store,
+                )
+    return _response_cache
+
+
+def reset_response_cache() -> None:
+    """Drop the process-wide response cache; the next lookup rebuilds it from
+    the current settings (e.g. after clear_settings_cache())."""
+    global _response_cache
+    with _response_cache_lock:
+        cache, _response_cache = _response_cache, None
+    if cache is not None and cache.store is not None:
+        cache.store.close()
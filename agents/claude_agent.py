@@ -1,25 +1,44 @@
 """Claude agent - Anthropic API with tool-calling support."""
-from typing import Any, Dict, List
+from typing import Any, Dict, Generator, List, Optional, Tuple
+import asyncio
+import logging
 import time
-import anthropic
 
-from .base import BaseAgent, AgentResponse, Message, MessageRole, ToolCall, DEFAULT_REQUEST_TIMEOUT
+from ._http import get_shared_http_client, get_shared_sync_http_client
+from .base import BaseAgent, AgentResponse, Message, ToolCall, DEFAULT_REQUEST_TIMEOUT, shared_client
 from config import get_settings
 
+logger = logging.getLogger(__name__)
+
 
 class ClaudeAgent(BaseAgent):
+    # (system prompt, prompt caching) the cached system field was built for
+    _system_param_key: Optional[Tuple[str, bool]] = None
+    _system_param_value: Any = None
+
     @property
     def provider_name(self) -> str:
         return "anthropic"
 
+    def _client_kwargs(self) -> Dict[str, Any]:
+        return {"api_key": get_settings().require_api_key("anthropic"), "timeout": DEFAULT_REQUEST_TIMEOUT}
+
     def _initialize_client(self) -> None:
-        settings = get_settings()
-        key = settings.anthropic_api_key
-        if not key:
-            raise RuntimeError("ANTHROPIC_API_KEY is not set. Add it to your .env file.")
-        self._client = anthropic.Anthropic(
-            api_key=key.get_secret_value(),
-            timeout=DEFAULT_REQUEST_TIMEOUT,
+        import anthropic
+
+        self._client = shared_client(
+            anthropic.Anthropic,
+            **self._client_kwargs(),
+            http_client=get_shared_sync_http_client(anthropic),
+        )
+
+    def _initialize_async_client(self) -> None:
+        import anthropic
+
+        self._async_client = shared_client(
+            anthropic.AsyncAnthropic,
+            **self._client_kwargs(),
+            http_client=get_shared_http_client(anthropic),
         )
 
     @staticmethod
@@ -123,51 +142,52 @@ class ClaudeAgent(BaseAgent):
         """Convert internal Messages to Anthropic's format.
 
         Handles plain text, assistant tool_use, and tool_result messages.
+        Not memoized: _compact_anthropic_messages() rebuilds every entry
+        against the request's character budget anyway.
         """
-        out: List[Dict[str, Any]] = []
-        for msg in messages:
-            if msg.role == MessageRole.SYSTEM:
-                continue
-
-            # Assistant message with tool calls
-            if msg.role == MessageRole.ASSISTANT and msg.tool_calls:
-                content_blocks: List[Dict[str, Any]] = []
-                if msg.content:
-                    content_blocks.append({"type": "text", "text": msg.content})
-                for tc in msg.tool_calls:
-                    content_blocks.append({
-                        "type": "tool_use",
-                        "id": tc.id,
-                        "name": tc.name,
-                        "input": tc.arguments,
-                    })
-                out.append({"role": "assistant", "content": content_blocks})
-                continue
-
-            # Tool result message
-            if msg.role == MessageRole.TOOL and msg.tool_result:
-                out.append({
-                    "role": "user",
-                    "content": [{
-                        "type": "tool_result",
-                        "tool_use_id": msg.tool_result.tool_call_id,
-                        "content": msg.tool_result.content,
-                        **({"is_error": True} if msg.tool_result.is_error else {}),
-                    }],
-                })
-                continue
+        return [m for m in map(self._to_anthropic_message, messages) if m is not None]
 
-            # Plain text message
-            out.append({
-                "role": msg.role.value,
-                "content": msg.content if isinstance(msg.content, str) else str(msg.content),
-            })
-        return out
+    @staticmethod
+    def _to_anthropic_message(msg: Message) -> Optional[Dict[str, Any]]:
+        role = msg.role_str
+        if role == "system":
+            return None
+
+        # Assistant message with tool calls
+        if role == "assistant" and msg.tool_calls:
+            content_blocks: List[Dict[str, Any]] = []
+            if msg.content:
+                content_blocks.append({"type": "text", "text": msg.content})
+            for tc in msg.tool_calls:
+                content_blocks.append({
+                    "type": "tool_use",
+                    "id": tc.id,
+                    "name": tc.name,
+                    "input": tc.arguments,
+                })
+            return {"role": "assistant", "content": content_blocks}
+
+        # Tool result message
+        if role == "tool" and msg.tool_result:
+            return {
+                "role": "user",
+                "content": [{
+                    "type": "tool_result",
+                    "tool_use_id": msg.tool_result.tool_call_id,
+                    "content": msg.tool_result.content,
+                    **({"is_error": True} if msg.tool_result.is_error else {}),
+                }],
+            }
+
+        # Plain text message
+        return {
+            "role": role,
+            "content": msg.content if isinstance(msg.content, str) else str(msg.content),
+        }
 
     # ── request ──────────────────────────────────────────────────────
 
-    def _send_request(self, messages: List[Message]) -> AgentResponse:
-        settings = get_settings()
+    def _build_request_params(self, messages: List[Message]) -> Dict[str, Any]:
         anthropic_messages = self._compact_anthropic_messages(
             self._to_anthropic_messages(messages),
             aggressive=False,
@@ -182,13 +202,58 @@ class ClaudeAgent(BaseAgent):
         if not self.model.endswith("-thinking"):
             request_params["temperature"] = self.temperature
 
+        prompt_caching = self.prompt_caching and get_settings().anthropic_prompt_caching
         if self.system_prompt:
-            request_params["system"] = self.system_prompt
+            request_params["system"] = self._system_param(prompt_caching)
+
+        if prompt_caching and len(anthropic_messages) > 1:
+            self._mark_cache_breakpoint(anthropic_messages[-2])
 
         # Inject tool schemas if available
         if self.tool_registry and len(self.tool_registry) > 0:
             request_params["tools"] = self.tool_registry.to_anthropic_format()
 
+        return request_params
+
+    def _system_param(self, prompt_caching: bool) -> Any:
+        """The request's system field, rebuilt only when the prompt changes."""
+        key = (self.system_prompt, prompt_caching)
+        if self._system_param_key != key:
+            if prompt_caching:
+                # Breakpoint after tools + system: the role prompt is re-read
+                # from cache on every turn instead of being prefilled again.
+                value: Any = [{
+                    "type": "text",
+                    "text": self.system_prompt,
+                    "cache_control": {"type": "ephemeral"},
+                }]
+            else:
+                value = self.system_prompt
+            self._system_param_key, self._system_param_value = key, value
+        return self._system_param_value
+
+    @staticmethod
+    def _mark_cache_breakpoint(message: Dict[str, Any]) -> None:
+        """Mark the end of *message* as a prompt-cache breakpoint.
+
+        Applied to the message just before the newest turn, so the whole
+        stable history prefix is served from cache on the next request.
+        """
+        content = message.get("content")
+        if isinstance(content, str):
+            if not content:
+                return
+            message["content"] = [{"type": "text", "text": content}]
+        elif not content:
+            return
+        last_block = dict(message["content"][-1])
+        last_block["cache_control"] = {"type": "ephemeral"}
+        message["content"] = [*message["content"][:-1], last_block]
+
+    def _send_request(self, messages: List[Message]) -> AgentResponse:
+        settings = get_settings()
+        request_params = self._build_request_params(messages)
+
         response = None
         retry_attempts = max(1, settings.anthropic_retry_attempts)
         for attempt in range(retry_attempts):
@@ -196,19 +261,80 @@ class ClaudeAgent(BaseAgent):
                 response = self._client.messages.create(**request_params)
                 break
             except Exception as exc:
-                if not self._is_rate_limit_error(exc) or attempt >= (retry_attempts - 1):
+                delay = self._retry_delay(exc, attempt, settings.anthropic_retry_base_delay_seconds)
+                if delay is None or attempt >= (retry_attempts - 1):
                     raise
 
-                delay = settings.anthropic_retry_base_delay_seconds * (2 ** attempt)
-                request_params["messages"] = self._compact_anthropic_messages(
-                    request_params["messages"],
-                    aggressive=True,
-                )
+                if self._is_rate_limit_error(exc):
+                    request_params["messages"] = self._compact_anthropic_messages(
+                        request_params["messages"],
+                        aggressive=True,
+                    )
                 time.sleep(delay)
 
         if response is None:
             raise RuntimeError("Anthropic request failed after retries.")
 
+        return self._parse_response(response)
+
+    async def _send_request_async(self, messages: List[Message]) -> AgentResponse:
+        settings = get_settings()
+        request_params = self._build_request_params(messages)
+
+        response = None
+        retry_attempts = max(1, settings.anthropic_retry_attempts)
+        for attempt in range(retry_attempts):
+            try:
+                response = await self._async_client.messages.create(**request_params)
+                break
+            except Exception as exc:
+                delay = self._retry_delay(exc, attempt, settings.anthropic_retry_base_delay_seconds)
+                if delay is None or attempt >= (retry_attempts - 1):
+                    raise
+
+                if self._is_rate_limit_error(exc):
+                    request_params["messages"] = self._compact_anthropic_messages(
+                        request_params["messages"],
+                        aggressive=True,
+                    )
+                await asyncio.sleep(delay)
+
+        if response is None:
+            raise RuntimeError("Anthropic request failed after retries.")
+
+        return self._parse_response(response)
+
+    def _stream_request(self, messages: List[Message]) -> Generator[str, None, AgentResponse]:
+        settings = get_settings()
+        request_params = self._build_request_params(messages)
+
+        retry_attempts = max(1, settings.anthropic_retry_attempts)
+        for attempt in range(retry_attempts):
+            emitted = False
+            try:
+                with self._client.messages.stream(**request_params) as stream:
+                    for text in stream.text_stream:
+                        emitted = True
+                        yield text
+                    final = stream.get_final_message()
+                return self._parse_response(final)
+            except Exception as exc:
+                # Text already shown to the user can't be taken back; only
+                # retry failures that happen before the first chunk.
+                delay = self._retry_delay(exc, attempt, settings.anthropic_retry_base_delay_seconds)
+                if emitted or delay is None or attempt >= (retry_attempts - 1):
+                    raise
+
+                if self._is_rate_limit_error(exc):
+                    request_params["messages"] = self._compact_anthropic_messages(
+                        request_params["messages"],
+                        aggressive=True,
+                    )
+                time.sleep(delay)
+
+        raise RuntimeError("Anthropic request failed after retries.")
+
+    def _parse_response(self, response: Any) -> AgentResponse:
         # Extract text content
         content = "".join(
             block.text for block in response.content if block.type == "text"
@@ -225,16 +351,30 @@ class ClaudeAgent(BaseAgent):
             if block.type == "tool_use"
         ]
 
+        usage = {
+            "input_tokens": response.usage.input_tokens,
+            "output_tokens": response.usage.output_tokens,
+            "total_tokens": response.usage.input_tokens + response.usage.output_tokens,
+        }
+        # Prompt-cache accounting (input_tokens excludes both of these)
+        cache_write = getattr(response.usage, "cache_creation_input_tokens", None)
+        cache_read = getattr(response.usage, "cache_read_input_tokens", None)
+        if cache_write:
+            usage["cache_creation_input_tokens"] = cache_write
+        if cache_read:
+            usage["cache_read_input_tokens"] = cache_read
+        if cache_write or cache_read:
+            logger.debug(
+                "Prompt cache for %s: %s tokens read, %s written",
+                self.model, cache_read or 0, cache_write or 0,
+            )
+
         return AgentResponse(
             content=content,
             model=response.model,
             provider=self.provider_name,
-            usage={
-                "input_tokens": response.usage.input_tokens,
-                "output_tokens": response.usage.output_tokens,
-                "total_tokens": response.usage.input_tokens + response.usage.output_tokens,
-            },
+            usage=usage,
             finish_reason=response.stop_reason,  # "tool_use" when tools requested
-            raw_response=response,
+            raw_response=response if get_settings().keep_raw_response else None,
             tool_calls_made=tool_calls,
         )
@@ -1,13 +1,10 @@
 """Agent factory - creates agents by provider or role."""
-from typing import Any, Dict, Type, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Type, Optional, Tuple
 from enum import Enum
+import importlib
 
 from .base import BaseAgent
-from .claude_agent import ClaudeAgent
-from .gpt_agent import GPTAgent
-from .gemini_agent import GeminiAgent
-from .kimi_agent import KimiAgent
-from .openrouter_agent import OpenRouterAgent
 from config import get_settings
 
 
@@ -29,12 +26,17 @@ class Role(Enum):
     REVIEWER = "reviewer"
 
 
-PROVIDER_AGENTS: Dict[Provider, Type[BaseAgent]] = {
-    Provider.ANTHROPIC: ClaudeAgent,
-    Provider.OPENAI: GPTAgent,
-    Provider.GOOGLE: GeminiAgent,
-    Provider.KIMI: KimiAgent,
-    Provider.OPENROUTER: OpenRouterAgent,
+def _lazy_agent(module: str, name: str) -> Callable[[], Type[BaseAgent]]:
+    """Defer importing an agent module (and its provider SDK) until first use."""
+    return lambda: getattr(importlib.import_module(f"{__package__}.{module}"), name)
+
+
+PROVIDER_AGENTS: Dict[Provider, Callable[[], Type[BaseAgent]]] = {
+    Provider.ANTHROPIC: _lazy_agent("claude_agent", "ClaudeAgent"),
+    Provider.OPENAI: _lazy_agent("gpt_agent", "GPTAgent"),
+    Provider.GOOGLE: _lazy_agent("gemini_agent", "GeminiAgent"),
+    Provider.KIMI: _lazy_agent("kimi_agent", "KimiAgent"),
+    Provider.OPENROUTER: _lazy_agent("openrouter_agent", "OpenRouterAgent"),
 }
 
 ROLE_PROVIDERS: Dict[Role, Provider] = {
@@ -48,6 +50,25 @@ ROLE_PROVIDERS: Dict[Role, Provider] = {
 }
 
 
+# Settings attribute holding each role's default model.
+ROLE_MODEL_SETTINGS: Dict[Role, str] = {
+    Role.SENIOR_DEV: "senior_dev_model",
+    Role.CODER: "coder_model",
+    Role.CODER_2: "coder_model_2",
+    Role.CODER_3: "coder_model_3",
+    Role.QA: "qa_model",
+    Role.BA: "ba_model",
+    Role.REVIEWER: "reviewer_model",
+}
+
+# Resolved (provider, model, role config) per role, valid for one Settings
+# object. clear_settings_cache() hands out a new object, which resets it.
+_resolved_roles: Dict[Role, Tuple[Provider, str, Any]] = {}
+_resolved_for: Optional[object] = None
+# (provider, model) -> roles running on it, built from the same resolution
+_provider_groups: Optional[Mapping[Tuple[Provider, str], Tuple[Role, ...]]] = None
+
+
 class AgentFactory:
     @staticmethod
     def _resolve_provider(settings, role: Role) -> Provider:
@@ -67,24 +88,50 @@ class AgentFactory:
 
     @staticmethod
     def _resolve_model(settings, role: Role) -> str:
-        model_map = {
-            Role.SENIOR_DEV: settings.senior_dev_model,
-            Role.CODER: settings.coder_model,
-            Role.CODER_2: settings.coder_model_2,
-            Role.CODER_3: settings.coder_model_3,
-            Role.QA: settings.qa_model,
-            Role.BA: settings.ba_model,
-            Role.REVIEWER: settings.reviewer_model,
-        }
-        default_model = model_map.get(role)
+        field_name = ROLE_MODEL_SETTINGS.get(role)
+        default_model = getattr(settings, field_name) if field_name else None
         if not default_model:
             raise ValueError(f"No model for role: {role}")
         return settings.resolve_role_model(role.value, default_model)
 
     @staticmethod
-    def get_role_runtime_config(role: Role) -> Tuple[Provider, str]:
+    def _resolve_role(role: Role) -> Tuple[Provider, str, Any]:
+        """Return (provider, model, role config) for *role*, cached per Settings."""
+        global _resolved_for, _provider_groups
         settings = get_settings()
-        return AgentFactory._resolve_provider(settings, role), AgentFactory._resolve_model(settings, role)
+        if settings is not _resolved_for:
+            _resolved_roles.clear()
+            _provider_groups = None
+            _resolved_for = settings
+
+        resolved = _resolved_roles.get(role)
+        if resolved is None:
+            from roles import get_role_config
+
+            resolved = (
+                AgentFactory._resolve_provider(settings, role),
+                AgentFactory._resolve_model(settings, role),
+                get_role_config(role),
+            )
+            _resolved_roles[role] = resolved
+        return resolved
+
+    @staticmethod
+    def get_role_runtime_config(role: Role) -> Tuple[Provider, str]:
+        provider, model, _ = AgentFactory._resolve_role(role)
+        return provider, model
+
+    @staticmethod
+    def provider_groups() -> Mapping[Tuple[Provider, str], Tuple[Role, ...]]:
+        """Every role grouped by the (provider, model) it runs on, cached per Settings."""
+        global _provider_groups
+        runtime = [(role, AgentFactory.get_role_runtime_config(role)) for role in Role]
+        if _provider_groups is None:
+            groups: Dict[Tuple[Provider, str], List[Role]] = {}
+            for role, key in runtime:
+                groups.setdefault(key, []).append(role)
+            _provider_groups = MappingProxyType({key: tuple(roles) for key, roles in groups.items()})
+        return _provider_groups
 
     @staticmethod
     def create_by_provider(
@@ -94,19 +141,23 @@ class AgentFactory:
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         tool_registry: Optional[Any] = None,
+        prompt_caching: bool = True,
     ) -> BaseAgent:
         settings = get_settings()
-        agent_class = PROVIDER_AGENTS.get(provider)
-        if not agent_class:
+        load_agent_class = PROVIDER_AGENTS.get(provider)
+        if not load_agent_class:
             raise ValueError(f"Unsupported provider: {provider}")
+        agent_class = load_agent_class()
 
-        return agent_class(
+        agent = agent_class(
             model=model,
             system_prompt=system_prompt,
             max_tokens=max_tokens or settings.default_max_tokens,
             temperature=temperature if temperature is not None else settings.default_temperature,
             tool_registry=tool_registry,
         )
+        agent.prompt_caching = prompt_caching
+        return agent
 
     @staticmethod
     def create_by_role(
@@ -116,12 +167,7 @@ class AgentFactory:
         temperature: Optional[float] = None,
         tool_registry: Optional[Any] = None,
     ) -> BaseAgent:
-        from roles import get_role_config
-
-        settings = get_settings()
-        role_config = get_role_config(role)
-        provider = AgentFactory._resolve_provider(settings, role)
-        model = AgentFactory._resolve_model(settings, role)
+        provider, model, role_config = AgentFactory._resolve_role(role)
 
         return AgentFactory.create_by_provider(
             provider=provider,
@@ -130,4 +176,5 @@ class AgentFactory:
             max_tokens=max_tokens or role_config.max_tokens,
             temperature=temperature if temperature is not None else role_config.temperature,
             tool_registry=tool_registry,
+            prompt_caching=role_config.cacheable,
         )
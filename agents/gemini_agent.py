@@ -1,27 +1,28 @@
 """Gemini agent - Google API with tool-calling support."""
-from typing import Any, Dict, List
-import google.generativeai as genai
-from google.protobuf.struct_pb2 import Struct
+from typing import Any, Dict, Generator, List, Tuple
 
-from .base import BaseAgent, AgentResponse, Message, MessageRole, ToolCall
+from .base import BaseAgent, AgentResponse, Message, MessageRole, ToolCall, shared_client
 from config import get_settings
 
 
 class GeminiAgent(BaseAgent):
+    # Requests advance the shared chat session, so never run two at once
+    supports_hedging = False
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._chat_session = None
+        # Messages already represented in _chat_session (its last request)
+        self._session_messages: List[Message] = []
 
     @property
     def provider_name(self) -> str:
         return "google"
 
     def _initialize_client(self) -> None:
-        settings = get_settings()
-        key = settings.google_api_key
-        if not key:
-            raise RuntimeError("GOOGLE_API_KEY is not set. Add it to your .env file.")
-        genai.configure(api_key=key.get_secret_value())
+        import google.generativeai as genai
+
+        genai.configure(api_key=get_settings().require_api_key("google"))
 
         model_kwargs: Dict[str, Any] = {
             "model_name": self.model,
@@ -43,7 +44,9 @@ class GeminiAgent(BaseAgent):
                 )
             ]
 
-        self._client = genai.GenerativeModel(**model_kwargs)
+        # generation_config, system_instruction and tools are baked into the
+        # model object, so agents with identical settings share one instance.
+        self._client = shared_client(genai.GenerativeModel, **model_kwargs)
 
     # ── message conversion ───────────────────────────────────────────
 
@@ -52,10 +55,14 @@ class GeminiAgent(BaseAgent):
 
         Handles plain text, function_call parts, and function_response parts.
         """
+        import google.generativeai as genai
+
         history: List[Dict[str, Any]] = []
         for msg in messages[:-1]:
+            role = msg.role_str
+
             # Assistant message with tool calls
-            if msg.role == MessageRole.ASSISTANT and msg.tool_calls:
+            if role == "assistant" and msg.tool_calls:
                 parts = []
                 if msg.content:
                     parts.append(msg.content)
@@ -72,10 +79,10 @@ class GeminiAgent(BaseAgent):
                 continue
 
             # Tool result message
-            if msg.role == MessageRole.TOOL and msg.tool_result:
+            if role == "tool" and msg.tool_result:
                 fr_part = genai.protos.Part(
                     function_response=genai.protos.FunctionResponse(
-                        name=msg.metadata.get("tool_name", "tool"),
+                        name=(msg.metadata or {}).get("tool_name", "tool"),
                         response=self._dict_to_struct(
                             {"result": msg.tool_result.content}
                         ),
@@ -95,13 +102,15 @@ class GeminiAgent(BaseAgent):
                 continue
 
             # Plain text
-            role = "user" if msg.role == MessageRole.USER else "model"
+            role = "user" if role == "user" else "model"
             content = msg.content if isinstance(msg.content, str) else str(msg.content)
             history.append({"role": role, "parts": [content]})
         return history
 
     @staticmethod
-    def _dict_to_struct(d: Dict[str, Any]) -> Struct:
+    def _dict_to_struct(d: Dict[str, Any]) -> Any:
+        from google.protobuf.struct_pb2 import Struct
+
         s = Struct()
         s.update(d)
         return s
@@ -114,7 +123,6 @@ class GeminiAgent(BaseAgent):
             role=MessageRole.ASSISTANT,
             content=assistant_response.content or "",
             tool_calls=assistant_response.tool_calls_made,
-            metadata={"raw_response": assistant_response.raw_response},
         )
         messages.append(assistant_msg)
 
@@ -136,20 +144,29 @@ class GeminiAgent(BaseAgent):
 
     # ── request ──────────────────────────────────────────────────────
 
-    def _send_request(self, messages: List[Message]) -> AgentResponse:
-        gemini_history = self._to_gemini_history(messages)
+    def _prepare_chat(self, messages: List[Message]) -> Tuple[Any, Any]:
+        """Return the chat session and the payload to send for *messages*.
+
+        The live session is continued when *messages* extends the previous
+        request by exactly the model's reply plus new input; otherwise (first
+        turn, include_history=False, compacted history, ...) a new session is
+        started from the rebuilt history.
+        """
+        import google.generativeai as genai
+
         last_content = messages[-1].content if messages else ""
+        head = messages[:-1]
 
         # Handle the case where the last message is a tool result
         if messages and messages[-1].role == MessageRole.TOOL:
-            # Rebuild: history is everything except the trailing tool-result
+            # History is everything except the trailing tool-result
             # messages, and the "send" payload is the tool results
             tool_result_parts = []
             idx = len(messages) - 1
             while idx >= 0 and messages[idx].role == MessageRole.TOOL:
                 msg = messages[idx]
                 if msg.tool_result:
-                    tool_name = msg.metadata.get("tool_name", "tool")
+                    tool_name = (msg.metadata or {}).get("tool_name", "tool")
                     tool_result_parts.insert(
                         0,
                         genai.protos.Part(
@@ -162,13 +179,7 @@ class GeminiAgent(BaseAgent):
                         ),
                     )
                 idx -= 1
-            # Rebuild history: everything up to (and including) the assistant
-            # message before the trailing tool results.  We append a dummy
-            # entry so _to_gemini_history (which skips the last element)
-            # processes all messages up to idx.
-            gemini_history = self._to_gemini_history(
-                messages[: idx + 1] + [messages[-1]]
-            )
+            head = messages[: idx + 1]
             last_content = tool_result_parts
         else:
             if not isinstance(last_content, str):
@@ -178,11 +189,64 @@ class GeminiAgent(BaseAgent):
         if self._client is None:
             self._initialize_client()
 
-        chat = self._client.start_chat(history=gemini_history)
+        if self._continues_session(head):
+            return self._chat_session, last_content
+
+        # _to_gemini_history skips the last element, so append a dummy entry
+        # to have it process all of *head*.
+        gemini_history = self._to_gemini_history(head + messages[-1:])
+        return self._client.start_chat(history=gemini_history), last_content
+
+    def _continues_session(self, head: List[Message]) -> bool:
+        """True if *head* is the session's last request plus the model reply."""
+        sent = self._session_messages
+        if self._chat_session is None or len(head) != len(sent) + 1:
+            return False
+        if head[-1].role != MessageRole.ASSISTANT:
+            return False
+        return all(a is b for a, b in zip(head, sent))
+
+    def _send_request(self, messages: List[Message]) -> AgentResponse:
+        chat, payload = self._prepare_chat(messages)
+        # Claim the session for this turn; it is only handed back on success.
+        self._chat_session = None
+        response = self._retry_request(
+            lambda: chat.send_message(payload)
+        )
+        self._chat_session, self._session_messages = chat, list(messages)
+        return self._parse_response(response)
+
+    async def _send_request_async(self, messages: List[Message]) -> AgentResponse:
+        chat, payload = self._prepare_chat(messages)
+        self._chat_session = None
+        response = await self._retry_request_async(
+            lambda: chat.send_message_async(payload)
+        )
+        self._chat_session, self._session_messages = chat, list(messages)
+        return self._parse_response(response)
+
+    def _stream_request(self, messages: List[Message]) -> Generator[str, None, AgentResponse]:
+        chat, payload = self._prepare_chat(messages)
+        self._chat_session = None
         response = self._retry_request(
-            lambda: chat.send_message(last_content)
+            lambda: chat.send_message(payload, stream=True)
         )
+        for chunk in response:
+            for part in chunk.parts:
+                if hasattr(part, "function_call") and part.function_call.name:
+                    continue
+                if getattr(part, "text", ""):
+                    yield part.text
+        # Once iterated, the streamed response exposes the merged candidate
+        self._chat_session, self._session_messages = chat, list(messages)
+        return self._parse_response(response)
+
+    def clear_history(self) -> None:
+        super().clear_history()
+        self._chat_session = None
+        self._session_messages = []
 
+    def _parse_response(self, response: Any) -> AgentResponse:
         # Check for function_call parts
         tool_calls: List[ToolCall] = []
         has_function_calls = False
@@ -218,6 +282,6 @@ class GeminiAgent(BaseAgent):
             provider=self.provider_name,
             usage=usage,
             finish_reason=finish_reason,
-            raw_response=response,
+            raw_response=response if get_settings().keep_raw_response else None,
             tool_calls_made=tool_calls,
         )
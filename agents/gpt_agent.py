@@ -1,94 +1,194 @@
 """GPT agent - OpenAI API with tool-calling support."""
-import json
-from typing import Any, Dict, List
-from openai import OpenAI
+from typing import Any, Dict, Generator, List, Optional
 
-from .base import BaseAgent, AgentResponse, Message, MessageRole, ToolCall, DEFAULT_REQUEST_TIMEOUT
+from . import _json
+from ._http import get_shared_http_client, get_shared_sync_http_client
+from .base import BaseAgent, AgentResponse, Message, ToolCall, DEFAULT_REQUEST_TIMEOUT, shared_client
 from config import get_settings
 
 
 class GPTAgent(BaseAgent):
+    # System message dict, rebuilt only when system_prompt changes
+    _system_message: Optional[Dict[str, str]] = None
+
     @property
     def provider_name(self) -> str:
         return "openai"
 
+    def _client_kwargs(self) -> Dict[str, Any]:
+        """Constructor kwargs shared by the sync and async OpenAI clients."""
+        return {"api_key": get_settings().require_api_key("openai"), "timeout": DEFAULT_REQUEST_TIMEOUT}
+
     def _initialize_client(self) -> None:
-        settings = get_settings()
-        key = settings.openai_api_key
-        if not key:
-            raise RuntimeError("OPENAI_API_KEY is not set. Add it to your .env file.")
-        self._client = OpenAI(
-            api_key=key.get_secret_value(),
-            timeout=DEFAULT_REQUEST_TIMEOUT,
+        import openai
+
+        self._client = shared_client(
+            openai.OpenAI,
+            **self._client_kwargs(),
+            http_client=get_shared_sync_http_client(openai),
+        )
+
+    def _initialize_async_client(self) -> None:
+        import openai
+
+        self._async_client = shared_client(
+            openai.AsyncOpenAI,
+            **self._client_kwargs(),
+            http_client=get_shared_http_client(openai),
         )
 
     # ── message conversion ───────────────────────────────────────────
 
     def _to_openai_messages(self, messages: List[Message]) -> List[Dict[str, Any]]:
-        """Convert internal Messages to OpenAI's chat format."""
+        """Convert internal Messages to OpenAI's chat format.
+
+        The system prompt always leads and history keeps its original order,
+        so consecutive turns share a byte-identical prefix and OpenAI's
+        automatic prompt caching can reuse it.
+        """
         out: List[Dict[str, Any]] = []
 
         if self.system_prompt:
-            out.append({"role": "system", "content": self.system_prompt})
-
-        for msg in messages:
-            if msg.role == MessageRole.SYSTEM:
-                continue
+            if self._system_message is None or self._system_message["content"] != self.system_prompt:
+                self._system_message = {"role": "system", "content": self.system_prompt}
+            out.append(self._system_message)
 
-            # Assistant message with tool calls
-            if msg.role == MessageRole.ASSISTANT and msg.tool_calls:
-                m: Dict[str, Any] = {"role": "assistant", "content": msg.content or ""}
-                m["tool_calls"] = [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.name,
-                            "arguments": json.dumps(tc.arguments, default=str),
-                        },
-                    }
-                    for tc in msg.tool_calls
-                ]
-                out.append(m)
-                continue
+        out.extend(self._convert_messages(messages, self._to_openai_message))
+        return out
 
-            # Tool result message
-            if msg.role == MessageRole.TOOL and msg.tool_result:
-                out.append({
-                    "role": "tool",
-                    "tool_call_id": msg.tool_result.tool_call_id,
-                    "content": msg.tool_result.content,
-                })
-                continue
+    @staticmethod
+    def _to_openai_message(msg: Message) -> Optional[Dict[str, Any]]:
+        role = msg.role_str
+        if role == "system":
+            return None
+
+        # Assistant message with tool calls
+        if role == "assistant" and msg.tool_calls:
+            m: Dict[str, Any] = {"role": "assistant", "content": msg.content or ""}
+            m["tool_calls"] = [
+                {
+                    "id": tc.id,
+                    "type": "function",
+                    "function": {
+                        "name": tc.name,
+                        "arguments": _json.dumps(tc.arguments),
+                    },
+                }
+                for tc in msg.tool_calls
+            ]
+            return m
+
+        # Tool result message
+        if role == "tool" and msg.tool_result:
+            return {
+                "role": "tool",
+                "tool_call_id": msg.tool_result.tool_call_id,
+                "content": msg.tool_result.content,
+            }
 
-            # Plain text
-            if msg.role != MessageRole.SYSTEM:
-                out.append({
-                    "role": msg.role.value,
-                    "content": msg.content if isinstance(msg.content, str) else str(msg.content),
-                })
-        return out
+        # Plain text
+        return {
+            "role": role,
+            "content": msg.content if isinstance(msg.content, str) else str(msg.content),
+        }
 
     # ── request ──────────────────────────────────────────────────────
 
-    def _send_request(self, messages: List[Message]) -> AgentResponse:
-        openai_messages = self._to_openai_messages(messages)
-
+    def _build_request_params(self, messages: List[Message]) -> Dict[str, Any]:
         request_params: Dict[str, Any] = {
             "model": self.model,
             "max_completion_tokens": self.max_tokens,
             "temperature": self.temperature,
-            "messages": openai_messages,
+            "messages": self._to_openai_messages(messages),
         }
 
         # Inject tool schemas if available
         if self.tool_registry and len(self.tool_registry) > 0:
             request_params["tools"] = self.tool_registry.to_openai_format()
 
+        return request_params
+
+    def _send_request(self, messages: List[Message]) -> AgentResponse:
+        request_params = self._build_request_params(messages)
         response = self._retry_request(
             lambda: self._client.chat.completions.create(**request_params)
         )
+        return self._parse_response(response)
+
+    async def _send_request_async(self, messages: List[Message]) -> AgentResponse:
+        request_params = self._build_request_params(messages)
+        response = await self._retry_request_async(
+            lambda: self._async_client.chat.completions.create(**request_params)
+        )
+        return self._parse_response(response)
+
+    def _stream_request(self, messages: List[Message]) -> Generator[str, None, AgentResponse]:
+        request_params = self._build_request_params(messages)
+        request_params["stream"] = True
+        request_params["stream_options"] = {"include_usage": True}
+        stream = self._retry_request(
+            lambda: self._client.chat.completions.create(**request_params)
+        )
+
+        content_parts: List[str] = []
+        # Tool calls arrive as fragments keyed by index: id/name once, arguments in pieces
+        tool_parts: Dict[int, Dict[str, Any]] = {}
+        usage: Dict[str, int] = {}
+        model = self.model
+        finish_reason = None
+
+        for chunk in stream:
+            model = chunk.model or model
+            if chunk.usage:
+                usage = {
+                    "input_tokens": chunk.usage.prompt_tokens,
+                    "output_tokens": chunk.usage.completion_tokens,
+                    "total_tokens": chunk.usage.total_tokens,
+                }
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = choice.delta
+            if delta.content:
+                content_parts.append(delta.content)
+                yield delta.content
+            for tc in delta.tool_calls or []:
+                slot = tool_parts.setdefault(tc.index, {"id": None, "name": None, "arguments": []})
+                if tc.id:
+                    slot["id"] = tc.id
+                if tc.function and tc.function.name:
+                    slot["name"] = tc.function.name
+                if tc.function and tc.function.arguments:
+                    slot["arguments"].append(tc.function.arguments)
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+
+        tool_calls = [
+            ToolCall(
+                id=slot["id"] or f"call_{index}",
+                name=slot["name"] or "",
+                arguments=self._parse_tool_arguments("".join(slot["arguments"]) or "{}"),
+            )
+            for index, slot in sorted(tool_parts.items())
+        ]
+
+        return AgentResponse(
+            content="".join(content_parts),
+            model=model,
+            provider=self.provider_name,
+            usage=usage,
+            finish_reason=finish_reason,
+            tool_calls_made=tool_calls,
+        )
+
+    @staticmethod
+    def _parse_tool_arguments(raw: Any) -> Dict[str, Any]:
+        try:
+            return _json.loads(raw)
+        except (_json.JSONDecodeError, TypeError):
+            return {"raw": raw}
 
+    def _parse_response(self, response: Any) -> AgentResponse:
         choice = response.choices[0]
         content = choice.message.content or ""
 
@@ -96,14 +196,10 @@ class GPTAgent(BaseAgent):
         tool_calls: List[ToolCall] = []
         if choice.message.tool_calls:
             for tc in choice.message.tool_calls:
-                try:
-                    args = json.loads(tc.function.arguments)
-                except (json.JSONDecodeError, TypeError):
-                    args = {"raw": tc.function.arguments}
                 tool_calls.append(ToolCall(
                     id=tc.id,
                     name=tc.function.name,
-                    arguments=args,
+                    arguments=self._parse_tool_arguments(tc.function.arguments),
                 ))
 
         usage: Dict[str, int] = {}
@@ -122,6 +218,6 @@ class GPTAgent(BaseAgent):
             provider=self.provider_name,
             usage=usage,
             finish_reason=finish_reason,
-            raw_response=response,
+            raw_response=response if get_settings().keep_raw_response else None,
             tool_calls_made=tool_calls,
         )
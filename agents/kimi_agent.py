@@ -1,5 +1,5 @@
 """Kimi agent - Moonshot AI (OpenAI-compatible API)."""
-from openai import OpenAI
+from typing import Any, Dict
 
 from .gpt_agent import GPTAgent
 from .base import DEFAULT_REQUEST_TIMEOUT
@@ -11,15 +11,9 @@ class KimiAgent(GPTAgent):
     def provider_name(self) -> str:
         return "kimi"
 
-    def _initialize_client(self) -> None:
-        settings = get_settings()
-        key = settings.kimi_api_key
-        if not key:
-            raise RuntimeError(
-                "KIMI_API_KEY is not set. Add it to your .env file."
-            )
-        self._client = OpenAI(
-            api_key=key.get_secret_value(),
-            base_url="https://api.moonshot.cn/v1",
-            timeout=DEFAULT_REQUEST_TIMEOUT,
-        )
+    def _client_kwargs(self) -> Dict[str, Any]:
+        return {
+            "api_key": get_settings().require_api_key("kimi"),
+            "base_url": "https://api.moonshot.cn/v1",
+            "timeout": DEFAULT_REQUEST_TIMEOUT,
+        }
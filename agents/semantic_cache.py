@@ -0,0 +1,135 @@
+"""Similarity cache for single-turn prompts that differ only cosmetically.
+
+The exact-match cache (agents.cache) misses when a prompt changes by a word
+or some whitespace. This cache embeds each single-turn prompt as a bag of
+character trigrams and serves a stored response when the cosine similarity to
+an earlier prompt for the same agent configuration reaches the threshold.
+
+Trigram vectors need no model download or network call, so they catch
+rewordings and formatting changes, not paraphrases. Opt-in through
+SEMANTIC_CACHE_ENABLED: unlike the exact cache, a hit here answers a
+question that was not asked verbatim.
+"""
+from collections import Counter, OrderedDict
+from dataclasses import replace
+from math import sqrt
+from typing import Callable, Dict, Optional, Tuple
+import threading
+import time
+
+from .base import AgentResponse
+
+Vector = Dict[str, float]
+
+
+def trigram_embedding(text: str) -> Vector:
+    """L2-normalized character-trigram counts of *text* (case/space-folded)."""
+    folded = " ".join(text.lower().split())
+    counts = Counter(folded[i:i + 3] for i in range(max(1, len(folded) - 2)))
+    norm = sqrt(sum(c * c for c in counts.values())) or 1.0
+    return {gram: c / norm for gram, c in counts.items()}
+
+
+def _cosine(a: Vector, b: Vector) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(gram, 0.0) for gram, weight in a.items())
+
+
+class SemanticCache:
+    """Thread-safe LRU of (scope, prompt) -> response, matched by similarity.
+
+    *scope* identifies everything except the prompt (provider, model, system
+    prompt, sampling settings, tools); only prompts in the same scope match.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 256,
+        ttl_seconds: float = 600.0,
+        embed: Callable[[str], Vector] = trigram_embedding,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embed = embed
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Vector, AgentResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, scope: str, text: str) -> Optional[AgentResponse]:
+        """Return a copy of the closest cached response above the threshold."""
+        query = self.embed(text)
+        now = time.monotonic()
+        best_key, best_score = None, self.threshold
+        with self._lock:
+            for key, (expires, vector, _) in list(self._entries.items()):
+                if expires < now:
+                    del self._entries[key]
+                    continue
+                if key[0] != scope:
+                    continue
+                score = _cosine(query, vector)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            cached = self._entries[best_key][2]
+        return replace(cached, usage={}, created_at=time.time(), tool_calls_made=[])
+
+    def put(self, scope: str, text: str, response: AgentResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        vector = self.embed(text)
+        stored = replace(response, raw_response=None, tool_calls_made=[])
+        with self._lock:
+            self._entries[(scope, text)] = (time.monotonic() + self.ttl_seconds, vector, stored)
+            self._entries.move_to_end((scope, text))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Return the process-wide semantic cache, sized from settings."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                from config import get_settings
+
+                settings = get_settings()
+                _semantic_cache = SemanticCache(
+                    threshold=settings.semantic_cache_threshold,
+                    max_entries=settings.response_cache_max_entries,
+                    ttl_seconds=settings.response_cache_ttl_seconds,
+                )
+    return _semantic_cache
+
+
+def reset_semantic_cache() -> None:
+    """Drop the process-wide semantic cache so it is rebuilt from settings."""
+    global _semantic_cache
+    with _semantic_cache_lock:
+        _semantic_cache = None
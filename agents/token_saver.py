@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import Iterable, List
 
-from .base import Message
+from .base import PROVIDER_ENTRY_KEY, Message
 
 
 TOKEN_SAVER_PROMPT = """## Cost Saver Mode
@@ -52,7 +52,10 @@ def compact_message_text(message: Message, max_chars: int) -> Message:
     return Message(
         role=message.role,
         content=content,
-        metadata=dict(message.metadata),
+        # Token estimates and converted entries describe the original text
+        metadata={
+            k: v for k, v in (message.metadata or {}).items() if k not in ("tokens", PROVIDER_ENTRY_KEY)
+        } or None,
         tool_calls=message.tool_calls,
         tool_result=message.tool_result,
     )
@@ -0,0 +1,112 @@
+"""Local token estimates for keeping chat history inside the context window.
+
+Counts come from tiktoken when it is installed (and its encoding files can
+be loaded) and fall back to a characters/4 heuristic otherwise. They are estimates for every provider
+(Claude and Gemini tokenize differently), which is all trimming needs —
+the provider-side count APIs cost a network round trip per call.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Any, List, Optional, Tuple
+import logging
+import threading
+
+from .base import Message
+
+logger = logging.getLogger(__name__)
+
+# Rough per-message framing overhead (role markers, separators).
+MESSAGE_OVERHEAD_TOKENS = 4
+CHARS_PER_TOKEN = 4
+
+# Encoding a large attached file is the slow part of counting; remember the
+# result by content digest so re-asking about the same file skips it
+_COUNT_CACHE_MIN_CHARS = 4096
+_COUNT_CACHE_MAX_ENTRIES = 128
+_count_cache: "OrderedDict[Tuple[bytes, str], int]" = OrderedDict()
+_count_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=32)
+def get_encoder(model: str) -> Optional[Any]:
+    """Return a cached tiktoken encoding for *model*, or None without tiktoken.
+
+    tiktoken downloads the BPE file on first use; when that fails (offline,
+    firewalled) this returns None too, so counts use the heuristic.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken encoding unavailable, estimating tokens from characters: %s", e)
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoder = get_encoder(model)
+    if encoder is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    if len(text) < _COUNT_CACHE_MIN_CHARS:
+        return len(encoder.encode(text, disallowed_special=()))
+
+    key = (blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest(), model)
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+        if cached is not None:
+            _count_cache.move_to_end(key)
+            return cached
+    count = len(encoder.encode(text, disallowed_special=()))
+    with _count_cache_lock:
+        _count_cache[key] = count
+        while len(_count_cache) > _COUNT_CACHE_MAX_ENTRIES:
+            _count_cache.popitem(last=False)
+    return count
+
+
+def message_tokens(message: Message, model: str) -> int:
+    """Token estimate for one message, memoized in its metadata."""
+    metadata = message.metadata
+    if metadata is None:
+        metadata = message.metadata = {}
+    cached = metadata.get("tokens")
+    if cached is not None:
+        return cached
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    tokens = count_tokens(content, model) + MESSAGE_OVERHEAD_TOKENS
+    if message.tool_calls:
+        tokens += sum(count_tokens(str(tc.arguments), model) for tc in message.tool_calls)
+    metadata["tokens"] = tokens
+    return tokens
+
+
+def trim_to_token_budget(messages: List[Message], budget: int, model: str) -> List[Message]:
+    """Drop the oldest messages until the rest fit in *budget* tokens.
+
+    The newest message is always kept, and the kept history starts at a user
+    message so providers never see a dangling assistant or tool turn.
+    """
+    if budget <= 0 or len(messages) <= 1:
+        return messages
+
+    total = 0
+    start = len(messages)
+    for index in range(len(messages) - 1, -1, -1):
+        total += message_tokens(messages[index], model)
+        if total > budget and index < len(messages) - 1:
+            break
+        start = index
+
+    if start == 0:
+        return messages
+    while start < len(messages) - 1 and messages[start].role_str != "user":
+        start += 1
+    return messages[start:]
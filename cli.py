@@ -1,22 +1,32 @@
 """CLI - Click-based command line interface."""
+import json
 import sys
+from functools import cache
+from typing import TYPE_CHECKING
 
 import click
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
-from rich.table import Table
 
-from agents.factory import AgentFactory, Role
-from config import get_settings
-from core import Orchestrator
+if TYPE_CHECKING:
+    from rich.console import Console
 
+    from agents.factory import Role
+    from core import Orchestrator
 
-console = Console()
+# Rich, the agents and the orchestrator are imported inside the commands that
+# use them, so `clai --help` and the listing commands start quickly.
 
 
-def get_orchestrator(verbose: bool = False) -> Orchestrator:
-    return Orchestrator(verbose=verbose)
+@cache
+def _console() -> "Console":
+    from rich.console import Console
+
+    return Console()
+
+
+def get_orchestrator(verbose: bool = False, use_cache: bool = True) -> "Orchestrator":
+    from core import Orchestrator
+
+    return Orchestrator(verbose=verbose, use_cache=use_cache)
 
 
 def _step_label(step_name: str) -> str:
@@ -28,11 +38,13 @@ def _step_label(step_name: str) -> str:
 
 @click.group()
 @click.option("--verbose", "-v", is_flag=True)
+@click.option("--no-cache", is_flag=True, help="Always call the provider, even for repeated prompts.")
 @click.pass_context
-def cli(ctx, verbose):
+def cli(ctx, verbose, no_cache):
     """CLAI - Your AI Development Team"""
     ctx.ensure_object(dict)
     ctx.obj["verbose"] = verbose
+    ctx.obj["use_cache"] = not no_cache
 
 
 @cli.command()
@@ -42,6 +54,10 @@ def cli(ctx, verbose):
 @click.pass_context
 def ask(ctx, role, prompt, file):
     """Ask a team member a question."""
+    from agents.factory import Role
+
+    console = _console()
+
     verbose = ctx.obj.get("verbose", False)
     if file:
         with open(file, "r", encoding="utf-8") as f:
@@ -53,21 +69,26 @@ def ask(ctx, role, prompt, file):
         console.print("[red]No prompt provided[/red]")
         sys.exit(1)
 
-    with console.status(f"[bold blue]Asking {role}...[/bold blue]"):
-        try:
-            orchestrator = get_orchestrator(verbose)
-            response = orchestrator.ask(Role(role), prompt_text)
-            console.print()
-            console.print(
-                Panel(
-                    Markdown(response.content),
-                    title=f"[bold green]{role.upper()}[/bold green]",
-                    subtitle=f"[dim]{response.model} | {response.total_tokens} tokens[/dim]",
-                )
-            )
-        except Exception as e:
-            console.print(f"[red]Error: {e}[/red]")
-            sys.exit(1)
+    try:
+        orchestrator = get_orchestrator(verbose, ctx.obj.get("use_cache", True))
+        console.print()
+        _stream_answer(orchestrator, Role(role), prompt_text)
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+
+def _stream_answer(
+    orchestrator: "Orchestrator",
+    role: "Role",
+    prompt: str,
+    include_history: bool = False,
+    padded: bool = False,
+):
+    """Render a reply into a live panel as it streams in (same renderer as the shell)."""
+    from shell.render import stream_answer
+
+    return stream_answer(_console(), orchestrator, role, prompt, include_history=include_history, padded=padded)
 
 
 @cli.command()
@@ -75,10 +96,26 @@ def ask(ctx, role, prompt, file):
 @click.option("--requirement", "-r")
 @click.option("--code", "-c", type=click.Path(exists=True))
 @click.option("--bug", "-b")
+@click.option(
+    "--batch",
+    type=click.Path(exists=True),
+    help="JSONL file of inputs to run through provider batch APIs (slower, cheaper).",
+)
 @click.pass_context
-def workflow(ctx, workflow, requirement, code, bug):
+def workflow(ctx, workflow, requirement, code, bug, batch):
     """Run a multi-agent workflow."""
+    import asyncio
+
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    console = _console()
+
     verbose = ctx.obj.get("verbose", False)
+    if batch:
+        _run_workflow_batch(workflow, batch, verbose, ctx.obj.get("use_cache", True))
+        return
+
     context = {}
 
     if workflow == "feature":
@@ -94,15 +131,17 @@ def workflow(ctx, workflow, requirement, code, bug):
         context["project_description"] = requirement or click.prompt("Project description")
 
     console.print(f"\n[bold blue]Running {workflow}...[/bold blue]\n")
+
+    def show_step(step_name, response) -> None:
+        # Rendered as each step finishes, while the other steps keep running
+        console.print(Panel(Markdown(response.content), title=f"[bold]{_step_label(step_name)}[/bold]"))
+        console.print()
+
     try:
-        orchestrator = get_orchestrator(verbose)
-        result = orchestrator.run_workflow(workflow, context)
+        orchestrator = get_orchestrator(verbose, ctx.obj.get("use_cache", True))
+        result = asyncio.run(orchestrator.run_workflow_async(workflow, context, on_step_done=show_step))
         if result.status.value == "completed":
             console.print(f"[green]Done in {result.duration:.2f}s[/green]\n")
-            for step_name, response in result.outputs.items():
-                role_name = _step_label(step_name)
-                console.print(Panel(Markdown(response.content), title=f"[bold]{role_name}[/bold]"))
-                console.print()
         else:
             console.print("[red]Failed[/red]")
             for error in result.errors:
@@ -113,9 +152,77 @@ def workflow(ctx, workflow, requirement, code, bug):
         sys.exit(1)
 
 
+# Context key a plain-string JSONL line maps to, per workflow.
+_BATCH_PRIMARY_KEYS = {
+    "feature": "requirement",
+    "review": "code",
+    "bugfix": "bug_description",
+    "architecture": "project_description",
+}
+
+
+def _load_batch_contexts(workflow: str, path: str) -> list:
+    contexts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise click.BadParameter(f"line {line_no}: {exc}", param_hint="--batch")
+            if isinstance(item, dict):
+                contexts.append({str(k): str(v) for k, v in item.items()})
+            else:
+                contexts.append({_BATCH_PRIMARY_KEYS[workflow]: str(item)})
+    return contexts
+
+
+def _run_workflow_batch(workflow: str, path: str, verbose: bool, use_cache: bool = True) -> None:
+    import asyncio
+
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    console = _console()
+
+    contexts = _load_batch_contexts(workflow, path)
+    if not contexts:
+        console.print("[red]Batch file is empty[/red]")
+        sys.exit(1)
+
+    try:
+        orchestrator = get_orchestrator(verbose, use_cache)
+        with console.status(f"[bold blue]Running {workflow} batch ({len(contexts)} inputs)...[/bold blue]"):
+            results = asyncio.run(orchestrator.run_workflow_batch(workflow, contexts))
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+    failed = 0
+    for index, result in enumerate(results, 1):
+        if result.status.value == "completed":
+            console.print(Panel(Markdown(result.final_output or ""), title=f"[bold]Input {index}[/bold]"))
+        else:
+            failed += 1
+            console.print(f"[red]Input {index} failed[/red]")
+            for error in result.errors:
+                console.print(f"[red]  {error}[/red]")
+        console.print()
+    if failed:
+        sys.exit(1)
+
+
 @cli.command()
 def team():
     """Show team members."""
+    from rich.console import Group
+    from rich.table import Table
+
+    from agents.factory import AgentFactory, Role
+
+    console = _console()
+
     table = Table(title="AI Team")
     table.add_column("Role", style="cyan")
     table.add_column("Model", style="green")
@@ -132,14 +239,17 @@ def team():
     ]:
         provider, model = AgentFactory.get_role_runtime_config(role)
         table.add_row(role_name, model, provider.value)
-    console.print()
-    console.print(table)
-    console.print()
+    console.print(Group("", table, ""))
 
 
 @cli.command()
 def workflows():
     """List available workflows."""
+    from rich.console import Group
+    from rich.table import Table
+
+    console = _console()
+
     table = Table(title="Workflows")
     table.add_column("Name", style="cyan")
     table.add_column("Pipeline", style="green")
@@ -151,17 +261,20 @@ def workflows():
         ("architecture", "BA -> Senior -> QA"),
     ]:
         table.add_row(name, pipeline)
-    console.print()
-    console.print(table)
-    console.print()
+    console.print(Group("", table, ""))
 
 
 @cli.command()
 @click.pass_context
 def stages(ctx):
     """List available stages."""
+    from rich.console import Group
+    from rich.table import Table
+
+    console = _console()
+
     verbose = ctx.obj.get("verbose", False)
-    orchestrator = get_orchestrator(verbose)
+    orchestrator = get_orchestrator(verbose, ctx.obj.get("use_cache", True))
     table = Table(title="Stages")
     table.add_column("Name", style="cyan")
     table.add_column("Status", style="green")
@@ -174,9 +287,7 @@ def stages(ctx):
             details.get("description", ""),
         )
 
-    console.print()
-    console.print(table)
-    console.print()
+    console.print(Group("", table, ""))
 
 
 @cli.command()
@@ -196,8 +307,13 @@ def stages(ctx):
 @click.pass_context
 def stage(ctx, stage_name, topic):
     """Run a stage."""
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    console = _console()
+
     verbose = ctx.obj.get("verbose", False)
-    orchestrator = get_orchestrator(verbose)
+    orchestrator = get_orchestrator(verbose, ctx.obj.get("use_cache", True))
     context = {}
     if stage_name == "planning_discussion":
         context["requirement"] = topic or click.prompt("Planning topic")
@@ -224,24 +340,27 @@ def stage(ctx, stage_name, topic):
 @cli.command()
 def config():
     """Show configuration status."""
+    from rich.console import Group
+    from rich.table import Table
+
+    from agents.factory import AgentFactory, Role
+    from config import get_settings
+    from config.settings import PROVIDER_LABELS
+
+    console = _console()
+
     try:
         settings = get_settings()
+        # Collected and rendered in one print instead of one per table/spacer
+        renderables: list = [""]
 
         table = Table(title="API Keys")
         table.add_column("Provider", style="cyan")
         table.add_column("Status")
-        for provider, key in [
-            ("Anthropic", settings.anthropic_api_key),
-            ("OpenAI", settings.openai_api_key),
-            ("Google", settings.google_api_key),
-            ("Kimi", settings.kimi_api_key),
-            ("OpenRouter", settings.openrouter_api_key),
-        ]:
-            status = "[green]OK[/green]" if key and key.get_secret_value() else "[red]Missing[/red]"
-            table.add_row(provider, status)
-        console.print()
-        console.print(table)
-        console.print()
+        for provider, configured in settings.configured_providers.items():
+            status = "[green]OK[/green]" if configured else "[red]Missing[/red]"
+            table.add_row(PROVIDER_LABELS[provider], status)
+        renderables += [table, ""]
 
         table = Table(title="Effective Routing")
         table.add_column("Role", style="cyan")
@@ -258,8 +377,7 @@ def config():
         ]:
             provider, model = AgentFactory.get_role_runtime_config(role)
             table.add_row(role_name, model, provider.value)
-        console.print(table)
-        console.print()
+        renderables += [table, ""]
 
         table = Table(title="Tool Access")
         table.add_column("Tool Set", style="cyan")
@@ -273,8 +391,7 @@ def config():
             ("Cost Saver", settings.cost_saver_enabled),
         ]:
             table.add_row(name, "[green]enabled[/green]" if enabled else "[yellow]disabled[/yellow]")
-        console.print(table)
-        console.print()
+        renderables += [table, ""]
 
         if settings.role_model_overrides or settings.role_provider_overrides:
             table = Table(title="Override Maps")
@@ -282,8 +399,9 @@ def config():
             table.add_column("Value", style="white")
             table.add_row("role_model_overrides", str(settings.role_model_overrides))
             table.add_row("role_provider_overrides", str(settings.role_provider_overrides))
-            console.print(table)
-            console.print()
+            renderables += [table, ""]
+
+        console.print(Group(*renderables))
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
         sys.exit(1)
@@ -294,8 +412,12 @@ def config():
 @click.pass_context
 def chat(ctx, role):
     """Start interactive chat with a team member."""
+    from agents.factory import Role
+
+    console = _console()
+
     verbose = ctx.obj.get("verbose", False)
-    orchestrator = get_orchestrator(verbose)
+    orchestrator = None
     role_enum = Role(role)
 
     console.print(f"\n[bold green]Chatting with {role}[/bold green]")
@@ -308,11 +430,10 @@ def chat(ctx, role):
                 break
             if not user_input.strip():
                 continue
-            with console.status("[bold blue]Thinking...[/bold blue]"):
-                response = orchestrator.ask(role_enum, user_input, include_history=True)
-            console.print()
-            console.print(Panel(Markdown(response.content), title=f"[bold green]{role.upper()}[/bold green]"))
-            console.print()
+            if orchestrator is None:
+                # Built on the first message so the prompt appears immediately
+                orchestrator = get_orchestrator(verbose, ctx.obj.get("use_cache", True))
+            _stream_answer(orchestrator, role_enum, user_input, include_history=True, padded=True)
         except KeyboardInterrupt:
             break
         except Exception as e:
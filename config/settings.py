@@ -1,9 +1,14 @@
 """CLAI Configuration - API keys and model settings."""
 import json
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, List, Optional, Tuple, Type
+from pydantic_settings import (
+    BaseSettings,
+    PydanticBaseSettingsSource,
+    SettingsConfigDict,
+    TomlConfigSettingsSource,
+)
 from pydantic import Field, SecretStr, field_validator
 
 
@@ -11,6 +16,22 @@ OVERRIDES_META_KEY = "__meta__"
 OVERRIDES_TOOLS_KEY = "__tools__"
 OVERRIDES_COST_SAVING_KEY = "__cost_saving__"
 
+# Provider name -> Settings field holding its API key.
+API_KEY_FIELDS: Dict[str, str] = {
+    "anthropic": "anthropic_api_key",
+    "openai": "openai_api_key",
+    "google": "google_api_key",
+    "kimi": "kimi_api_key",
+    "openrouter": "openrouter_api_key",
+}
+PROVIDER_LABELS: Dict[str, str] = {
+    "anthropic": "Anthropic",
+    "openai": "OpenAI",
+    "google": "Google",
+    "kimi": "Kimi",
+    "openrouter": "OpenRouter",
+}
+
 
 def _coerce_bool(value) -> bool:
     if isinstance(value, bool):
@@ -24,10 +45,30 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
+        toml_file="clai.toml",
         case_sensitive=False,
         extra="ignore"
     )
 
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: Type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> Tuple[PydanticBaseSettingsSource, ...]:
+        # clai.toml (parsed by the C tomllib) sits between real environment
+        # variables and the legacy .env file.
+        return (
+            init_settings,
+            env_settings,
+            TomlConfigSettingsSource(settings_cls),
+            dotenv_settings,
+            file_secret_settings,
+        )
+
     anthropic_api_key: Optional[SecretStr] = Field(default=None)
     openai_api_key: Optional[SecretStr] = Field(default=None)
     google_api_key: Optional[SecretStr] = Field(default=None)
@@ -74,6 +115,48 @@ class Settings(BaseSettings):
     anthropic_tool_result_char_limit: int = 2500
     anthropic_total_input_char_budget: int = 24000
     anthropic_total_input_char_budget_retry: int = 12000
+    # Mark the system prompt and stable history prefix with cache_control so
+    # Anthropic serves them from its prompt cache (prompts under the model's
+    # minimum cacheable length are simply not cached).
+    anthropic_prompt_caching: bool = True
+
+    # Connection pool shared by all async provider clients.
+    http_max_connections: int = 200
+    http_max_keepalive_connections: int = 40
+    http_timeout: float = 300.0
+
+    # Exact-match cache of agent responses (same model, prompt and history).
+    # Off by default: with a non-zero temperature a repeated prompt is
+    # expected to get a fresh answer, not a replay of the last one.
+    response_cache_enabled: bool = False
+    response_cache_max_entries: int = 256
+    response_cache_ttl_seconds: float = 600.0
+    # Optional SQLite file (e.g. ~/.clai/cache.db) backing the response cache
+    # so hits survive across CLI runs. Unset keeps the cache in memory only.
+    response_cache_path: Optional[str] = None
+
+    # Also serve single-turn prompts that are near-duplicates of a cached one
+    # (character-trigram cosine similarity >= threshold). Off by default: a
+    # hit answers a prompt that was not asked verbatim.
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.95
+
+    # @all broadcasts: roles routed to the same provider and model share one
+    # request that answers for all of them (as a JSON object), instead of one
+    # request each. Off by default: those roles answer without their tools.
+    broadcast_combine_same_model: bool = False
+
+    # Fire a duplicate async request when one runs past the model's median
+    # latency and keep whichever finishes first. Costs extra tokens.
+    request_hedging_enabled: bool = False
+
+    # Oldest chat history is dropped once a request would exceed this many
+    # (estimated) tokens, including the system prompt and the reply budget.
+    max_context_tokens: int = 128_000
+
+    # Keep the provider SDK response object on AgentResponse.raw_response
+    # (debugging only; it is large and lives as long as the response).
+    keep_raw_response: bool = False
     
     mcp_enabled: bool = True
     mcp_workspace_root: str = "./workspace"
@@ -124,9 +207,39 @@ class Settings(BaseSettings):
 
     def resolve_role_provider(self, role_key: str, default: str) -> str:
         return self.role_provider_overrides.get(role_key.lower(), default)
+
+    @cached_property
+    def api_keys(self) -> Dict[str, str]:
+        """Provider name -> plain key string ("" when unset), revealed once.
+
+        Keys don't change after load; callers use this instead of unwrapping
+        the SecretStr fields each time. Never log the returned values.
+        """
+        keys = {}
+        for provider, field in API_KEY_FIELDS.items():
+            secret = getattr(self, field)
+            keys[provider] = secret.get_secret_value() if secret else ""
+        return keys
+
+    def require_api_key(self, provider: str) -> str:
+        """Return *provider*'s API key, raising only when that provider is actually used.
+
+        Keys are optional at load time so a partial configuration (say, only
+        Anthropic) never fails on commands that don't touch the other providers.
+        """
+        value = self.api_keys[provider]
+        if not value:
+            raise RuntimeError(f"{API_KEY_FIELDS[provider].upper()} is not set. Add it to your .env file.")
+        return value
+
+    @cached_property
+    def configured_providers(self) -> Dict[str, bool]:
+        """Provider name -> whether its API key is set."""
+        return {provider: bool(key) for provider, key in self.api_keys.items()}
     
-    @property
+    @cached_property
     def workspace_path(self) -> Path:
+        """Resolved workspace root, created on first access."""
         path = Path(self.mcp_workspace_root).resolve()
         path.mkdir(parents=True, exist_ok=True)
         return path
@@ -151,7 +264,7 @@ def _load_overrides() -> Dict[str, dict]:
         return {}
 
 
-@lru_cache
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     settings = Settings()
     # Merge file-based overrides on top of env-based overrides
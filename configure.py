@@ -13,14 +13,21 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from cli import main, cli
 
-# Add shell command to CLI
-@cli.command()
-def shell():
-    """Launch the interactive CLAI shell UI."""
-    from shell import main as shell_main
-    shell_main()
+def main():
+    # Imported here so loading this module stays cheap; each subcommand
+    # pulls in settings, agents and the orchestrator only when it runs.
+    import click
+    from cli import cli
+
+    @click.command()
+    def shell():
+        """Launch the interactive CLAI shell UI."""
+        from shell import main as shell_main
+        shell_main()
+
+    cli.add_command(shell)
+    cli(obj={})
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
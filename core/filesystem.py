@@ -1,15 +1,18 @@
 """Sandboxed filesystem operations."""
 import os
+import re
 import shutil
 import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
 from config import get_settings
 
 
-@dataclass
+@dataclass(slots=True)
 class FileInfo:
     path: str
     name: str
@@ -17,31 +20,197 @@ class FileInfo:
     size: int = 0
     
     def __str__(self) -> str:
-        prefix = "[DIR] " if self.is_dir else "[FILE]"
-        size_str = f" ({self.size} bytes)" if not self.is_dir else ""
-        return f"{prefix} {self.name}{size_str}"
+        # Plain concatenation: rendered once per entry in large listings
+        if self.is_dir:
+            return "[DIR]  " + self.name
+        return "[FILE] " + self.name + " (" + str(self.size) + " bytes)"
 
 
-@dataclass 
+@dataclass(slots=True)
 class OperationResult:
     success: bool
     message: str
     data: Optional[str] = None
 
 
+@lru_cache(maxsize=128)
+def _compile_glob(pattern: str) -> Callable[[str], Optional[re.Match]]:
+    """fnmatch *pattern* compiled once, instead of per filename."""
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    return re.compile(fnmatch.translate(pattern), flags).match
+
+
+# Dependency, build and cache directories that are never worth searching.
+# Hidden directories (.git, .venv, ...) are skipped separately.
+_SKIP_DIRS = frozenset({"node_modules", "__pycache__", "venv", "dist", "build"})
+
+
+def walk_files(
+    root: str, name_matches: Callable[[str], object], max_depth: Optional[int] = None
+) -> Iterator[os.DirEntry]:
+    """Yield files under *root* whose name matches.
+
+    Hidden directories and _SKIP_DIRS are pruned before they are scanned,
+    as is anything more than *max_depth* directories below *root*.
+
+    Uses os.scandir directly: directory entries carry their type, so no
+    per-file stat() is needed to tell files from directories.
+    """
+    stack = [(root, 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        descend = max_depth is None or depth < max_depth
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                name = entry.name
+                if descend and name not in _SKIP_DIRS and not name.startswith("."):
+                    subdirs.append((entry.path, depth + 1))
+            elif name_matches(entry.name) and entry.is_file():
+                yield entry
+        # Reversed so directories are visited in listing order
+        stack.extend(reversed(subdirs))
+
+
+def _write_bytes(path: str, data: bytes, append: bool = False) -> None:
+    """Write *data* straight to a file descriptor, no buffered text layer."""
+    flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+    flags |= os.O_APPEND if append else os.O_TRUNC
+    fd = os.open(path, flags, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+# Project template file bodies; str bodies are formatted with the project name
+_README_TEMPLATE = "# {name}\n\nProject created by CLAI.\n"
+_PACKAGE_JSON_TEMPLATE = '{{\n  "name": "{name}",\n  "version": "1.0.0",\n  "main": "src/index.js"\n}}\n'
+_INIT_PY_TEMPLATE = '"""{name} package."""\n'
+_GITIGNORE_BASIC = b"*.pyc\n__pycache__/\n.env\n"
+_GITIGNORE_PYTHON = b"*.pyc\n__pycache__/\nvenv/\n.venv/\n.env\n"
+_GITIGNORE_NODE = b"node_modules/\n.env\n"
+_MAIN_PY = b'def main():\n    print("Hello from CLAI!")\n\nif __name__ == "__main__":\n    main()\n'
+_TEST_MAIN_PY = b"def test_placeholder():\n    assert True\n"
+_INDEX_JS = b'console.log("Hello from CLAI!");\n'
+
+TemplateFile = Tuple[str, str | bytes]  # (path relative to the project, body)
+
+_PROJECT_TEMPLATES: Dict[str, List[TemplateFile]] = {
+    "basic": [
+        ("README.md", _README_TEMPLATE),
+        (".gitignore", _GITIGNORE_BASIC),
+    ],
+    "python": [
+        ("README.md", _README_TEMPLATE),
+        (".gitignore", _GITIGNORE_PYTHON),
+        ("requirements.txt", b""),
+        ("src/__init__.py", _INIT_PY_TEMPLATE),
+        ("src/main.py", _MAIN_PY),
+        ("tests/__init__.py", b""),
+        ("tests/test_main.py", _TEST_MAIN_PY),
+    ],
+    "node": [
+        ("README.md", _README_TEMPLATE),
+        (".gitignore", _GITIGNORE_NODE),
+        ("package.json", _PACKAGE_JSON_TEMPLATE),
+        ("src/index.js", _INDEX_JS),
+    ],
+}
+
+_BINARY_SNIFF_BYTES = 8192
+# Below this many files a thread pool costs more than it saves
+_PARALLEL_MIN_FILES = 16
+_IO_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _decode_text(data: bytes) -> Optional[str]:
+    """UTF-8 text with universal newlines, or None for binary data."""
+    if b"\0" in data[:_BINARY_SNIFF_BYTES]:
+        return None
+    try:
+        content = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if "\r" in content:
+        # Same universal-newline translation read_text() applied
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+def _map_files(func: Callable, items: Sequence) -> List:
+    """map() over file paths, on a thread pool once there are enough of them.
+
+    File reads release the GIL, so the calls overlap on I/O; results keep
+    the input order.
+    """
+    if len(items) < _PARALLEL_MIN_FILES:
+        return list(map(func, items))
+    with ThreadPoolExecutor(max_workers=_IO_MAX_WORKERS) as pool:
+        return list(pool.map(func, items))
+
+
+def read_text_files(paths: Sequence[str]) -> List[Optional[str]]:
+    """Read many text files concurrently, in order; None for unreadable or binary ones."""
+
+    def read(path: str) -> Optional[str]:
+        try:
+            with open(path, "rb") as f:
+                return _decode_text(f.read())
+        except OSError:
+            return None
+
+    return _map_files(read, paths)
+
+
+def _grep_file(path: str, rel_path: str, search: Callable[[bytes], object]) -> List[str]:
+    """Return ``rel:line:text`` hits for one file; binary files yield nothing.
+
+    Lines are matched as raw bytes and only decoded when they hit.
+    """
+    matches = []
+    with open(path, "rb", buffering=1 << 20) as f:
+        if b"\0" in f.read(_BINARY_SNIFF_BYTES):
+            return matches
+        f.seek(0)
+        for line_num, line in enumerate(f, 1):
+            if search(line):
+                matches.append(f"{rel_path}:{line_num}:{line.decode('utf-8', 'replace').strip()}")
+    return matches
+
+
+def _compile_search(search_term: str) -> Callable[[bytes], object]:
+    """Case-insensitive substring test over a raw line."""
+    if search_term.isascii():
+        return re.compile(re.escape(search_term.encode("ascii")), re.IGNORECASE).search
+    # Non-ASCII terms need Unicode case folding, so decode first
+    pattern = re.compile(re.escape(search_term), re.IGNORECASE)
+    return lambda line: pattern.search(line.decode("utf-8", "replace"))
+
+
 class FileSystemTools:
     def __init__(self, workspace_root: str | None = None):
         if workspace_root:
             self.workspace_root = Path(workspace_root).resolve()
+            self._ensure_workspace()
         else:
-            settings = get_settings()
-            self.workspace_root = settings.workspace_path
-        self._ensure_workspace()
+            # Settings.workspace_path already creates the directory
+            self.workspace_root = get_settings().workspace_path
+        # (workspace root, root st_mtime_ns, project names) from the last scan
+        self._projects_cache: Optional[Tuple[Path, int, List[str]]] = None
 
     def set_workspace_root(self, path: str) -> None:
         """Change the workspace root at runtime."""
         self.workspace_root = Path(path).resolve()
         self._ensure_workspace()
+        self._projects_cache = None
     
     def _ensure_workspace(self) -> None:
         self.workspace_root.mkdir(parents=True, exist_ok=True)
@@ -62,46 +231,36 @@ class FileSystemTools:
                 return OperationResult(False, f"Project '{project_name}' already exists")
             
             project_path.mkdir(parents=True)
+            self._projects_cache = None
             
-            if template == "python":
-                self._apply_python_template(project_path, project_name)
-            elif template == "node":
-                self._apply_node_template(project_path, project_name)
-            elif template == "basic":
-                self._apply_basic_template(project_path, project_name)
+            files = _PROJECT_TEMPLATES.get(template)
+            if files:
+                self._apply_template(project_path, project_name, files)
             
             return OperationResult(True, f"Created project '{project_name}'", str(project_path))
         except Exception as e:
             return OperationResult(False, str(e))
     
-    def _apply_basic_template(self, path: Path, name: str) -> None:
-        (path / "README.md").write_text(f"# {name}\n\nProject created by CLAI.\n")
-        (path / ".gitignore").write_text("*.pyc\n__pycache__/\n.env\n")
-    
-    def _apply_python_template(self, path: Path, name: str) -> None:
-        self._apply_basic_template(path, name)
-        src_dir = path / "src"
-        src_dir.mkdir()
-        (src_dir / "__init__.py").write_text(f'"""{name} package."""\n')
-        (src_dir / "main.py").write_text('def main():\n    print("Hello from CLAI!")\n\nif __name__ == "__main__":\n    main()\n')
-        tests_dir = path / "tests"
-        tests_dir.mkdir()
-        (tests_dir / "__init__.py").write_text("")
-        (tests_dir / "test_main.py").write_text("def test_placeholder():\n    assert True\n")
-        (path / "requirements.txt").write_text("")
-        (path / ".gitignore").write_text("*.pyc\n__pycache__/\nvenv/\n.venv/\n.env\n")
-    
-    def _apply_node_template(self, path: Path, name: str) -> None:
-        self._apply_basic_template(path, name)
-        package_json = f'{{\n  "name": "{name}",\n  "version": "1.0.0",\n  "main": "src/index.js"\n}}\n'
-        (path / "package.json").write_text(package_json)
-        src_dir = path / "src"
-        src_dir.mkdir()
-        (src_dir / "index.js").write_text('console.log("Hello from CLAI!");\n')
-        (path / ".gitignore").write_text("node_modules/\n.env\n")
+    @staticmethod
+    def _apply_template(path: Path, name: str, files: List[TemplateFile]) -> None:
+        """Write *files* under *path*, creating each parent directory once."""
+        root = str(path)
+        for subdir in sorted({os.path.dirname(rel) for rel, _ in files} - {""}):
+            os.makedirs(os.path.join(root, subdir), exist_ok=True)
+        for rel, body in files:
+            data = body.format(name=name).encode("utf-8") if isinstance(body, str) else body
+            _write_bytes(os.path.join(root, rel), data)
     
     def list_projects(self) -> List[str]:
-        return sorted([d.name for d in self.workspace_root.iterdir() if d.is_dir() and not d.name.startswith(".")])
+        # Adding or removing a project bumps the root's mtime, so an unchanged
+        # mtime means the cached listing is still current.
+        mtime_ns = os.stat(self.workspace_root).st_mtime_ns
+        cached = self._projects_cache
+        if cached is not None and cached[0] == self.workspace_root and cached[1] == mtime_ns:
+            return list(cached[2])
+        projects = sorted([d.name for d in self.workspace_root.iterdir() if d.is_dir() and not d.name.startswith(".")])
+        self._projects_cache = (self.workspace_root, mtime_ns, projects)
+        return list(projects)
     
     def delete_project(self, project_name: str) -> OperationResult:
         try:
@@ -111,6 +270,7 @@ class FileSystemTools:
             if not project_path.is_dir():
                 return OperationResult(False, f"'{project_name}' is not a directory")
             shutil.rmtree(project_path)
+            self._projects_cache = None
             return OperationResult(True, f"Deleted project '{project_name}'")
         except Exception as e:
             return OperationResult(False, str(e))
@@ -122,28 +282,35 @@ class FileSystemTools:
                 return OperationResult(False, f"File not found: {file_path}")
             if not full_path.is_file():
                 return OperationResult(False, f"Not a file: {file_path}")
-            content = full_path.read_text(encoding="utf-8")
-            return OperationResult(True, f"Read {len(content)} bytes", content)
-        except UnicodeDecodeError:
-            return OperationResult(False, f"Cannot read binary file: {file_path}")
+            with open(full_path, "rb") as f:
+                data = f.read()
+            content = _decode_text(data)
+            if content is None:
+                return OperationResult(False, f"Cannot read binary file: {file_path}")
+            return OperationResult(True, f"Read {len(data)} bytes", content)
         except Exception as e:
             return OperationResult(False, str(e))
+
+    def read_many(self, file_paths: Sequence[str]) -> Dict[str, OperationResult]:
+        """read_file() for several paths, overlapping the reads."""
+        return dict(zip(file_paths, _map_files(self.read_file, list(file_paths))))
     
     def write_file(self, file_path: str, content: str) -> OperationResult:
         try:
             full_path = self._resolve_path(file_path)
             full_path.parent.mkdir(parents=True, exist_ok=True)
-            full_path.write_text(content, encoding="utf-8")
-            return OperationResult(True, f"Wrote {len(content)} bytes", str(full_path))
+            data = content.encode("utf-8")
+            _write_bytes(str(full_path), data)
+            return OperationResult(True, f"Wrote {len(data)} bytes", str(full_path))
         except Exception as e:
             return OperationResult(False, str(e))
     
     def append_file(self, file_path: str, content: str) -> OperationResult:
         try:
             full_path = self._resolve_path(file_path)
-            with open(full_path, "a", encoding="utf-8") as f:
-                f.write(content)
-            return OperationResult(True, f"Appended {len(content)} bytes")
+            data = content.encode("utf-8")
+            _write_bytes(str(full_path), data, append=True)
+            return OperationResult(True, f"Appended {len(data)} bytes")
         except Exception as e:
             return OperationResult(False, str(e))
     
@@ -164,14 +331,18 @@ class FileSystemTools:
             full_path = self._resolve_path(dir_path)
             if not full_path.exists() or not full_path.is_dir():
                 return []
+            root = str(self.workspace_root)
+            with os.scandir(full_path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+            # DirEntry caches its type, so only regular files cost a stat()
             return [
                 FileInfo(
-                    path=str(item.relative_to(self.workspace_root)),
-                    name=item.name,
-                    is_dir=item.is_dir(),
-                    size=item.stat().st_size if item.is_file() else 0
+                    path=os.path.relpath(entry.path, root),
+                    name=entry.name,
+                    is_dir=entry.is_dir(),
+                    size=entry.stat().st_size if entry.is_file() else 0
                 )
-                for item in sorted(full_path.iterdir())
+                for entry in entries
             ]
         except Exception:
             return []
@@ -198,59 +369,65 @@ class FileSystemTools:
     def _build_tree(self, path: Path, prefix: str, lines: List[str], max_depth: int, depth: int) -> None:
         if depth >= max_depth:
             return
-        items = sorted(path.iterdir(), key=lambda x: (not x.is_dir(), x.name))
-        for i, item in enumerate(items):
-            is_last = i == len(items) - 1
+        # Explicit stack of (entry, prefix, is_last, depth); children are
+        # pushed in reverse so they pop in display order.
+        stack = [
+            (entry, prefix, is_last, depth)
+            for entry, is_last in reversed(self._tree_children(str(path)))
+        ]
+        while stack:
+            entry, prefix, is_last, depth = stack.pop()
             connector = "└── " if is_last else "├── "
-            if item.is_dir():
-                lines.append(f"{prefix}{connector}{item.name}/")
-                new_prefix = prefix + ("    " if is_last else "│   ")
-                self._build_tree(item, new_prefix, lines, max_depth, depth + 1)
+            if entry.is_dir():
+                lines.append(f"{prefix}{connector}{entry.name}/")
+                if depth + 1 < max_depth:
+                    child_prefix = prefix + ("    " if is_last else "│   ")
+                    stack.extend(
+                        (child, child_prefix, child_is_last, depth + 1)
+                        for child, child_is_last in reversed(self._tree_children(entry.path))
+                    )
             else:
-                lines.append(f"{prefix}{connector}{item.name}")
+                lines.append(f"{prefix}{connector}{entry.name}")
+
+    @staticmethod
+    def _tree_children(path: str) -> List[Tuple[os.DirEntry, bool]]:
+        """Directory entries, directories first, each paired with is_last."""
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda entry: (not entry.is_dir(), entry.name))
+        last = len(entries) - 1
+        return [(entry, i == last) for i, entry in enumerate(entries)]
     
     def search_files(self, pattern: str, dir_path: str = ".") -> List[str]:
         try:
             full_path = self._resolve_path(dir_path)
-            matches = []
-            for root, dirs, files in os.walk(full_path):
-                dirs[:] = [d for d in dirs if not d.startswith(".")]
-                for filename in files:
-                    if fnmatch.fnmatch(filename, pattern):
-                        file_path = Path(root) / filename
-                        matches.append(str(file_path.relative_to(self.workspace_root)))
-            return sorted(matches)
+            root = str(self.workspace_root)
+            return sorted(
+                os.path.relpath(entry.path, root)
+                for entry in walk_files(str(full_path), _compile_glob(pattern))
+            )
         except Exception:
             return []
     
     def grep(self, search_term: str, dir_path: str = ".", file_pattern: str = "*") -> List[str]:
         try:
             full_path = self._resolve_path(dir_path)
-            matches = []
-            for root, dirs, files in os.walk(full_path):
-                dirs[:] = [d for d in dirs if not d.startswith(".")]
-                for filename in files:
-                    if not fnmatch.fnmatch(filename, file_pattern):
-                        continue
-                    file_path = Path(root) / filename
-                    try:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            for line_num, line in enumerate(f, 1):
-                                if search_term.lower() in line.lower():
-                                    rel_path = str(file_path.relative_to(self.workspace_root))
-                                    matches.append(f"{rel_path}:{line_num}:{line.strip()}")
-                    except (UnicodeDecodeError, PermissionError):
-                        continue
-            return matches
-        except Exception:
-            return []
+            root = str(self.workspace_root)
+            search = _compile_search(search_term)
+            paths = [entry.path for entry in walk_files(str(full_path), _compile_glob(file_pattern))]
 
+            def scan(path: str) -> List[str]:
+                try:
+                    return _grep_file(path, os.path.relpath(path, root), search)
+                except OSError:
+                    return []
 
-_fs_instance: Optional[FileSystemTools] = None
+            per_file = _map_files(scan, paths)
+            return [match for file_matches in per_file for match in file_matches]
+        except Exception:
+            return []
 
 
+@lru_cache(maxsize=None)
 def get_filesystem() -> FileSystemTools:
-    global _fs_instance
-    if _fs_instance is None:
-        _fs_instance = FileSystemTools()
-    return _fs_instance
+    """Process-wide FileSystemTools instance."""
+    return FileSystemTools()
@@ -1,9 +1,18 @@
 """Orchestrator - coordinates multi-agent workflows and stages."""
-from typing import Any, Dict, List, Optional, Tuple
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import replace
+from hashlib import blake2b
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+import asyncio
 import logging
+import re
+import sys
+import threading
+import time
 
 from agents import AgentFactory, AgentResponse, BaseAgent
+from agents._json import dumps_bytes, loads
 from agents.factory import Role
 from config import get_settings
 from .workflows import WorkflowStatus, WorkflowStep, WorkflowResult
@@ -14,6 +23,38 @@ from .scratchpad import Scratchpad, build_scratchpad_registry
 from .routing import DEFAULT_FALLBACKS, _is_retriable_error, FallbackEvent
 
 logger = logging.getLogger(__name__)
+# Step-by-step progress, logged at DEBUG
+progress_logger = logging.getLogger("clai.orchestrator")
+_verbose_progress_logger: Optional[logging.Logger] = None
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at emit time (it may be redirected)."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value) -> None:
+        pass
+
+
+def _get_verbose_progress_logger() -> logging.Logger:
+    """Standalone logger printing progress to stdout for verbose orchestrators.
+
+    It is not part of the logging hierarchy, so enabling it leaves the
+    "clai.orchestrator" logger (and every non-verbose Orchestrator) alone.
+    """
+    global _verbose_progress_logger
+    if _verbose_progress_logger is None:
+        verbose_logger = logging.Logger("clai.orchestrator.verbose", logging.DEBUG)
+        handler = _StdoutHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        verbose_logger.addHandler(handler)
+        _verbose_progress_logger = verbose_logger
+    return _verbose_progress_logger
+
 
 # Roles that receive filesystem tools
 _FS_TOOL_ROLES = {
@@ -26,12 +67,43 @@ _FS_TOOL_ROLES = {
     Role.REVIEWER,
 }
 
+# {name} placeholders in workflow step instructions
+_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+_DEP_CONTEXT_HEADER = "\n\n---\nPrevious outputs:\n"
+_COORDINATION_RULES = (
+    "\n\n---\nCoordination rules:\n"
+    "- Explicitly reference at least one depended step.\n"
+    "- State how your output aligns or disagrees with prior roles.\n"
+    "- Keep response actionable and concise.\n"
+)
+
+# Completed workflow results kept for identical re-runs (per orchestrator)
+_WORKFLOW_CACHE_MAX_ENTRIES = 32
+# How long a failed workflow waits for sibling steps already mid-request
+_CANCEL_DRAIN_SECONDS = 2.0
+
+_COMBINED_ROLES_HEADER = (
+    "You are answering as several members of a software team at once. Each "
+    "member's brief is in a <role> block below. Answer the user's message once "
+    "for every role, in that role's voice and within its brief. Reply with only "
+    "a JSON object mapping each role name to its answer as a Markdown string.\n\n"
+)
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
 
 class Orchestrator:
-    def __init__(self, verbose: bool = False, workspace_root: Optional[str] = None):
+    def __init__(self, verbose: bool = False, workspace_root: Optional[str] = None, use_cache: bool = True):
         self.verbose = verbose
+        # False bypasses the response and workflow caches for this orchestrator
+        self._use_cache = use_cache
+        self._progress = _get_verbose_progress_logger() if verbose else progress_logger
         self._agents: Dict[Role, BaseAgent] = {}
+        # Guards _agents: consult_team builds agents from worker threads
+        self._agents_lock = threading.Lock()
+        # One worker per role; threads are only started on first use
+        self._pool = ThreadPoolExecutor(max_workers=len(Role), thread_name_prefix="clai-team")
         self._workflows: Dict[str, List[WorkflowStep]] = {}
+        self._workflow_cache: "OrderedDict[str, WorkflowResult]" = OrderedDict()
         self._stages: Dict[str, Dict[str, str]] = {}
         self._extra_registries: Dict[Role, ToolRegistry] = {}
         self._scratchpad = Scratchpad()
@@ -65,6 +137,21 @@ class Orchestrator:
         self._register_default_workflows()
         self._register_default_stages()
 
+    def close(self) -> None:
+        """Disconnect the GitHub MCP server and stop the worker threads.
+
+        The orchestrator must not be used afterwards.
+        """
+        self._github_registries.clear()
+        self._github_mcp_initialized = False
+        client, self._github_client = self._github_client, None
+        if client is not None:
+            try:
+                client.disconnect_sync()
+            except Exception as e:
+                logger.debug(f"GitHub MCP disconnect failed: {e}")
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
     def _init_extra_tools(self, settings) -> None:
         """Initialize Excel, test runner, and GitHub MCP tools."""
         # Excel test plan tool (always available if openpyxl is installed)
@@ -228,12 +315,53 @@ class Orchestrator:
         return registry if registry else None
 
     def _get_agent(self, role: Role) -> BaseAgent:
-        if role not in self._agents:
-            tool_registry = self._build_tool_registry(role)
-            self._agents[role] = AgentFactory.create_by_role(
-                role, tool_registry=tool_registry
-            )
-        return self._agents[role]
+        agent = self._agents.get(role)
+        if agent is not None:
+            return agent
+        with self._agents_lock:
+            if role not in self._agents:
+                tool_registry = self._build_tool_registry(role)
+                self._agents[role] = self._apply_cache_policy(
+                    AgentFactory.create_by_role(role, tool_registry=tool_registry)
+                )
+            return self._agents[role]
+
+    def _apply_cache_policy(self, agent: BaseAgent) -> BaseAgent:
+        agent.use_response_cache = self._use_cache
+        return agent
+
+    def prewarm(self, workflow_name: Optional[str] = None, asynchronous: bool = False) -> None:
+        """Build the agents for *workflow_name* (default: every role) in parallel.
+
+        Agent construction and the provider client (SDK import, auth) happen
+        up front instead of on the first step's critical path. Pass
+        *asynchronous* to warm the async clients that ask_async() and
+        run_workflow_async() use. Failures are left for the step that uses
+        the role to report.
+        """
+        if workflow_name is None:
+            roles: List[Role] = list(Role)
+        else:
+            roles = list(dict.fromkeys(step.role for step in self._workflows.get(workflow_name, [])))
+        pending = [role for role in roles if self._needs_warming(role, asynchronous)]
+        if pending:
+            wait([self._pool.submit(self._warm_agent, role, asynchronous) for role in pending])
+
+    def _needs_warming(self, role: Role, asynchronous: bool) -> bool:
+        agent = self._agents.get(role)
+        if agent is None:
+            return True
+        return (agent._async_client if asynchronous else agent._client) is None
+
+    def _warm_agent(self, role: Role, asynchronous: bool = False) -> None:
+        try:
+            agent = self._get_agent(role)
+            if asynchronous:
+                agent._initialize_async_client()
+            elif agent._client is None:
+                agent._initialize_client()
+        except Exception as e:
+            logger.debug(f"Prewarming {role.value} failed: {e}")
 
     def _ask_with_limits(
         self,
@@ -243,64 +371,120 @@ class Orchestrator:
         temperature: Optional[float] = None,
     ) -> AgentResponse:
         """Use a short-lived agent instance for budgeted stage turns."""
-        agent = AgentFactory.create_by_role(
+        agent = self._apply_cache_policy(AgentFactory.create_by_role(
             role=role,
             max_tokens=max_tokens,
             temperature=temperature,
-        )
-        if self.verbose:
-            print(f"[{role.value}] Stage turn...")
+        ))
+        self._progress.debug("[%s] Stage turn...", role.value)
         return agent.chat(prompt, include_history=False)
     
     def ask(self, role: Role, prompt: str, include_history: bool = False) -> AgentResponse:
         agent = self._get_agent(role)
-        if self.verbose:
-            print(f"[{role.value}] Processing...")
+        self._progress.debug("[%s] Processing...", role.value)
 
         try:
             response = agent.chat(prompt, include_history=include_history)
         except Exception as exc:
-            if not _is_retriable_error(exc):
+            if not _is_retriable_error(exc) or not DEFAULT_FALLBACKS.get(role):
                 raise
 
             # Try fallback providers
-            fallbacks = DEFAULT_FALLBACKS.get(role, [])
-            if not fallbacks:
+            for fb_provider, fb_model in self._fallback_targets(role, exc):
+                try:
+                    fb_agent = self._create_fallback_agent(role, agent, fb_provider, fb_model)
+                    response = fb_agent.chat(prompt, include_history=False)
+                    logger.info(
+                        "[%s] Fallback to %s/%s succeeded",
+                        role.value, fb_provider.value, fb_model,
+                    )
+                    break
+                except Exception as fb_exc:
+                    if not _is_retriable_error(fb_exc):
+                        raise
+                    logger.warning(
+                        "[%s] Fallback %s/%s also failed: %s",
+                        role.value, fb_provider.value, fb_model, fb_exc,
+                    )
+                    continue
+            else:
+                # All fallbacks exhausted
                 raise
 
-            from agents.factory import Provider
-            primary_provider, primary_model = AgentFactory.get_role_runtime_config(role)
-            logger.warning(
-                "[%s] Primary provider %s failed (%s), trying fallbacks...",
-                role.value, primary_provider.value, exc,
-            )
+        self._progress.debug("[%s] Done (%s tokens)", role.value, response.total_tokens)
+        return response
+
+    def ask_stream(
+        self,
+        role: Role,
+        prompt: str,
+        on_text: Callable[[str], None],
+        include_history: bool = False,
+    ) -> AgentResponse:
+        """Like ask(), but hands text chunks to *on_text* as they arrive.
+
+        Fallback providers are only tried if the primary failed before
+        emitting anything; a half-printed answer is not silently replaced.
+        """
+        agent = self._get_agent(role)
+        self._progress.debug("[%s] Processing...", role.value)
+
+        emitted = False
 
-            for fb_provider, fb_model in fallbacks:
+        def _consume(stream) -> AgentResponse:
+            nonlocal emitted
+            try:
+                while True:
+                    chunk = next(stream)
+                    emitted = True
+                    on_text(chunk)
+            except StopIteration as stop:
+                return stop.value
+
+        try:
+            response = _consume(agent.stream_chat(prompt, include_history=include_history))
+        except Exception as exc:
+            if emitted or not _is_retriable_error(exc) or not DEFAULT_FALLBACKS.get(role):
+                raise
+
+            for fb_provider, fb_model in self._fallback_targets(role, exc):
                 try:
-                    if self.verbose:
-                        print(f"[{role.value}] Falling back to {fb_provider.value}/{fb_model}...")
-
-                    if self._on_fallback:
-                        self._on_fallback(FallbackEvent(
-                            role=role.value,
-                            from_provider=primary_provider.value,
-                            from_model=primary_model,
-                            to_provider=fb_provider.value,
-                            to_model=fb_model,
-                            reason=str(exc)[:200],
-                            attempt=1,
-                        ))
-
-                    tool_registry = self._build_tool_registry(role)
-                    fb_agent = AgentFactory.create_by_provider(
-                        provider=fb_provider,
-                        model=fb_model,
-                        system_prompt=agent.system_prompt,
-                        max_tokens=agent.max_tokens,
-                        temperature=agent.temperature,
-                        tool_registry=tool_registry,
+                    fb_agent = self._create_fallback_agent(role, agent, fb_provider, fb_model)
+                    response = _consume(fb_agent.stream_chat(prompt, include_history=False))
+                    logger.info(
+                        "[%s] Fallback to %s/%s succeeded",
+                        role.value, fb_provider.value, fb_model,
                     )
-                    response = fb_agent.chat(prompt, include_history=False)
+                    break
+                except Exception as fb_exc:
+                    if emitted or not _is_retriable_error(fb_exc):
+                        raise
+                    logger.warning(
+                        "[%s] Fallback %s/%s also failed: %s",
+                        role.value, fb_provider.value, fb_model, fb_exc,
+                    )
+                    continue
+            else:
+                raise
+
+        self._progress.debug("[%s] Done (%s tokens)", role.value, response.total_tokens)
+        return response
+
+    async def ask_async(self, role: Role, prompt: str, include_history: bool = False) -> AgentResponse:
+        """Async version of ask(), with the same provider fallback chain."""
+        agent = self._get_agent(role)
+        self._progress.debug("[%s] Processing...", role.value)
+
+        try:
+            response = await agent.achat(prompt, include_history=include_history)
+        except Exception as exc:
+            if not _is_retriable_error(exc) or not DEFAULT_FALLBACKS.get(role):
+                raise
+
+            for fb_provider, fb_model in self._fallback_targets(role, exc):
+                try:
+                    fb_agent = self._create_fallback_agent(role, agent, fb_provider, fb_model)
+                    response = await fb_agent.achat(prompt, include_history=False)
                     logger.info(
                         "[%s] Fallback to %s/%s succeeded",
                         role.value, fb_provider.value, fb_model,
@@ -315,22 +499,177 @@ class Orchestrator:
                     )
                     continue
             else:
-                # All fallbacks exhausted
                 raise
 
-        if self.verbose:
-            print(f"[{role.value}] Done ({response.total_tokens} tokens)")
+        self._progress.debug("[%s] Done (%s tokens)", role.value, response.total_tokens)
         return response
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the response cache that ask() goes through.
+
+        Agents consult the process-wide exact-match cache (agents.cache) keyed
+        on model, system prompt, sampling settings and the full message list,
+        so repeated prompts (with or without history) skip the provider call.
+        """
+        from agents.cache import get_response_cache
+
+        return get_response_cache().stats()
+
+    def _fallback_targets(self, role: Role, exc: Exception):
+        """Yield (provider, model) fallbacks for *role*, announcing each attempt."""
+        primary_provider, primary_model = AgentFactory.get_role_runtime_config(role)
+        logger.warning(
+            "[%s] Primary provider %s failed (%s), trying fallbacks...",
+            role.value, primary_provider.value, exc,
+        )
+
+        for fb_provider, fb_model in DEFAULT_FALLBACKS.get(role, []):
+            self._progress.debug("[%s] Falling back to %s/%s...", role.value, fb_provider.value, fb_model)
+
+            if self._on_fallback:
+                self._on_fallback(FallbackEvent(
+                    role=role.value,
+                    from_provider=primary_provider.value,
+                    from_model=primary_model,
+                    to_provider=fb_provider.value,
+                    to_model=fb_model,
+                    reason=str(exc)[:200],
+                    attempt=1,
+                ))
+            yield fb_provider, fb_model
+
+    def _create_fallback_agent(
+        self, role: Role, agent: BaseAgent, provider: Any, model: str
+    ) -> BaseAgent:
+        """Build a one-off agent on *provider* carrying the primary agent's settings."""
+        return self._apply_cache_policy(AgentFactory.create_by_provider(
+            provider=provider,
+            model=model,
+            system_prompt=agent.system_prompt,
+            max_tokens=agent.max_tokens,
+            temperature=agent.temperature,
+            tool_registry=self._build_tool_registry(role),
+            prompt_caching=agent.prompt_caching,
+        ))
     
     def consult_team(self, prompt: str, roles: Optional[List[Role]] = None) -> Dict[Role, AgentResponse]:
+        """Ask every role the same question concurrently; results keep *roles* order."""
         if roles is None:
             roles = [Role.BA, Role.QA, Role.SENIOR_DEV, Role.CODER, Role.CODER_2, Role.CODER_3, Role.REVIEWER]
-        results = {}
-        for role in roles:
-            if self.verbose:
-                print(f"Consulting {role.value}...")
-            results[role] = self.ask(role, prompt)
-        return results
+        futures = []
+        # A role listed twice would share one agent across two threads
+        for role in dict.fromkeys(roles):
+            self._progress.debug("Consulting %s...", role.value)
+            futures.append((role, self._pool.submit(self.ask, role, prompt)))
+        return {role: future.result() for role, future in futures}
+
+    async def consult_team_batch(
+        self, prompt: str, roles: Optional[List[Role]] = None
+    ) -> Dict[Role, AgentResponse]:
+        """consult_team() through the providers' batch APIs (one batch per
+        provider, half price) instead of one request per role.
+
+        Batches can take minutes to hours, so this is for offline use only.
+        Await it on the loop that drives the other async calls: the shared
+        async HTTP pool is bound to one event loop.
+        """
+        from agents.batch import BatchProcessor
+
+        if roles is None:
+            roles = [Role.BA, Role.QA, Role.SENIOR_DEV, Role.CODER, Role.CODER_2, Role.CODER_3, Role.REVIEWER]
+        roles = list(dict.fromkeys(roles))
+        self._progress.debug("Submitting batch for %s roles...", len(roles))
+        requests = [(self._get_agent(role), prompt) for role in roles]
+        outcomes = await BatchProcessor().run_requests(requests)
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                raise outcome
+        return dict(zip(roles, outcomes))
+
+    async def broadcast_async(
+        self,
+        prompt: str,
+        roles: Optional[List[Role]] = None,
+        combine_same_model: bool = False,
+    ) -> AsyncIterator[Tuple[Role, Union[AgentResponse, Exception]]]:
+        """Ask every role at once, yielding (role, response or error) as each finishes.
+
+        Unlike consult_team_discussion(), roles do not see each other's
+        answers, so wall time is the slowest role rather than the sum. With
+        *combine_same_model*, roles routed to the same provider and model
+        are answered by one request (see _ask_combined_async).
+        """
+        if roles is None:
+            roles = [Role.BA, Role.QA, Role.SENIOR_DEV, Role.CODER, Role.CODER_2, Role.CODER_3, Role.REVIEWER]
+
+        wanted = dict.fromkeys(roles)
+        if combine_same_model:
+            groups = [
+                [role for role in group if role in wanted]
+                for group in AgentFactory.provider_groups().values()
+            ]
+        else:
+            groups = [[role] for role in wanted]
+
+        async def _ask(group: List[Role]) -> List[Tuple[Role, Union[AgentResponse, Exception]]]:
+            if len(group) > 1:
+                combined = await self._ask_combined_async(group, prompt)
+                if combined is not None:
+                    return list(combined.items())
+            answers: List[Tuple[Role, Union[AgentResponse, Exception]]] = []
+            for role, outcome in zip(group, await asyncio.gather(
+                *(self.ask_async(role, prompt) for role in group), return_exceptions=True
+            )):
+                answers.append((role, outcome))
+            return answers
+
+        tasks = [asyncio.ensure_future(_ask(group)) for group in groups if group]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for answer in await next_done:
+                    yield answer
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _ask_combined_async(
+        self, roles: List[Role], prompt: str
+    ) -> Optional[Dict[Role, AgentResponse]]:
+        """Answer for several same-model roles with one text-only request.
+
+        The role briefs go into one system prompt and the model replies with
+        a JSON object keyed by role. Returns None if the request fails or
+        the reply does not parse, so the caller can ask each role instead.
+        Usage is reported on the first role's response only.
+        """
+        from roles import get_role_config
+
+        provider, model = AgentFactory.get_role_runtime_config(roles[0])
+        configs = [get_role_config(role) for role in roles]
+        system_prompt = _COMBINED_ROLES_HEADER + "".join(
+            f'<role name="{role.value}">\n{config.system_prompt}\n</role>\n'
+            for role, config in zip(roles, configs)
+        )
+        agent = self._apply_cache_policy(AgentFactory.create_by_provider(
+            provider=provider,
+            model=model,
+            system_prompt=system_prompt,
+            max_tokens=sum(config.max_tokens for config in configs),
+        ))
+        self._progress.debug("[%s] Combined request...", ", ".join(role.value for role in roles))
+        try:
+            response = await agent.achat(prompt, include_history=False)
+            answers = loads(_JSON_FENCE.sub("", response.content.strip()))
+            texts = [answers[role.value] for role in roles]
+        except Exception as exc:
+            logger.info("Combined request for %s fell back to one per role: %s", [r.value for r in roles], exc)
+            return None
+        if not all(isinstance(text, str) for text in texts):
+            return None
+        return {
+            role: replace(response, content=text, usage=response.usage if i == 0 else {})
+            for i, (role, text) in enumerate(zip(roles, texts))
+        }
 
     def consult_team_discussion(
         self,
@@ -348,8 +687,7 @@ class Orchestrator:
         roster = ", ".join([role.value for role in roles])
 
         for role in roles:
-            if self.verbose:
-                print(f"Roundtable: {role.value}...")
+            self._progress.debug("Roundtable: %s...", role.value)
 
             prior_discussion = self._build_turn_context(turns, max_chars_per_turn=max_chars_per_turn)
             turn_prompt = f"""Team roundtable discussion.
@@ -380,12 +718,40 @@ Your response rules:
         return results
     
     def register_workflow(self, name: str, steps: List[WorkflowStep]) -> None:
-        self._workflows[name] = steps
+        """Register *steps* under *name*, resolving each step's output name.
+
+        Raises ValueError when a step depends on a name that no earlier step
+        produces, so typos fail here rather than silently at run time.
+        """
+        # Names are dict keys on every run; interned, equal names are one object
+        name = sys.intern(name)
+        named: List[WorkflowStep] = []
+        for i, step in enumerate(steps):
+            known = {prior.name for prior in named}
+            unknown = [dep for dep in step.depends_on if dep not in known]
+            if unknown:
+                raise ValueError(
+                    f"Workflow {name!r}: step {i} ({step.role.value}) depends on "
+                    f"unknown or later step(s): {', '.join(unknown)}"
+                )
+            # Copy, so one step object can appear in several workflows
+            step = replace(step, depends_on=[sys.intern(dep) for dep in step.depends_on])
+            step.name = sys.intern(f"step_{i}_{step.role.value}")
+            named.append(step)
+        self._workflows[name] = named
 
     def register_stage(self, name: str, description: str, status: str = "placeholder") -> None:
         self._stages[name] = {"description": description, "status": status}
     
-    def run_workflow(self, workflow_name: str, context: Dict[str, str]) -> WorkflowResult:
+    def run_workflow(
+        self, workflow_name: str, context: Dict[str, str], use_cache: bool = True
+    ) -> WorkflowResult:
+        """Run a workflow, reusing the result of an identical earlier run.
+
+        A completed run is cached under its workflow name, step definitions,
+        each step role's provider/model and *context*. Runs whose steps
+        called tools are never cached: their side effects would be skipped.
+        """
         if workflow_name not in self._workflows:
             return WorkflowResult(
                 status=WorkflowStatus.FAILED,
@@ -394,61 +760,337 @@ Your response rules:
             )
         
         steps = self._workflows[workflow_name]
+        cache_key, cached = self._cached_workflow_result(workflow_name, steps, context, use_cache)
+        if cached is not None:
+            return cached
+
+        result = self._run_workflow_steps(workflow_name, steps, context)
+        self._store_workflow_result(cache_key, result)
+        return result
+
+    def _cached_workflow_result(
+        self, workflow_name: str, steps: List[WorkflowStep], context: Dict[str, str], use_cache: bool
+    ) -> Tuple[Optional[str], Optional[WorkflowResult]]:
+        """Return (cache key or None when caching is off, copy of a cached result)."""
+        if not (use_cache and self._use_cache and get_settings().response_cache_enabled):
+            return None, None
+        cache_key = self._workflow_cache_key(workflow_name, steps, context)
+        cached = self._workflow_cache.get(cache_key)
+        if cached is None:
+            return cache_key, None
+        self._workflow_cache.move_to_end(cache_key)
+        self._progress.debug("Workflow %s: cached result", workflow_name)
+        outputs = {name: replace(response) for name, response in cached.outputs.items()}
+        return cache_key, replace(cached, outputs=outputs, errors=[], duration=0.0)
+
+    def _store_workflow_result(self, cache_key: Optional[str], result: WorkflowResult) -> None:
+        if (
+            cache_key is not None
+            and result.status == WorkflowStatus.COMPLETED
+            and not any(r.tool_calls_made for r in result.outputs.values())
+        ):
+            self._workflow_cache[cache_key] = result
+            while len(self._workflow_cache) > _WORKFLOW_CACHE_MAX_ENTRIES:
+                self._workflow_cache.popitem(last=False)
+
+    def clear_workflow_cache(self) -> None:
+        self._workflow_cache.clear()
+
+    @staticmethod
+    def _workflow_cache_key(
+        workflow_name: str, steps: List[WorkflowStep], context: Dict[str, str]
+    ) -> str:
+        signature = {
+            "workflow": workflow_name,
+            "steps": [
+                [
+                    step.role.value,
+                    [str(part) for part in AgentFactory.get_role_runtime_config(step.role)],
+                    step.instruction,
+                    step.depends_on,
+                    getattr(step.transform, "__qualname__", None),
+                ]
+                for step in steps
+            ],
+            "context": context,
+        }
+        return blake2b(dumps_bytes(signature, sort_keys=True), digest_size=16).hexdigest()
+
+    def _run_workflow_steps(
+        self, workflow_name: str, steps: List[WorkflowStep], context: Dict[str, str]
+    ) -> WorkflowResult:
         outputs: Dict[str, AgentResponse] = {}
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
-        if self.verbose:
-            print(f"Starting workflow: {workflow_name} ({len(steps)} steps)")
-        
-        for i, step in enumerate(steps):
-            step_name = f"step_{i}_{step.role.value}"
-            try:
-                prompt = step.instruction
-                for key, value in context.items():
-                    prompt = prompt.replace(f"{{{key}}}", value)
-                
-                if step.depends_on:
-                    dep_context = "\n\n---\nPrevious outputs:\n"
-                    for dep in step.depends_on:
-                        if dep in outputs:
-                            dep_context += f"\n[{dep}]:\n{outputs[dep].content}\n"
-                    prompt += dep_context
-                    prompt += (
-                        "\n\n---\nCoordination rules:\n"
-                        "- Explicitly reference at least one depended step.\n"
-                        "- State how your output aligns or disagrees with prior roles.\n"
-                        "- Keep response actionable and concise.\n"
+        self._progress.debug("Starting workflow: %s (%s steps)", workflow_name, len(steps))
+        if context:
+            self.prewarm(workflow_name)
+
+        step_names = [step.name for step in steps]
+        failures: List[str] = []
+        stop = threading.Event()
+        lock = threading.Lock()
+
+        def _run_steps(indices: List[int]) -> None:
+            for i in indices:
+                if stop.is_set():
+                    return
+                step = steps[i]
+                self._progress.debug("  Step %s/%s: %s", i + 1, len(steps), step.role.value)
+                try:
+                    prompt = self._build_step_prompt(
+                        step, context, {dep: outputs[dep] for dep in step.depends_on}
                     )
-                
-                if step.transform:
-                    prompt = step.transform({"prompt": prompt, **context})
-                
-                if self.verbose:
-                    print(f"  Step {i+1}/{len(steps)}: {step.role.value}")
-                
-                response = self.ask(step.role, prompt)
-                outputs[step_name] = response
-                
-            except Exception as e:
-                duration = (datetime.now() - start_time).total_seconds()
-                return WorkflowResult(
-                    status=WorkflowStatus.FAILED,
-                    steps_completed=i,
-                    outputs=outputs,
-                    errors=[f"Step {step_name} failed: {str(e)}"],
-                    duration=duration,
-                )
-        
-        duration = (datetime.now() - start_time).total_seconds()
-        if self.verbose:
-            print(f"Completed in {duration:.2f}s")
+                    response = self.ask(step.role, prompt)
+                except Exception as e:
+                    with lock:
+                        # Siblings cut short by the first failure don't report
+                        if not stop.is_set():
+                            failures.append(f"Step {step.name} failed: {str(e)}")
+                            stop.set()
+                    return
+                with lock:
+                    outputs[step.name] = response
+
+        # Independent steps of a level run concurrently; steps sharing a role
+        # run in order on one worker, since they share that role's agent.
+        for level in self._topo_levels(steps):
+            by_role: Dict[Role, List[int]] = {}
+            for i in level:
+                by_role.setdefault(steps[i].role, []).append(i)
+            pending = {self._pool.submit(_run_steps, indices) for indices in by_role.values()}
+            while pending and not stop.is_set():
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if stop.is_set():
+                # Queued steps never start; in-flight requests get a short grace period
+                for future in pending:
+                    future.cancel()
+                wait(pending, timeout=_CANCEL_DRAIN_SECONDS)
+                break
+
+        duration = time.perf_counter() - start_time
+        ordered = {name: outputs[name] for name in step_names if name in outputs}
+        if failures:
+            return WorkflowResult(
+                status=WorkflowStatus.FAILED,
+                steps_completed=len(ordered),
+                outputs=ordered,
+                errors=list(failures),
+                duration=duration,
+            )
+
+        self._progress.debug("Completed in %.2fs", duration)
         
         return WorkflowResult(
             status=WorkflowStatus.COMPLETED,
             steps_completed=len(steps),
-            outputs=outputs,
+            outputs=ordered,
+            duration=duration,
+        )
+
+    async def run_workflow_async(
+        self,
+        workflow_name: str,
+        context: Dict[str, str],
+        on_step_done: Optional[Callable[[str, AgentResponse], None]] = None,
+        use_cache: bool = True,
+    ) -> WorkflowResult:
+        """Run a workflow with every step started as soon as its inputs exist.
+
+        Each step is its own task that waits only for the earlier steps it
+        depends on, so a fast branch never waits for a slow sibling. Outputs
+        are keyed, ordered and cached exactly as in run_workflow().
+        *on_step_done* is called with (step_name, response) as each step
+        finishes, letting callers render results while other steps are
+        still running.
+        """
+        if workflow_name not in self._workflows:
+            return WorkflowResult(
+                status=WorkflowStatus.FAILED,
+                steps_completed=0,
+                errors=[f"Unknown workflow: {workflow_name}"],
+            )
+
+        steps = self._workflows[workflow_name]
+        cache_key, cached = self._cached_workflow_result(workflow_name, steps, context, use_cache)
+        if cached is not None:
+            if on_step_done is not None:
+                for name, response in cached.outputs.items():
+                    on_step_done(name, response)
+            return cached
+
+        step_names = [step.name for step in steps]
+        index = {name: i for i, name in enumerate(step_names)}
+        outputs: Dict[str, AgentResponse] = {}
+        tasks: List["asyncio.Task[AgentResponse]"] = []
+        start_time = time.perf_counter()
+
+        self._progress.debug("Starting workflow: %s (%s steps)", workflow_name, len(steps))
+        if context:
+            await asyncio.to_thread(self.prewarm, workflow_name, True)
+
+        # Steps that share a role share one agent (and its history): run them
+        # one at a time, like the per-role groups in _run_workflow_steps
+        role_locks = {step.role: asyncio.Lock() for step in steps}
+
+        async def _run_step(i: int) -> AgentResponse:
+            step = steps[i]
+            # register_workflow() guarantees every dependency is an earlier step
+            await asyncio.gather(*(tasks[index[dep]] for dep in step.depends_on))
+            async with role_locks[step.role]:
+                self._progress.debug("  Running: %s", step.role.value)
+                response = await self.ask_async(
+                    step.role,
+                    self._build_step_prompt(step, context, {dep: outputs[dep] for dep in step.depends_on}),
+                )
+            outputs[step.name] = response
+            if on_step_done is not None:
+                on_step_done(step.name, response)
+            return response
+
+        for i in range(len(steps)):
+            tasks.append(asyncio.ensure_future(_run_step(i)))
+
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        errors: List[str] = []
+        seen: List[BaseException] = []
+        for i, task in enumerate(tasks):
+            exc = task.exception() if task in done else None
+            # Dependents re-raise their dependency's error; report it once
+            if exc is not None and not any(exc is other for other in seen):
+                seen.append(exc)
+                errors.append(f"Step {step_names[i]} failed: {str(exc)}")
+        if errors:
+            return WorkflowResult(
+                status=WorkflowStatus.FAILED,
+                steps_completed=len(outputs),
+                outputs={name: outputs[name] for name in step_names if name in outputs},
+                errors=errors,
+                duration=time.perf_counter() - start_time,
+            )
+
+        duration = time.perf_counter() - start_time
+        self._progress.debug("Completed in %.2fs", duration)
+
+        result = WorkflowResult(
+            status=WorkflowStatus.COMPLETED,
+            steps_completed=len(steps),
+            outputs={name: outputs[name] for name in step_names},
             duration=duration,
         )
+        self._store_workflow_result(cache_key, result)
+        return result
+
+    async def run_workflow_batch(
+        self, workflow_name: str, contexts: List[Dict[str, str]]
+    ) -> List[WorkflowResult]:
+        """Run one workflow over many contexts through provider batch APIs.
+
+        Each workflow step is submitted once for all contexts (see
+        agents.batch.BatchProcessor), trading latency for batch pricing.
+        Batched turns are text-only: agents get no tools in this mode.
+        """
+        from agents.batch import BatchProcessor
+
+        if workflow_name not in self._workflows:
+            return [
+                WorkflowResult(
+                    status=WorkflowStatus.FAILED,
+                    steps_completed=0,
+                    errors=[f"Unknown workflow: {workflow_name}"],
+                )
+                for _ in contexts
+            ]
+
+        steps = self._workflows[workflow_name]
+        step_names = [step.name for step in steps]
+        outputs: List[Dict[str, AgentResponse]] = [{} for _ in contexts]
+        errors: List[List[str]] = [[] for _ in contexts]
+        processor = BatchProcessor()
+        start_time = time.perf_counter()
+
+        async def _run_step(i: int) -> None:
+            live = [k for k in range(len(contexts)) if not errors[k]]
+            if not live:
+                return
+            prompts = [self._build_step_prompt(steps[i], contexts[k], outputs[k]) for k in live]
+            self._progress.debug("  Batch: %s (%s requests)", step_names[i], len(prompts))
+            results = await processor.run_batch(steps[i].role, prompts)
+            for k, result in zip(live, results):
+                if isinstance(result, BaseException):
+                    errors[k].append(f"Step {step_names[i]} failed: {str(result)}")
+                else:
+                    outputs[k][step_names[i]] = result
+
+        for level in self._topo_levels(steps):
+            await asyncio.gather(*(_run_step(i) for i in level))
+
+        duration = time.perf_counter() - start_time
+        return [
+            WorkflowResult(
+                status=WorkflowStatus.FAILED if errors[k] else WorkflowStatus.COMPLETED,
+                steps_completed=len(outputs[k]),
+                outputs={name: outputs[k][name] for name in step_names if name in outputs[k]},
+                errors=errors[k],
+                duration=duration,
+            )
+            for k in range(len(contexts))
+        ]
+
+    @staticmethod
+    def _topo_levels(steps: List[WorkflowStep]) -> List[List[int]]:
+        """Group step indices into levels that can run concurrently.
+
+        A step lands one level after the deepest step it depends on. Only
+        dependencies on earlier steps count: a step never sees the output of
+        a step declared after it.
+        """
+        index = {step.name or f"step_{i}_{step.role.value}": i for i, step in enumerate(steps)}
+        depth: List[int] = []
+        for i, step in enumerate(steps):
+            dep_depths = [
+                depth[index[dep]]
+                for dep in step.depends_on
+                if dep in index and index[dep] < i
+            ]
+            depth.append(max(dep_depths) + 1 if dep_depths else 0)
+
+        levels: List[List[int]] = [[] for _ in range(max(depth, default=-1) + 1)]
+        for i, d in enumerate(depth):
+            levels[d].append(i)
+        return levels
+
+    def _build_step_prompt(
+        self,
+        step: WorkflowStep,
+        context: Dict[str, str],
+        outputs: Dict[str, AgentResponse],
+    ) -> str:
+        """Interpolate context and attach depended-on outputs for a workflow step."""
+        # One pass over the instruction; unknown placeholders are left as-is
+        prompt = step.instruction
+        if "{" in prompt:
+            prompt = _PLACEHOLDER.sub(lambda m: context.get(m.group(1), m.group(0)), prompt)
+
+        if step.depends_on:
+            # Outputs run to thousands of characters; join once, don't +=
+            parts = [prompt, _DEP_CONTEXT_HEADER]
+            for dep in step.depends_on:
+                response = outputs.get(dep)
+                if response is not None:
+                    parts.append(f"\n[{dep}]:\n{response.content}\n")
+            parts.append(_COORDINATION_RULES)
+            prompt = "".join(parts)
+
+        if step.transform:
+            prompt = step.transform({"prompt": prompt, **context})
+
+        return prompt
 
     def run_stage(self, stage_name: str, context: Dict[str, str]) -> WorkflowResult:
         if stage_name not in self._stages:
@@ -519,7 +1161,7 @@ Your response rules:
                 errors=["Missing stage context. Provide a requirement or topic."],
             )
 
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         outputs: Dict[str, AgentResponse] = {}
         turns: List[Tuple[Role, AgentResponse]] = []
 
@@ -612,7 +1254,7 @@ Rules:
             outputs["step_5_senior_dev"] = final_response
 
         except Exception as e:
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             return WorkflowResult(
                 status=WorkflowStatus.FAILED,
                 steps_completed=len(outputs),
@@ -621,7 +1263,7 @@ Rules:
                 duration=duration,
             )
 
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         return WorkflowResult(
             status=WorkflowStatus.COMPLETED,
             steps_completed=len(outputs),
@@ -644,7 +1286,7 @@ Rules:
                 errors=["Missing stage context. Provide a requirement or topic."],
             )
 
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         outputs: Dict[str, AgentResponse] = {}
         turns: List[Tuple[Role, AgentResponse]] = []
 
@@ -737,7 +1379,7 @@ Rules:
             outputs[f"step_{len(turn_plan)}_senior_dev"] = final_response
 
         except Exception as e:
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             return WorkflowResult(
                 status=WorkflowStatus.FAILED,
                 steps_completed=len(outputs),
@@ -746,7 +1388,7 @@ Rules:
                 duration=duration,
             )
 
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         return WorkflowResult(
             status=WorkflowStatus.COMPLETED,
             steps_completed=len(outputs),
@@ -769,7 +1411,7 @@ Rules:
                 errors=["Missing stage context. Provide a requirement or topic."],
             )
 
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         outputs: Dict[str, AgentResponse] = {}
         turns: List[Tuple[Role, AgentResponse]] = []
 
@@ -862,7 +1504,7 @@ Rules:
             outputs[f"step_{len(turn_plan)}_ba"] = final_response
 
         except Exception as e:
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             return WorkflowResult(
                 status=WorkflowStatus.FAILED,
                 steps_completed=len(outputs),
@@ -871,7 +1513,7 @@ Rules:
                 duration=duration,
             )
 
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         return WorkflowResult(
             status=WorkflowStatus.COMPLETED,
             steps_completed=len(outputs),
@@ -894,7 +1536,7 @@ Rules:
                 errors=["Missing stage context. Provide a feature or system to verify."],
             )
 
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         outputs: Dict[str, AgentResponse] = {}
         turns: List[Tuple[Role, AgentResponse]] = []
 
@@ -987,7 +1629,7 @@ Rules:
             outputs[f"step_{len(turn_plan)}_qa"] = final_response
 
         except Exception as e:
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             return WorkflowResult(
                 status=WorkflowStatus.FAILED,
                 steps_completed=len(outputs),
@@ -996,7 +1638,7 @@ Rules:
                 duration=duration,
             )
 
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         return WorkflowResult(
             status=WorkflowStatus.COMPLETED,
             steps_completed=len(outputs),
@@ -1019,7 +1661,7 @@ Rules:
                 errors=["Missing stage context. Provide a release scope or description."],
             )
 
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         outputs: Dict[str, AgentResponse] = {}
         turns: List[Tuple[Role, AgentResponse]] = []
 
@@ -1112,7 +1754,7 @@ Rules:
             outputs[f"step_{len(turn_plan)}_senior_dev"] = final_response
 
         except Exception as e:
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             return WorkflowResult(
                 status=WorkflowStatus.FAILED,
                 steps_completed=len(outputs),
@@ -1121,7 +1763,7 @@ Rules:
                 duration=duration,
             )
 
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         return WorkflowResult(
             status=WorkflowStatus.COMPLETED,
             steps_completed=len(outputs),
@@ -20,6 +20,8 @@ class WorkflowStep:
     instruction: str
     depends_on: List[str] = field(default_factory=list)
     transform: Optional[Callable[[Dict[str, str]], str]] = None
+    # "step_{index}_{role}", assigned by Orchestrator.register_workflow()
+    name: str = field(default="", init=False, compare=False)
 
 
 @dataclass
@@ -32,7 +34,6 @@ class WorkflowResult:
     
     @property
     def final_output(self) -> Optional[str]:
-        if self.outputs:
-            last_key = list(self.outputs.keys())[-1]
-            return self.outputs[last_key].content
-        return None
+        if not self.outputs:
+            return None
+        return next(reversed(self.outputs.values())).content
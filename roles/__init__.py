@@ -1,12 +1,28 @@
 """Role definitions for the AI team."""
+import importlib
+
 from .base import RoleConfig, get_role_config
-from .senior_dev import SENIOR_DEV_CONFIG
-from .coder import CODER_CONFIG
-from .coder_2 import CODER_2_CONFIG
-from .coder_3 import CODER_3_CONFIG
-from .qa import QA_CONFIG
-from .ba import BA_CONFIG
-from .reviewer import REVIEWER_CONFIG
+
+# Each role module holds a large prompt, so it is only imported on first use.
+_LAZY_CONFIGS = {
+    "SENIOR_DEV_CONFIG": ".senior_dev",
+    "CODER_CONFIG": ".coder",
+    "CODER_2_CONFIG": ".coder_2",
+    "CODER_3_CONFIG": ".coder_3",
+    "QA_CONFIG": ".qa",
+    "BA_CONFIG": ".ba",
+    "REVIEWER_CONFIG": ".reviewer",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_CONFIGS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "RoleConfig",
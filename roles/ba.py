@@ -4,10 +4,10 @@ Business Analyst Role
 Gemini 2.0 Flash - The requirements specialist.
 Handles requirements gathering, specifications, and business analysis.
 """
-from .base import RoleConfig, register_role
+from .base import SCRATCHPAD_TOOLS_SECTION, RoleConfig, register_role
 
 
-BA_PROMPT = """You are an Expert Business Analyst with deep experience in software requirements and stakeholder communication. You are part of an AI development team.
+BA_PROMPT = f"""You are an Expert Business Analyst with deep experience in software requirements and stakeholder communication. You are part of an AI development team.
 
 ## Your Role
 You are the requirements specialist responsible for:
@@ -24,10 +24,7 @@ Additional tools may be available depending on configuration:
 
 When GitHub tools are available, **create actual GitHub issues** for each user story and task rather than just listing them in text. Include labels, acceptance criteria in the body, and proper formatting.
 
-You also have shared team scratchpad tools for inter-agent coordination:
-- `scratchpad_write(key, value, category)` — Record decisions, artifacts, blockers, or status updates visible to other agents
-- `scratchpad_read(key)` — Read a specific entry from the shared scratchpad
-- `scratchpad_list(category)` — List scratchpad entries, optionally filtered by category (decision, artifact, blocker, status)
+{SCRATCHPAD_TOOLS_SECTION}
 
 Use the scratchpad to record scope decisions, requirements clarifications, and issue summaries.
 
@@ -4,8 +4,17 @@ Base Role Configuration
 Defines the structure for role configurations and system prompts.
 """
 from dataclasses import dataclass
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
 from enum import Enum
+import importlib
+
+
+# Prompt sections shared verbatim by several roles; one string object each
+SCRATCHPAD_TOOLS_SECTION = """You also have shared team scratchpad tools for inter-agent coordination:
+- `scratchpad_write(key, value, category)` — Record decisions, artifacts, blockers, or status updates visible to other agents
+- `scratchpad_read(key)` — Read a specific entry from the shared scratchpad
+- `scratchpad_list(category)` — List scratchpad entries, optionally filtered by category (decision, artifact, blocker, status)"""
 
 
 @dataclass
@@ -20,6 +29,8 @@ class RoleConfig:
         max_tokens: Default max tokens for this role
         temperature: Default temperature for this role
         capabilities: List of things this role can do
+        cacheable: Whether the system prompt is static and may be marked for
+            provider prompt caching (Anthropic cache_control breakpoints)
     """
     name: str
     description: str
@@ -27,15 +38,33 @@ class RoleConfig:
     max_tokens: int = 4096
     temperature: float = 0.7
     capabilities: tuple = ()
+    cacheable: bool = True
 
 
 # Import role configs (will be populated by role modules)
 _ROLE_CONFIGS: Dict[str, RoleConfig] = {}
 
+# Role key -> module that registers it, imported on first lookup
+_ROLE_MODULES: Dict[str, str] = {
+    "senior_dev": "roles.senior_dev",
+    "coder": "roles.coder",
+    "coder_2": "roles.coder_2",
+    "coder_3": "roles.coder_3",
+    "qa": "roles.qa",
+    "ba": "roles.ba",
+    "reviewer": "roles.reviewer",
+}
+
+# get_role_config() argument (Role member or string key) -> config, so a
+# repeat lookup skips key normalization and the module check
+_LOOKUP_CACHE: Dict[Any, RoleConfig] = {}
+_ALL_ROLES = MappingProxyType(_ROLE_CONFIGS)
+
 
 def register_role(role_key: str, config: RoleConfig) -> None:
     """Register a role configuration."""
     _ROLE_CONFIGS[role_key] = config
+    _LOOKUP_CACHE.clear()
 
 
 def get_role_config(role) -> RoleConfig:
@@ -51,25 +80,30 @@ def get_role_config(role) -> RoleConfig:
     Raises:
         ValueError: If role is not found
     """
+    config = _LOOKUP_CACHE.get(role)
+    if config is not None:
+        return config
+
     # Handle enum
     if hasattr(role, 'value'):
         role_key = role.value
     else:
         role_key = str(role)
     
-    # Lazy load configs
-    if not _ROLE_CONFIGS:
-        from . import senior_dev, coder, coder_2, coder_3, qa, ba, reviewer
-    
     config = _ROLE_CONFIGS.get(role_key)
+    if not config and role_key in _ROLE_MODULES:
+        # Only this role's module (and prompt) is loaded
+        importlib.import_module(_ROLE_MODULES[role_key])
+        config = _ROLE_CONFIGS.get(role_key)
     if not config:
         raise ValueError(f"Unknown role: {role_key}")
     
+    _LOOKUP_CACHE[role] = config
     return config
 
 
-def list_roles() -> Dict[str, RoleConfig]:
-    """Get all registered roles."""
-    if not _ROLE_CONFIGS:
-        from . import senior_dev, coder, coder_2, coder_3, qa, ba, reviewer
-    return _ROLE_CONFIGS.copy()
+def list_roles() -> Mapping[str, RoleConfig]:
+    """Get all registered roles as a read-only view."""
+    for module in _ROLE_MODULES.values():
+        importlib.import_module(module)
+    return _ALL_ROLES
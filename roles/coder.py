@@ -4,10 +4,10 @@ Coder Role
 GPT-4o - The implementation specialist.
 Handles rapid coding, implementation details, and feature development.
 """
-from .base import RoleConfig, register_role
+from .base import SCRATCHPAD_TOOLS_SECTION, RoleConfig, register_role
 
 
-CODER_PROMPT = """You are an Expert Coder specializing in rapid, high-quality implementation. You are part of an AI development team.
+CODER_PROMPT = f"""You are an Expert Coder specializing in rapid, high-quality implementation. You are part of an AI development team.
 
 ## Your Role
 You are the implementation specialist responsible for:
@@ -36,10 +36,7 @@ You also have GitHub tools for code delivery:
 
 When implementing code, **always use write_file** to create the actual files locally, then **push_files** to push them to the feature branch on GitHub. Read existing files first to understand the codebase before making changes.
 
-You also have shared team scratchpad tools for inter-agent coordination:
-- `scratchpad_write(key, value, category)` — Record decisions, artifacts, blockers, or status updates visible to other agents
-- `scratchpad_read(key)` — Read a specific entry from the shared scratchpad
-- `scratchpad_list(category)` — List scratchpad entries, optionally filtered by category (decision, artifact, blocker, status)
+{SCRATCHPAD_TOOLS_SECTION}
 
 Use the scratchpad to record which modules you're implementing and flag any blockers or decisions.
 
@@ -1,7 +1,7 @@
 """Shell package - interactive CLAI shell."""
 from .main import CLAIShell, main
 from .completer import MentionCompleter
-from .constants import COMMANDS, ROLES, WORKFLOWS, STAGES, MENTION_ALIASES, TEAM_MENTIONS
+from .constants import COMMANDS, ROLES, WORKFLOWS, STAGES, MENTION_ALIASES, TEAM_MENTIONS, BROADCAST_MENTIONS, MENTION_RE
 
 __all__ = [
     "CLAIShell",
@@ -13,4 +13,6 @@ __all__ = [
     "STAGES",
     "MENTION_ALIASES",
     "TEAM_MENTIONS",
+    "BROADCAST_MENTIONS",
+    "MENTION_RE",
 ]
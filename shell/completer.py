@@ -1,24 +1,75 @@
 """Tab completion for shell."""
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+import sys
+
 from prompt_toolkit.completion import Completer, Completion
 from .constants import MENTION_ALIASES, TEAM_MENTIONS, COMMANDS, WORKFLOWS, STAGES
 
+# The mention being typed: an "@" plus word characters up to the cursor
+_PARTIAL_MENTION = re.compile(r"@\w*$")
+
+
+class PrefixTrie:
+    """Character trie whose nodes keep every word below them, in insertion order.
+
+    A lookup walks one node per typed character and returns that node's
+    list, so the cost depends on the prefix length, not the vocabulary.
+    The root remembers its last lookup, so typing one more character of
+    the same word walks a single node.
+    """
+
+    __slots__ = ("children", "words", "_last")
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.children: Dict[str, "PrefixTrie"] = {}
+        self.words: List[str] = []
+        self._last: Tuple[str, Optional["PrefixTrie"]] = ("", self)
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        word = sys.intern(word.lower())
+        self._last = ("", self)
+        node = self
+        node.words.append(word)
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = PrefixTrie()
+            node = child
+            node.words.append(word)
+
+    def starting_with(self, prefix: str) -> List[str]:
+        last_prefix, node = self._last
+        if prefix.startswith(last_prefix):
+            rest = prefix[len(last_prefix):]
+        else:
+            node, rest = self, prefix
+        for char in rest:
+            if node is None:
+                break
+            node = node.children.get(char)
+        self._last = (prefix, node)
+        return [] if node is None else node.words
+
 
 class MentionCompleter(Completer):
     def __init__(self):
-        self.mentions = list(MENTION_ALIASES.keys()) + TEAM_MENTIONS
-        self.commands = COMMANDS + WORKFLOWS + STAGES
+        self.mentions = PrefixTrie([*MENTION_ALIASES, *TEAM_MENTIONS])
+        self.commands = PrefixTrie(COMMANDS + WORKFLOWS + STAGES)
     
     def get_completions(self, document, complete_event):
         text = document.text_before_cursor
-        word = document.get_word_before_cursor()
         
         if "@" in text:
-            at_pos = text.rfind("@")
-            partial = text[at_pos:].lower()
-            for mention in self.mentions:
-                if mention.startswith(partial):
-                    yield Completion(mention, start_position=-len(partial), style="fg:cyan bold")
+            match = _PARTIAL_MENTION.search(text)
+            if match is None:
+                return
+            partial = match.group(0).lower()
+            for mention in self.mentions.starting_with(partial):
+                yield Completion(mention, start_position=-len(partial), style="fg:cyan bold")
         else:
-            for cmd in self.commands:
-                if cmd.startswith(word.lower()):
-                    yield Completion(cmd, start_position=-len(word))
+            word = document.get_word_before_cursor()
+            for cmd in self.commands.starting_with(word.lower()):
+                yield Completion(cmd, start_position=-len(word))
@@ -1,5 +1,8 @@
 """Shell constants - commands, roles, mentions."""
-from typing import Dict
+from types import MappingProxyType
+from typing import Mapping
+import re
+import sys
 from agents.factory import Role
 
 
@@ -8,7 +11,7 @@ COMMANDS = [
     "clear", "history", "save", "exit", "quit",
     "projects", "newproject", "files", "tree", "readfile", "workspace",
     "stages", "stage",
-    "github", "tools", "kickoff",
+    "github", "tools", "kickoff", "cache",
 ]
 
 ROLES = ["senior_dev", "coder", "coder_2", "coder_3", "qa", "ba", "reviewer"]
@@ -23,7 +26,7 @@ STAGES = [
     "release_handoff",
 ]
 
-MENTION_ALIASES: Dict[str, Role] = {
+_MENTION_ALIASES = {
     "@senior": Role.SENIOR_DEV,
     "@seniordev": Role.SENIOR_DEV,
     "@architect": Role.SENIOR_DEV,
@@ -59,5 +62,24 @@ MENTION_ALIASES: Dict[str, Role] = {
     "@review": Role.REVIEWER,
     "@cr": Role.REVIEWER,
 }
+# Read-only, with interned keys: the completer's trie and MENTION_RE are
+# built from it once, so it must not change afterwards.
+MENTION_ALIASES: Mapping[str, Role] = MappingProxyType(
+    {sys.intern(alias): role for alias, role in _MENTION_ALIASES.items()}
+)
 
 TEAM_MENTIONS = ["@team", "@all", "@devteam", "@everyone"]
+# Team mentions that ask every role at once instead of a roundtable
+BROADCAST_MENTIONS = ["@all", "@everyone"]
+# Membership views of the two lists above, for matching parsed mentions
+TEAM_MENTION_SET = frozenset(TEAM_MENTIONS)
+BROADCAST_MENTION_SET = frozenset(BROADCAST_MENTIONS)
+
+# Every alias and team mention in one alternation, longest first so @dev2
+# is not read as @dev; a mention must not be glued to surrounding word chars.
+MENTION_RE = re.compile(
+    r"(?<![\w@])(?:"
+    + "|".join(re.escape(m) for m in sorted([*MENTION_ALIASES, *TEAM_MENTIONS], key=len, reverse=True))
+    + r")(?!\w)",
+    re.IGNORECASE,
+)
@@ -0,0 +1,74 @@
+"""Prompt history that is written to disk in batches."""
+from datetime import datetime
+from typing import List, Tuple
+import atexit
+import os
+import threading
+
+from prompt_toolkit.history import FileHistory
+
+
+# Smallest possible entry: "\n# <26-char timestamp>\n+\n"
+_MIN_ENTRY_BYTES = 32
+
+
+class BufferedFileHistory(FileHistory):
+    """FileHistory that appends accepted lines every *flush_every* entries.
+
+    FileHistory opens and appends to the file on every accepted line; here
+    lines are buffered and written in one append, on exit at the latest.
+    The on-disk format is unchanged. A file past *max_entries* is cut back
+    to the newest *keep_entries* when the history is opened, since
+    prompt_toolkit loads the whole file into memory.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        flush_every: int = 16,
+        max_entries: int = 10_000,
+        keep_entries: int = 5_000,
+    ):
+        super().__init__(filename)
+        self.flush_every = flush_every
+        self._pending: List[Tuple[datetime, str]] = []
+        self._lock = threading.Lock()
+        self._rotate(max_entries, keep_entries)
+        atexit.register(self.flush)
+
+    def _rotate(self, max_entries: int, keep_entries: int) -> None:
+        try:
+            if os.path.getsize(self.filename) <= max_entries * _MIN_ENTRY_BYTES:
+                return  # Too small to hold max_entries; skip the read
+            with open(self.filename, "rb") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        # Every entry starts with its "# <timestamp>" line
+        starts = [i for i, line in enumerate(lines) if line.startswith(b"#")]
+        if len(starts) <= max_entries:
+            return
+        tmp = f"{self.filename}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(b"\n")
+            f.writelines(lines[starts[-keep_entries]:])
+        os.replace(tmp, self.filename)
+
+    def store_string(self, string: str) -> None:
+        with self._lock:
+            self._pending.append((datetime.now(), string))
+            full = len(self._pending) >= self.flush_every
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        parts = []
+        for stamp, string in pending:
+            parts.append(f"\n# {stamp}\n")
+            parts.extend(f"+{line}\n" for line in string.split("\n"))
+        with open(self.filename, "ab") as f:
+            f.write("".join(parts).encode("utf-8"))
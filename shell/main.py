@@ -1,39 +1,168 @@
 """Main shell implementation."""
 from rich.console import Console
 from rich.panel import Panel
-from rich.markdown import Markdown
 from rich.table import Table
 from rich.prompt import Prompt
-from rich.syntax import Syntax
 from rich import box
-from prompt_toolkit import prompt
-from prompt_toolkit.history import FileHistory
+from prompt_toolkit import PromptSession
+from hashlib import sha256
+import asyncio
+import os
 import re
 import time
 from pathlib import Path
-from typing import Optional
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
 from agents.factory import AgentFactory, Role
-from core import Orchestrator, get_filesystem
-from core.pipeline import ProjectPipeline, PhaseResult, PhaseStatus
-from config import get_settings
-from .constants import COMMANDS, ROLES, WORKFLOWS, STAGES, MENTION_ALIASES, TEAM_MENTIONS
+from agents.semantic_cache import SemanticCache
+from config import clear_settings_cache, get_settings
+from config.settings import PROVIDER_LABELS
+from .constants import ROLES, WORKFLOWS, STAGES, MENTION_ALIASES, TEAM_MENTION_SET, BROADCAST_MENTION_SET, MENTION_RE
 from .completer import MentionCompleter
+from .history import BufferedFileHistory
+from .render import markdown as _markdown, stream_answer
+
+if TYPE_CHECKING:
+    from core import FileSystemTools, Orchestrator
 
 
 console = Console()
 
+# Files pulled in by "< directory"; larger files are left out of the prompt
+_CONTEXT_SUFFIXES = frozenset({".py", ".js", ".ts", ".json", ".md", ".txt"})
+_CONTEXT_MAX_FILE_BYTES = 256 * 1024
+_CONTEXT_MAX_TOTAL_BYTES = 2 * 1024 * 1024
+_CONTEXT_MAX_DEPTH = 4
+# Decoded text kept between "< path" prompts, evicted least recently used first
+_CONTEXT_CACHE_MAX_CHARS = 32 * 1024 * 1024
+# "> file" saves with these suffixes keep only the reply's first code block
+_CODE_EXTENSIONS = frozenset({".py", ".js", ".ts", ".java", ".cpp", ".c", ".go", ".rs"})
+_CODE_BLOCK_RE = re.compile(r"```(?:\w+)?\n(.*?)```", re.DOTALL)
+# readfile highlighting; rich.syntax itself is imported on first use
+_SYNTAX_BY_SUFFIX = {".py": "python", ".js": "javascript", ".json": "json", ".md": "markdown"}
+
+
+def _is_context_file(name: str) -> bool:
+    return os.path.splitext(name)[1] in _CONTEXT_SUFFIXES
+
+
+_HELP_TEXT = """
+[bold cyan]@Mentions[/bold cyan]
+  @senior, @dev, @dev2, @dev3, @qa, @ba, @reviewer, @team
+  @team runs BA-first roundtable discussion
+  @all asks every role at once; replies appear as they finish
+
+[bold cyan]Commands[/bold cyan]
+  team, workflows, workflow <name>, stages, stage <name>, config [reload], clear, exit
+  tools [role]             # List tools available to agents
+  github                   # GitHub MCP status & tools
+  cache [on|off|clear]     # Reuse answers to similar questions
+
+[bold cyan]Project Pipeline[/bold cyan]
+  kickoff [name]           # Simple pipeline: planning -> implementation -> github_mcp
+
+[bold cyan]Stages[/bold cyan]
+  stage planning_discussion   # Active
+  stages                      # List all stages
+
+[bold cyan]File I/O[/bold cyan]
+  @dev write code > file.py   |   @qa review < code.py
+"""
+
+_TEAM_ROWS = (
+    ("BA", Role.BA),
+    ("QA", Role.QA),
+    ("Senior Dev", Role.SENIOR_DEV),
+    ("Coder", Role.CODER),
+    ("Coder 2", Role.CODER_2),
+    ("Coder 3", Role.CODER_3),
+    ("Reviewer", Role.REVIEWER),
+)
+
+_WORKFLOW_PIPELINES = (
+    ("feature", "BA → QA → Senior → Coder → Coder2 → Coder3"),
+    ("review", "Reviewer → Senior"),
+    ("bugfix", "QA → Senior → Coder"),
+    ("architecture", "BA → Senior → QA"),
+    ("project_setup", "BA (creates issues) → Senior (architecture)"),
+    ("pr_review", "Reviewer (reviews PR) → QA (test plan)"),
+    ("full_feature", "BA → Senior → Coder → Coder2 → Coder3 → QA → Reviewer"),
+    ("test_and_verify", "QA (test plan) → Coder (write tests) → QA (run tests)"),
+)
+
 
 class CLAIShell:
     def __init__(self):
-        self.orchestrator = Orchestrator(verbose=False)
-        self.fs = get_filesystem()
+        self._orchestrator: Optional["Orchestrator"] = None
         self.current_role: Optional[Role] = None
         self.running = True
         self.last_response = None
         self.history_file = Path.home() / ".clai_history"
+        self.history = BufferedFileHistory(str(self.history_file))
         self.completer = MentionCompleter()
+        # Answers to earlier @mentions, matched on similar wording ("cache on|off")
+        self.answer_cache = self._new_answer_cache()
+        self.answer_cache_enabled = get_settings().semantic_cache_enabled
+        # One loop for the whole session: the shared async HTTP pool is bound
+        # to the loop that first uses it
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # path -> (mtime_ns, size, text); an entry is used only while both match
+        self._context_cache: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._context_cache_chars = 0
+        # Listing tables, built on first use; the team table with its Settings
+        self._team_table: Optional[Tuple[object, Table]] = None
+        self._workflows_table: Optional[Table] = None
+        # Command word -> handler(args); the keys are exactly COMMANDS
+        self._commands: Dict[str, Callable[[list], None]] = {
+            "exit": self._cmd_exit,
+            "quit": self._cmd_exit,
+            "help": lambda args: self.print_help(),
+            "team": lambda args: self.print_team(),
+            "workflows": lambda args: self.print_workflows(),
+            "stages": lambda args: self.print_stages(),
+            "config": self.handle_config,
+            "clear": self._cmd_clear,
+            "workflow": self.handle_workflow,
+            "stage": self.handle_stage,
+            "history": self._cmd_history,
+            "save": self._cmd_save,
+            "workspace": self._cmd_workspace,
+            "projects": lambda args: self.handle_projects(),
+            "newproject": self.handle_new_project,
+            "files": self.handle_files,
+            "tree": self.handle_tree,
+            "readfile": self.handle_read_file,
+            "github": self.handle_github,
+            "tools": self.handle_tools,
+            "kickoff": self.handle_kickoff,
+            "cache": self.handle_cache,
+        }
     
+    @staticmethod
+    def _new_answer_cache() -> SemanticCache:
+        settings = get_settings()
+        return SemanticCache(
+            threshold=settings.semantic_cache_threshold,
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+        )
+
+    @property
+    def orchestrator(self) -> "Orchestrator":
+        # Built on first use so the prompt appears before core is imported
+        if self._orchestrator is None:
+            from core import Orchestrator
+
+            self._orchestrator = Orchestrator(verbose=False)
+        return self._orchestrator
+
+    @property
+    def fs(self) -> "FileSystemTools":
+        from core import get_filesystem
+
+        return get_filesystem()
+
     def print_banner(self):
         banner = """
 ╔═════════════════════════════════════════════════════════════════╗
@@ -47,63 +176,34 @@ class CLAIShell:
         console.print(banner, style="bold blue")
     
     def print_help(self):
-        console.print("\n[bold cyan]@Mentions[/bold cyan]")
-        console.print("  @senior, @dev, @dev2, @dev3, @qa, @ba, @reviewer, @team")
-        console.print("  @team runs BA-first roundtable discussion")
-        console.print("\n[bold cyan]Commands[/bold cyan]")
-        console.print("  team, workflows, workflow <name>, stages, stage <name>, config, clear, exit")
-        console.print("  tools [role]             # List tools available to agents")
-        console.print("  github                   # GitHub MCP status & tools")
-        console.print("\n[bold cyan]Project Pipeline[/bold cyan]")
-        console.print("  kickoff [name]           # Simple pipeline: planning -> implementation -> github_mcp")
-        console.print("\n[bold cyan]Stages[/bold cyan]")
-        console.print("  stage planning_discussion   # Active")
-        console.print("  stages                      # List all stages")
-        console.print("\n[bold cyan]File I/O[/bold cyan]")
-        console.print("  @dev write code > file.py   |   @qa review < code.py")
-        console.print()
+        console.print(_HELP_TEXT)
     
     def print_team(self):
-        table = Table(title="🤖 AI Team", box=box.ROUNDED)
-        table.add_column("Role", style="cyan")
-        table.add_column("Model", style="green")
-        table.add_column("Provider", style="blue")
-        
-        team = [
-            ("BA", Role.BA),
-            ("QA", Role.QA),
-            ("Senior Dev", Role.SENIOR_DEV),
-            ("Coder", Role.CODER),
-            ("Coder 2", Role.CODER_2),
-            ("Coder 3", Role.CODER_3),
-            ("Reviewer", Role.REVIEWER),
-        ]
-        for role_name, role in team:
-            provider, model = AgentFactory.get_role_runtime_config(role)
-            table.add_row(role_name, model, provider.value)
+        # Rebuilt only when "config" (or anything else) swaps in new Settings
+        settings = get_settings()
+        if self._team_table is None or self._team_table[0] is not settings:
+            table = Table(title="🤖 AI Team", box=box.ROUNDED)
+            table.add_column("Role", style="cyan")
+            table.add_column("Model", style="green")
+            table.add_column("Provider", style="blue")
+            for role_name, role in _TEAM_ROWS:
+                provider, model = AgentFactory.get_role_runtime_config(role)
+                table.add_row(role_name, model, provider.value)
+            self._team_table = (settings, table)
         console.print()
-        console.print(table)
+        console.print(self._team_table[1])
         console.print()
     
     def print_workflows(self):
-        table = Table(title="📋 Workflows", box=box.ROUNDED)
-        table.add_column("Name", style="cyan")
-        table.add_column("Pipeline", style="green")
-        
-        workflows = [
-            ("feature", "BA → QA → Senior → Coder → Coder2 → Coder3"),
-            ("review", "Reviewer → Senior"),
-            ("bugfix", "QA → Senior → Coder"),
-            ("architecture", "BA → Senior → QA"),
-            ("project_setup", "BA (creates issues) → Senior (architecture)"),
-            ("pr_review", "Reviewer (reviews PR) → QA (test plan)"),
-            ("full_feature", "BA → Senior → Coder → Coder2 → Coder3 → QA → Reviewer"),
-            ("test_and_verify", "QA (test plan) → Coder (write tests) → QA (run tests)"),
-        ]
-        for name, pipeline in workflows:
-            table.add_row(name, pipeline)
+        if self._workflows_table is None:
+            table = Table(title="📋 Workflows", box=box.ROUNDED)
+            table.add_column("Name", style="cyan")
+            table.add_column("Pipeline", style="green")
+            for name, pipeline in _WORKFLOW_PIPELINES:
+                table.add_row(name, pipeline)
+            self._workflows_table = table
         console.print()
-        console.print(table)
+        console.print(self._workflows_table)
         console.print()
 
     def print_stages(self):
@@ -140,23 +240,47 @@ class CLAIShell:
             return step_name.upper()
         return "_".join(parts[2:]).upper()
     
-    def _query_agent(self, role: Role, prompt_text: str, save_to: Optional[str] = None):
-        with console.status(f"[bold blue]{role.value} thinking...[/bold blue]"):
-            try:
-                response = self.orchestrator.ask(role, prompt_text)
-                self.last_response = response
+    def _answer_cache_scope(self, role: Role, attachment: str) -> str:
+        """Role, its current model and the exact attached files (by hash)."""
+        provider, model = AgentFactory.get_role_runtime_config(role)
+        digest = sha256(attachment.encode("utf-8")).hexdigest()
+        return f"{role.value}|{provider.value}|{model}|{digest}"
+
+    def _query_agent(
+        self,
+        role: Role,
+        prompt_text: str,
+        save_to: Optional[str] = None,
+        attachment: str = "",
+    ):
+        try:
+            response = None
+            if self.answer_cache_enabled:
+                # Only the question is compared; attached files must match exactly
+                scope = self._answer_cache_scope(role, attachment)
+                response = self.answer_cache.get(scope, prompt_text)
+            if response is None:
+                response = self._stream_answer(role, prompt_text + attachment)
+                if self.answer_cache_enabled:
+                    self.answer_cache.put(scope, prompt_text, response)
+            else:
                 console.print()
                 console.print(Panel(
-                    Markdown(response.content),
+                    _markdown(response.content),
                     title=f"[bold green]{role.value.upper()}[/bold green]",
-                    subtitle=f"[dim]{response.model} | {response.total_tokens} tokens[/dim]",
+                    subtitle=f"[dim]{response.model} | cached[/dim]",
                     box=box.ROUNDED,
                 ))
                 console.print()
-                if save_to:
-                    self._save_to_file(response.content, save_to)
-            except Exception as e:
-                console.print(f"[red]Error: {e}[/red]")
+            self.last_response = response
+            if save_to:
+                self._save_to_file(response.content, save_to)
+        except Exception as e:
+            console.print(f"[red]Error: {e}[/red]")
+
+    def _stream_answer(self, role: Role, prompt_text: str):
+        """Render the reply into a live panel as it streams in."""
+        return stream_answer(console, self.orchestrator, role, prompt_text)
     
     def _query_team(self, prompt_text: str):
         console.print("\n[bold blue]🤖 Team roundtable (BA first)...[/bold blue]\n")
@@ -164,7 +288,7 @@ class CLAIShell:
             results = self.orchestrator.consult_team_discussion(prompt_text)
             for role, response in results.items():
                 console.print(Panel(
-                    Markdown(response.content),
+                    _markdown(response.content),
                     title=f"[bold green]{role.value.upper()}[/bold green]",
                     subtitle=f"[dim]{response.model} | {response.total_tokens} tokens[/dim]",
                     box=box.ROUNDED,
@@ -173,13 +297,50 @@ class CLAIShell:
         except Exception as e:
             console.print(f"[red]Team discussion error: {e}[/red]")
     
+    def _run_async(self, coro):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+
+    def _query_broadcast(self, prompt_text: str):
+        from rich.progress import Progress, SpinnerColumn, TextColumn
+
+        console.print("\n[bold blue]🤖 Asking the whole team at once...[/bold blue]\n")
+        roles = list(Role)
+        # One spinner per role still thinking; answers print above them
+        progress = Progress(SpinnerColumn(), TextColumn("[dim]{task.description}[/dim]"), console=console, transient=True)
+        waiting = {role: progress.add_task(f"{role.value} thinking...") for role in roles}
+
+        async def _render():
+            with progress:
+                async for role, outcome in self.orchestrator.broadcast_async(
+                    prompt_text, roles=roles, combine_same_model=get_settings().broadcast_combine_same_model
+                ):
+                    task = waiting.pop(role, None)
+                    if task is not None:
+                        progress.remove_task(task)
+                    if isinstance(outcome, Exception):
+                        console.print(f"[red]{role.value.upper()} error: {outcome}[/red]")
+                        continue
+                    console.print(Panel(
+                        _markdown(outcome.content),
+                        title=f"[bold green]{role.value.upper()}[/bold green]",
+                        subtitle=f"[dim]{outcome.model} | {outcome.total_tokens} tokens[/dim]",
+                        box=box.ROUNDED,
+                    ))
+                    console.print()
+
+        try:
+            self._run_async(_render())
+        except Exception as e:
+            console.print(f"[red]Team broadcast error: {e}[/red]")
+
     def _save_to_file(self, content: str, filename: str):
         try:
             filepath = Path(filename)
             filepath.parent.mkdir(parents=True, exist_ok=True)
-            code_extensions = {".py", ".js", ".ts", ".java", ".cpp", ".c", ".go", ".rs"}
-            code_match = re.search(r"```(?:\w+)?\n(.*?)```", content, re.DOTALL)
-            if code_match and filepath.suffix in code_extensions:
+            code_match = _CODE_BLOCK_RE.search(content) if filepath.suffix in _CODE_EXTENSIONS else None
+            if code_match:
                 filepath.write_text(code_match.group(1).strip())
             else:
                 filepath.write_text(content)
@@ -187,57 +348,104 @@ class CLAIShell:
         except Exception as e:
             console.print(f"[red]Error saving: {e}[/red]")
     
+    def _read_context_files(self, files: List[Tuple[str, os.stat_result]]) -> List[Optional[str]]:
+        """Text of each (path, stat) file; unchanged files come from the cache."""
+        from core.filesystem import read_text_files
+
+        cache = self._context_cache
+        texts: List[Optional[str]] = []
+        missing = []
+        for file, st in files:
+            cached = cache.get(file)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                cache.move_to_end(file)
+                texts.append(cached[2])
+            else:
+                missing.append(len(texts))
+                texts.append(None)
+
+        # Unreadable and binary files come back as None and are not cached
+        for i, text in zip(missing, read_text_files([files[i][0] for i in missing])):
+            texts[i] = text
+            if text is None:
+                continue
+            file, st = files[i]
+            old = cache.pop(file, None)
+            if old is not None:
+                self._context_cache_chars -= len(old[2])
+            cache[file] = (st.st_mtime_ns, st.st_size, text)
+            self._context_cache_chars += len(text)
+        while self._context_cache_chars > _CONTEXT_CACHE_MAX_CHARS and len(cache) > 1:
+            self._context_cache_chars -= len(cache.popitem(last=False)[1][2])
+        return texts
+
     def _load_file_context(self, filepath: str) -> str:
         path = Path(filepath)
         if not path.exists():
             console.print(f"[red]Not found: {filepath}[/red]")
             return ""
         if path.is_file():
-            return f"\n\n---\nFile: {path.name}\n```\n{path.read_text()}\n```\n"
+            text = self._read_context_files([(str(path), path.stat())])[0]
+            if text is None:
+                console.print(f"[red]Can't read {filepath} as text[/red]")
+                return ""
+            return f"\n\n---\nFile: {path.name}\n```\n{text}\n```\n"
         if path.is_dir():
-            context = f"\n\n---\nDirectory: {path}\n"
-            for file in path.rglob("*"):
-                if file.is_file() and file.suffix in {".py", ".js", ".ts", ".json", ".md", ".txt"}:
-                    try:
-                        context += f"\n### {file.relative_to(path)}\n```\n{file.read_text()}\n```\n"
-                    except:
-                        pass
-            return context
+            from core.filesystem import walk_files
+
+            # Hidden, dependency and build directories are pruned by the walk
+            files = []
+            total = skipped = 0
+            for entry in walk_files(str(path), _is_context_file, max_depth=_CONTEXT_MAX_DEPTH):
+                st = entry.stat()
+                if st.st_size > _CONTEXT_MAX_FILE_BYTES or total + st.st_size > _CONTEXT_MAX_TOTAL_BYTES:
+                    skipped += 1
+                    continue
+                total += st.st_size
+                files.append((entry.path, st))
+            if skipped:
+                console.print(f"[yellow]Left out {skipped} file(s) over the context size limits[/yellow]")
+            parts = [f"\n\n---\nDirectory: {path}\n"]
+            for (file, _), text in zip(files, self._read_context_files(files)):
+                if text is not None:
+                    parts.append(f"\n### {os.path.relpath(file, path)}\n```\n{text}\n```\n")
+            return "".join(parts)
         return ""
     
     def handle_mention(self, user_input: str):
+        # The redirect targets come last, so split at the last "<" / ">" and
+        # leave any earlier ones in the question
         save_to = None
-        if ">" in user_input:
-            parts = user_input.split(">")
-            user_input = parts[0].strip()
-            save_to = parts[1].strip()
+        head, sep, tail = user_input.rpartition(">")
+        if sep:
+            user_input = head.strip()
+            save_to = tail.strip()
         
         file_context = ""
-        if "<" in user_input:
-            parts = user_input.split("<")
-            user_input = parts[0].strip()
-            file_context = self._load_file_context(parts[1].strip())
+        head, sep, tail = user_input.rpartition("<")
+        if sep:
+            user_input = head.strip()
+            file_context = self._load_file_context(tail.strip())
         
-        mentions_found = []
-        for mention, role in MENTION_ALIASES.items():
-            if mention in user_input.lower():
-                mentions_found.append((mention, role))
-                user_input = re.sub(re.escape(mention), "", user_input, flags=re.IGNORECASE)
+        # One scan finds every mention, in the order they were typed
+        mentions = [match.lower() for match in MENTION_RE.findall(user_input)]
+        mentioned_roles = [role for role in map(MENTION_ALIASES.get, mentions) if role is not None]
+        is_team_query = not TEAM_MENTION_SET.isdisjoint(mentions)
+        is_broadcast = not BROADCAST_MENTION_SET.isdisjoint(mentions)
+        user_input = MENTION_RE.sub("", user_input)
         
-        is_team_query = any(tm in user_input.lower() for tm in TEAM_MENTIONS)
-        if is_team_query:
-            for tm in TEAM_MENTIONS:
-                user_input = re.sub(re.escape(tm), "", user_input, flags=re.IGNORECASE)
-        
-        prompt_text = user_input.strip() + file_context
+        question = user_input.strip()
+        prompt_text = question + file_context
         if not prompt_text.strip():
             console.print("[yellow]What would you like to ask?[/yellow]")
             return
         
-        if is_team_query:
+        if is_broadcast:
+            self._query_broadcast(prompt_text)
+        elif is_team_query:
             self._query_team(prompt_text)
-        elif mentions_found:
-            self._query_agent(mentions_found[0][1], prompt_text, save_to)
+        elif mentioned_roles:
+            self._query_agent(mentioned_roles[0], question, save_to, attachment=file_context)
         else:
             console.print("[yellow]No @mention found. Try: @senior, @dev, @qa, @ba, @team[/yellow]")
     
@@ -274,14 +482,18 @@ class CLAIShell:
             context["project_description"] = Prompt.ask("[cyan]Describe the project[/cyan]")
         
         console.print(f"\n[bold blue]🚀 Running {workflow_name} workflow...[/bold blue]\n")
+
+        def on_step_done(step_name: str, response) -> None:
+            # Independent steps run concurrently; show each one as it lands
+            console.print(Panel(_markdown(response.content), title=f"[bold]{self._step_label(step_name)}[/bold]", box=box.ROUNDED))
+            console.print()
+
         try:
-            result = self.orchestrator.run_workflow(workflow_name, context)
+            result = self._run_async(
+                self.orchestrator.run_workflow_async(workflow_name, context, on_step_done=on_step_done)
+            )
             if result.status.value == "completed":
                 console.print(f"[green]✓ Done in {result.duration:.2f}s[/green]\n")
-                for step_name, response in result.outputs.items():
-                    role_name = self._step_label(step_name)
-                    console.print(Panel(Markdown(response.content), title=f"[bold]{role_name}[/bold]", box=box.ROUNDED))
-                    console.print()
             else:
                 console.print("[red]✗ Workflow failed[/red]")
                 for error in result.errors:
@@ -340,7 +552,7 @@ class CLAIShell:
                 console.print(f"[green]✓ Done in {result.duration:.2f}s[/green]\n")
                 for step_name, response in result.outputs.items():
                     role_name = self._step_label(step_name)
-                    console.print(Panel(Markdown(response.content), title=f"[bold]{role_name}[/bold]", box=box.ROUNDED))
+                    console.print(Panel(_markdown(response.content), title=f"[bold]{role_name}[/bold]", box=box.ROUNDED))
                     console.print()
             else:
                 console.print("[red]✗ Stage failed[/red]")
@@ -349,21 +561,18 @@ class CLAIShell:
         except Exception as e:
             console.print(f"[red]Error: {e}[/red]")
     
-    def handle_config(self):
+    def handle_config(self, args: Optional[list] = None):
+        if args and args[0].lower() == "reload":
+            self._reload_settings()
+            console.print("[green]✓ Settings reloaded[/green]")
         try:
             settings = get_settings()
             table = Table(title="🔑 API Keys", box=box.ROUNDED)
             table.add_column("Provider", style="cyan")
             table.add_column("Status")
-            for provider, key in [
-                ("Anthropic", settings.anthropic_api_key),
-                ("OpenAI", settings.openai_api_key),
-                ("Google", settings.google_api_key),
-                ("Kimi", settings.kimi_api_key),
-                ("OpenRouter", settings.openrouter_api_key),
-            ]:
-                status = "[green]✓[/green]" if key and key.get_secret_value() else "[red]✗[/red]"
-                table.add_row(provider, status)
+            for provider, configured in settings.configured_providers.items():
+                status = "[green]✓[/green]" if configured else "[red]✗[/red]"
+                table.add_row(PROVIDER_LABELS[provider], status)
             console.print()
             console.print(table)
             console.print()
@@ -372,15 +581,7 @@ class CLAIShell:
             routing.add_column("Role", style="cyan")
             routing.add_column("Model", style="green")
             routing.add_column("Provider", style="blue")
-            for role_name, role in [
-                ("BA", Role.BA),
-                ("QA", Role.QA),
-                ("Senior Dev", Role.SENIOR_DEV),
-                ("Coder", Role.CODER),
-                ("Coder 2", Role.CODER_2),
-                ("Coder 3", Role.CODER_3),
-                ("Reviewer", Role.REVIEWER),
-            ]:
+            for role_name, role in _TEAM_ROWS:
                 provider, model = AgentFactory.get_role_runtime_config(role)
                 routing.add_row(role_name, model, provider.value)
             console.print(routing)
@@ -411,6 +612,48 @@ class CLAIShell:
         except Exception as e:
             console.print(f"[red]Config error: {e}[/red]")
     
+    def _reload_settings(self) -> None:
+        """Re-read .env and overrides.json and drop everything built from the old settings.
+
+        The orchestrator (agents, GitHub MCP server, worker threads), SDK
+        clients, HTTP pools, response caches and the filesystem sandbox are
+        rebuilt on next use.
+        """
+        from agents._http import close_shared_http_clients
+        from agents.base import clear_client_cache
+        from agents.cache import reset_response_cache
+        from agents.semantic_cache import reset_semantic_cache
+        from core.filesystem import get_filesystem
+
+        if self._orchestrator is not None:
+            self._orchestrator.close()
+            self._orchestrator = None
+        close_shared_http_clients(self._loop)
+        clear_client_cache()
+        reset_response_cache()
+        reset_semantic_cache()
+        clear_settings_cache()
+        get_filesystem.cache_clear()
+        self.answer_cache = self._new_answer_cache()
+
+    def handle_cache(self, args: list):
+        action = args[0].lower() if args else ""
+        if action in ("on", "off"):
+            self.answer_cache_enabled = action == "on"
+        elif action == "clear":
+            self.answer_cache.clear()
+            console.print("[green]✓ Answer cache cleared[/green]")
+            return
+        elif action:
+            console.print("[red]Usage: cache [on|off|clear][/red]")
+            return
+        stats = self.answer_cache.stats()
+        state = "[green]on[/green]" if self.answer_cache_enabled else "[yellow]off[/yellow]"
+        console.print(
+            f"\n[cyan]Answer cache:[/cyan] {state} | "
+            f"{stats['entries']} entries, {stats['hits']} hits, {stats['misses']} misses\n"
+        )
+
     def handle_projects(self):
         projects = self.fs.list_projects()
         if not projects:
@@ -461,11 +704,11 @@ class CLAIShell:
             return
         result = self.fs.read_file(args[0])
         if result.success:
-            ext = Path(args[0]).suffix.lstrip(".")
-            syntax_map = {"py": "python", "js": "javascript", "json": "json", "md": "markdown"}
-            syntax = syntax_map.get(ext, "")
+            syntax = _SYNTAX_BY_SUFFIX.get(Path(args[0]).suffix, "")
             console.print(f"\n[cyan]📄 {args[0]}[/cyan]\n")
             if syntax:
+                from rich.syntax import Syntax
+
                 console.print(Syntax(result.data, syntax, theme="monokai", line_numbers=True))
             else:
                 console.print(result.data)
@@ -565,6 +808,8 @@ class CLAIShell:
 
     def handle_kickoff(self, args: list):
         """Run the full project pipeline — the flagship IT team experience."""
+        from core.pipeline import ProjectPipeline, PhaseResult, PhaseStatus
+
         project_name = args[0] if args else ""
         if not project_name:
             project_name = Prompt.ask("[cyan]Project name[/cyan]", default="my-project")
@@ -620,7 +865,7 @@ class CLAIShell:
             if len(preview) > 400:
                 preview = preview[:400].rstrip() + "..."
             console.print(Panel(
-                Markdown(preview),
+                _markdown(preview),
                 title=f"[bold]{role_label}[/bold]",
                 subtitle=f"[dim]step {step_count}[/dim]",
                 box=box.SIMPLE,
@@ -677,7 +922,7 @@ class CLAIShell:
             console.print()
             console.print(
                 Panel(
-                    Markdown(last_output.content),
+                    _markdown(last_output.content),
                     title="[bold green]PIPELINE SUMMARY[/bold green]",
                     box=box.DOUBLE,
                 )
@@ -706,61 +951,37 @@ class CLAIShell:
         cmd = parts[0].lower()
         args = parts[1:]
         
-        if self.current_role and cmd not in COMMANDS:
+        handler = self._commands.get(cmd)
+        if self.current_role and handler is None:
             self._query_agent(self.current_role, user_input)
-            return
-        
-        if cmd in ("exit", "quit"):
-            self.running = False
-            console.print("[yellow]Goodbye! 👋[/yellow]")
-        elif cmd == "help":
-            self.print_help()
-        elif cmd == "team":
-            self.print_team()
-        elif cmd == "workflows":
-            self.print_workflows()
-        elif cmd == "stages":
-            self.print_stages()
-        elif cmd == "config":
-            self.handle_config()
-        elif cmd == "clear":
-            console.clear()
-            self.print_banner()
-        elif cmd == "workflow":
-            self.handle_workflow(args)
-        elif cmd == "stage":
-            self.handle_stage(args)
-        elif cmd == "history":
-            for role, agent in self.orchestrator._agents.items():
-                if agent.conversation_history:
-                    console.print(f"\n[bold]{role.value}[/bold]: {len(agent.conversation_history)} messages")
-        elif cmd == "save":
-            if self.last_response and args:
-                self._save_to_file(self.last_response.content, args[0])
-            else:
-                console.print("[yellow]Usage: save <filename>[/yellow]")
-        elif cmd == "workspace":
-            console.print(f"\n[cyan]📁 Workspace:[/cyan] {self.fs.workspace_root}\n")
-        elif cmd == "projects":
-            self.handle_projects()
-        elif cmd == "newproject":
-            self.handle_new_project(args)
-        elif cmd == "files":
-            self.handle_files(args)
-        elif cmd == "tree":
-            self.handle_tree(args)
-        elif cmd == "readfile":
-            self.handle_read_file(args)
-        elif cmd == "github":
-            self.handle_github(args)
-        elif cmd == "tools":
-            self.handle_tools(args)
-        elif cmd == "kickoff":
-            self.handle_kickoff(args)
-        elif user_input.startswith("@") or "@" in user_input:
+        elif handler is not None:
+            handler(args)
+        elif "@" in user_input:
             self.handle_mention(user_input)
         else:
             console.print("[yellow]Tip: Use @mentions like @senior, @dev, @qa[/yellow]")
+
+    def _cmd_exit(self, args: list):
+        self.running = False
+        console.print("[yellow]Goodbye! 👋[/yellow]")
+
+    def _cmd_clear(self, args: list):
+        console.clear()
+        self.print_banner()
+
+    def _cmd_history(self, args: list):
+        for role, agent in self.orchestrator._agents.items():
+            if agent.conversation_history:
+                console.print(f"\n[bold]{role.value}[/bold]: {len(agent.conversation_history)} messages")
+
+    def _cmd_save(self, args: list):
+        if self.last_response and args:
+            self._save_to_file(self.last_response.content, args[0])
+        else:
+            console.print("[yellow]Usage: save <filename>[/yellow]")
+
+    def _cmd_workspace(self, args: list):
+        console.print(f"\n[cyan]📁 Workspace:[/cyan] {self.fs.workspace_root}\n")
     
     def run(self):
         console.clear()
@@ -772,19 +993,19 @@ class CLAIShell:
         except Exception as e:
             console.print(f"[red]⚠ Config error: {e}[/red]\n")
         
+        # prompt() builds a new PromptSession (layout, key bindings, history
+        # load) per call; one session serves the whole loop
+        session = PromptSession(completer=self.completer, history=self.history)
         while self.running:
             try:
-                user_input = prompt(
-                    self.get_prompt_text(),
-                    completer=self.completer,
-                    history=FileHistory(str(self.history_file)),
-                )
+                user_input = session.prompt(self.get_prompt_text())
                 self.process_input(user_input)
             except KeyboardInterrupt:
                 console.print("\n[yellow]Use 'exit' to quit[/yellow]")
             except EOFError:
                 self.running = False
                 console.print("\n[yellow]Goodbye! 👋[/yellow]")
+        self.history.flush()
 
 
 def main():
@@ -0,0 +1,69 @@
+"""Shell rendering - reply panels shared by the shell and the CLI."""
+import re
+import time
+from typing import TYPE_CHECKING
+
+from rich.console import Console
+from rich.live import Live
+from rich.padding import Padding
+from rich.panel import Panel
+from rich.text import Text
+from rich import box
+
+if TYPE_CHECKING:
+    from agents.base import AgentResponse
+    from agents.factory import Role
+    from core.orchestrator import Orchestrator
+
+
+# Any of these means the reply needs the Markdown renderer
+_MARKDOWN_HINT = re.compile(r"```|`|\*\*|__|^\s*(?:#|[-*+] |\d+\. |>|\|)|\[[^\]]*\]\(", re.MULTILINE)
+
+
+def markdown(text: str):
+    """Markdown renderable for *text*, or plain Text when it has no markup."""
+    if not _MARKDOWN_HINT.search(text):
+        return Text(text)
+    # rich.markdown pulls in markdown-it; load it with the first formatted reply
+    from rich.markdown import Markdown
+
+    return Markdown(text)
+
+
+def stream_answer(
+    console: Console,
+    orchestrator: "Orchestrator",
+    role: "Role",
+    prompt: str,
+    include_history: bool = False,
+    padded: bool = True,
+) -> "AgentResponse":
+    """Render the reply into a live panel as it streams in.
+
+    *padded* adds a blank line above and below the panel as part of the same
+    render, instead of separate console.print() calls.
+    """
+    title = f"[bold green]{role.value.upper()}[/bold green]"
+    parts = []
+    last_render = 0.0
+
+    def frame(renderable, subtitle=None):
+        panel = Panel(renderable, title=title, subtitle=subtitle, box=box.ROUNDED)
+        return Padding(panel, (1, 0)) if padded else panel
+
+    with Live(frame(f"[dim]{role.value} thinking...[/dim]"), console=console, refresh_per_second=12) as live:
+        def on_text(chunk: str) -> None:
+            nonlocal last_render
+            parts.append(chunk)
+            # Re-parsing Markdown is O(text); redraw at most every 50ms
+            now = time.monotonic()
+            if now - last_render >= 0.05:
+                last_render = now
+                live.update(frame(markdown("".join(parts))))
+
+        response = orchestrator.ask_stream(role, prompt, on_text, include_history=include_history)
+        live.update(frame(
+            markdown(response.content),
+            subtitle=f"[dim]{response.model} | {response.total_tokens} tokens[/dim]",
+        ))
+    return response
@@ -0,0 +1,487 @@
+import asyncio
+from types import SimpleNamespace
+
+from agents.base import AgentResponse, BaseAgent, Message, MessageRole, clear_client_cache, shared_client
+from agents.batch import BatchProcessor
+from agents.cache import get_response_cache
+from config import get_settings
+
+
+class FakeClient:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+def test_shared_client_reuses_identical_configs():
+    clear_client_cache()
+
+    first = shared_client(FakeClient, api_key="k1", timeout=300)
+    again = shared_client(FakeClient, timeout=300, api_key="k1")
+    other = shared_client(FakeClient, api_key="k2", timeout=300)
+
+    assert first is again
+    assert first is not other
+
+    from agents.base import _CLIENT_CACHE
+
+    # API keys are hashed, never kept in plaintext in the cache keys
+    assert not any("k1" in key for key in _CLIENT_CACHE)
+
+    clear_client_cache()
+    assert shared_client(FakeClient, api_key="k1", timeout=300) is not first
+
+
+def test_sync_http_pool_is_shared_per_sdk():
+    import httpx
+    from agents._http import close_shared_http_clients, get_shared_sync_http_client
+
+    sdk = SimpleNamespace(__name__="fake_sdk", DefaultHttpxClient=httpx.Client)
+
+    pool = get_shared_sync_http_client(sdk)
+    assert get_shared_sync_http_client(sdk) is pool
+
+    close_shared_http_clients()
+    assert pool.is_closed
+
+
+class CountingAgent(BaseAgent):
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+        super().__init__(*args, **kwargs)
+
+    @property
+    def provider_name(self) -> str:
+        return "dummy"
+
+    def _initialize_client(self) -> None:
+        self._client = object()
+
+    def _send_request(self, messages):
+        self.calls += 1
+        return AgentResponse(
+            content=f"answer {self.calls}",
+            model=self.model,
+            provider=self.provider_name,
+            usage={"total_tokens": 10},
+            finish_reason="stop",
+        )
+
+
+def test_response_cache_serves_identical_requests(monkeypatch):
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", True)
+    get_response_cache().clear()
+    agent = CountingAgent(model="cache-model", system_prompt="cache test")
+
+    first = agent.chat("same question", include_history=False)
+    second = agent.chat("same question", include_history=False)
+    # Different history prefix → different key, even for the same prompt.
+    third = agent.chat("same question", include_history=True)
+
+    assert agent.calls == 2
+    assert second.content == first.content == "answer 1"
+    assert second.total_tokens == 0
+    assert third.content == "answer 2"
+    assert len(agent.conversation_history) == 6
+    assert get_response_cache().stats()["tokens_saved"] == 10
+
+    agent.use_response_cache = False
+    agent.chat("same question", include_history=False)
+    assert agent.calls == 3
+
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", False)
+    agent.use_response_cache = True
+    agent.chat("same question", include_history=False)
+    assert agent.calls == 4
+
+
+def test_batch_processor_falls_back_to_concurrent_requests():
+    agent = CountingAgent(model="batch-model", system_prompt="batch test")
+
+    outcomes = asyncio.run(BatchProcessor().run_agent_batch(agent, ["one", "two", "three"]))
+
+    assert agent.calls == 3
+    assert all(isinstance(outcome, AgentResponse) for outcome in outcomes)
+
+
+def test_batch_processor_runs_mixed_agents_in_input_order():
+    ba = CountingAgent(model="batch-model", system_prompt="ba")
+    qa = CountingAgent(model="batch-model", system_prompt="qa")
+
+    outcomes = asyncio.run(BatchProcessor().run_requests([(ba, "one"), (qa, "one"), (ba, "two")]))
+
+    assert (ba.calls, qa.calls) == (2, 1)
+    assert outcomes[1].content == "answer 1"
+    assert sorted([outcomes[0].content, outcomes[2].content]) == ["answer 1", "answer 2"]
+
+
+def test_convert_messages_converts_each_message_once():
+    from agents.token_saver import compact_message_text
+
+    agent = CountingAgent(model="convert-model")
+    converted = []
+
+    def convert(msg):
+        converted.append(msg.content)
+        return None if msg.role == MessageRole.SYSTEM else {"content": msg.content}
+
+    history = [Message(MessageRole.SYSTEM, "sys"), Message(MessageRole.USER, "a")]
+    assert agent._convert_messages(history, convert) == [{"content": "a"}]
+
+    history = history + [Message(MessageRole.ASSISTANT, "b"), Message(MessageRole.USER, "c")]
+    assert agent._convert_messages(history, convert) == [
+        {"content": "a"}, {"content": "b"}, {"content": "c"},
+    ]
+    assert converted == ["sys", "a", "b", "c"]
+
+    # Trimming the oldest messages still reuses the rest.
+    assert agent._convert_messages(history[2:], convert) == [{"content": "b"}, {"content": "c"}]
+    assert len(converted) == 4
+
+    # A compacted copy has different content, so it is converted afresh.
+    long_reply = Message(MessageRole.ASSISTANT, "d" * 100)
+    agent._convert_messages([long_reply], convert)
+    compacted = compact_message_text(long_reply, max_chars=40)
+    assert agent._convert_messages([compacted], convert) == [{"content": compacted.content}]
+    assert converted[-2:] == [long_reply.content, compacted.content]
+
+
+def test_gemini_reuses_chat_session_across_turns(monkeypatch):
+    from agents.gemini_agent import GeminiAgent
+
+    started = []
+
+    class FakeChat:
+        def __init__(self, history):
+            started.append(len(history))
+
+        def send_message(self, payload):
+            part = SimpleNamespace(function_call=SimpleNamespace(name=""), text=f"re: {payload}")
+            return SimpleNamespace(parts=[part], usage_metadata=None)
+
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", False)
+    agent = GeminiAgent(model="gemini-test")
+    agent._client = SimpleNamespace(start_chat=lambda history: FakeChat(history))
+
+    agent.chat("one")
+    agent.chat("two")
+    agent.chat("three")
+    agent.chat("side question", include_history=False)
+    agent.chat("four")
+
+    # Turns two/three continue the live session; the detour and the turn after
+    # it diverge from the session and start fresh from rebuilt history.
+    assert started == [0, 0, 8]
+
+
+class StreamingAgent(CountingAgent):
+    def _stream_request(self, messages):
+        self.calls += 1
+        for word in ("streamed ", "reply"):
+            yield word
+        return AgentResponse(
+            content="streamed reply",
+            model=self.model,
+            provider=self.provider_name,
+            finish_reason="stop",
+        )
+
+
+def test_stream_chat_yields_chunks_and_returns_response(monkeypatch):
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", False)
+    agent = StreamingAgent(model="stream-model")
+
+    chunks = []
+    stream = agent.stream_chat("hi")
+    try:
+        while True:
+            chunks.append(next(stream))
+    except StopIteration as stop:
+        response = stop.value
+
+    assert chunks == ["streamed ", "reply"]
+    assert response.content == "streamed reply"
+    assert [m.content for m in agent.conversation_history] == ["hi", "streamed reply"]
+    # chat() keeps using the non-streaming path.
+    assert agent.chat("again").content == "answer 2"
+
+
+def test_agents_package_does_not_import_provider_sdks():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, agents;"
+        "from agents.factory import AgentFactory;"
+        "print(sorted(m for m in ('anthropic', 'openai', 'google.generativeai') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_trim_to_token_budget_drops_oldest_turns():
+    from agents.tokens import message_tokens, trim_to_token_budget
+
+    history = []
+    for i in range(5):
+        history.append(Message(MessageRole.USER, f"question {i} " + "x" * 400))
+        history.append(Message(MessageRole.ASSISTANT, f"answer {i} " + "y" * 400))
+    history.append(Message(MessageRole.USER, "latest"))
+
+    per_turn = message_tokens(history[0], "gpt-4o") + message_tokens(history[1], "gpt-4o")
+    budget = 2 * per_turn + message_tokens(history[-1], "gpt-4o")
+
+    trimmed = trim_to_token_budget(history, budget, "gpt-4o")
+
+    assert trimmed == history[-5:]
+    assert trimmed[0].role == MessageRole.USER
+    assert "tokens" in history[-1].metadata
+    assert trim_to_token_budget(history, 1, "gpt-4o") == history[-1:]
+
+
+def test_large_token_counts_are_cached_by_content(monkeypatch):
+    from agents import tokens
+
+    encoded = []
+
+    class FakeEncoder:
+        def encode(self, text, disallowed_special=()):
+            encoded.append(len(text))
+            return text.split()
+
+    monkeypatch.setattr(tokens, "get_encoder", lambda model: FakeEncoder())
+    monkeypatch.setattr(tokens, "_count_cache", type(tokens._count_cache)())
+    attachment = "def f():\n    return 1\n" * 400
+
+    first = tokens.count_tokens(attachment, "gpt-4o")
+    assert tokens.count_tokens("".join([attachment]), "gpt-4o") == first
+    assert tokens.count_tokens("short prompt", "gpt-4o") == 2
+    assert tokens.count_tokens("short prompt", "gpt-4o") == 2
+
+    assert encoded == [len(attachment), 12, 12]
+
+
+def test_token_counts_fall_back_when_tiktoken_cannot_load_its_encoding(monkeypatch):
+    import sys
+
+    from agents import tokens
+
+    def offline(name):
+        raise ConnectionError("could not download o200k_base.tiktoken")
+
+    monkeypatch.setitem(sys.modules, "tiktoken", SimpleNamespace(encoding_for_model=offline, get_encoding=offline))
+    tokens.get_encoder.cache_clear()
+    try:
+        assert tokens.get_encoder("offline-model") is None
+        assert tokens.count_tokens("x" * 40, "offline-model") == 11
+    finally:
+        tokens.get_encoder.cache_clear()
+
+
+def test_retry_request_retries_transient_errors(monkeypatch):
+    monkeypatch.setattr("agents.base.time.sleep", lambda _: None)
+    agent = CountingAgent(model="retry-model")
+    failures = [TimeoutError("read timed out"), RuntimeError("503 service unavailable")]
+
+    def flaky():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert agent._retry_request(flaky) == "ok"
+
+    def broken():
+        raise ValueError("bad request")
+
+    try:
+        agent._retry_request(broken)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("non-transient errors must not be retried")
+
+
+def test_hedged_request_takes_the_faster_duplicate(monkeypatch):
+    from agents._latency import latency_tracker
+
+    monkeypatch.setattr(get_settings(), "request_hedging_enabled", True)
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", False)
+    latency_tracker.clear()
+    for _ in range(5):
+        latency_tracker.record(("dummy", "hedge-model"), 0.01)
+
+    class SlowFirstAgent(CountingAgent):
+        async def _send_request_async(self, messages):
+            self.calls += 1
+            call = self.calls
+            await asyncio.sleep(1.0 if call == 1 else 0)
+            return AgentResponse(content=f"reply {call}", model=self.model, provider=self.provider_name)
+
+    agent = SlowFirstAgent(model="hedge-model")
+    response = asyncio.run(agent.achat("hi"))
+
+    assert agent.calls == 2
+    assert response.content == "reply 2"
+    latency_tracker.clear()
+
+
+def test_role_resolution_is_cached_per_settings_object(monkeypatch):
+    from agents.factory import AgentFactory, Role
+    from config import clear_settings_cache
+
+    first = AgentFactory.get_role_runtime_config(Role.QA)
+    monkeypatch.setattr(get_settings(), "role_model_overrides", {"qa": "other-model"})
+    assert AgentFactory.get_role_runtime_config(Role.QA) == first
+
+    monkeypatch.setenv("ROLE_MODEL_OVERRIDES", '{"qa": "other-model"}')
+    clear_settings_cache()
+    try:
+        assert AgentFactory.get_role_runtime_config(Role.QA)[1] == "other-model"
+    finally:
+        monkeypatch.delenv("ROLE_MODEL_OVERRIDES")
+        clear_settings_cache()
+
+
+def test_provider_groups_follow_role_overrides(monkeypatch):
+    from agents.factory import AgentFactory, Provider, Role
+    from config import clear_settings_cache
+
+    monkeypatch.setenv("ROLE_PROVIDER_OVERRIDES", '{"ba": "openai", "reviewer": "openai"}')
+    monkeypatch.setenv("ROLE_MODEL_OVERRIDES", '{"ba": "gpt-test", "reviewer": "gpt-test"}')
+    clear_settings_cache()
+    try:
+        groups = AgentFactory.provider_groups()
+        assert groups is AgentFactory.provider_groups()
+        assert groups[(Provider.OPENAI, "gpt-test")] == (Role.BA, Role.REVIEWER)
+        assert sum(len(roles) for roles in groups.values()) == len(Role)
+    finally:
+        clear_settings_cache()
+
+
+def test_claude_reuses_system_param_until_prompt_changes():
+    from agents.claude_agent import ClaudeAgent
+
+    agent = ClaudeAgent(model="claude-test", system_prompt="You review code.")
+    messages = [Message(MessageRole.USER, "hi")]
+
+    first = agent._build_request_params(messages)["system"]
+    assert agent._build_request_params(messages)["system"] is first
+
+    agent.set_system_prompt("You write tests.")
+    changed = agent._build_request_params(messages)["system"]
+    assert changed is not first
+    assert "You write tests." in str(changed)
+
+
+def test_semantic_cache_serves_near_duplicate_single_turn_prompts(monkeypatch):
+    from agents.semantic_cache import SemanticCache, get_semantic_cache
+
+    cache = SemanticCache(threshold=0.95)
+    reply = AgentResponse(content="cached", model="m", provider="p", usage={"total_tokens": 5})
+    cache.put("scope", "Write unit tests for the login form", reply)
+
+    assert cache.get("scope", "write unit tests for the  login form.").content == "cached"
+    assert cache.get("scope", "Write unit tests for the signup form") is None
+    assert cache.get("other", "Write unit tests for the login form") is None
+
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", True)
+    monkeypatch.setattr(get_settings(), "semantic_cache_enabled", True)
+    get_response_cache().clear()
+    get_semantic_cache().clear()
+    agent = CountingAgent(model="semantic-model")
+
+    agent.chat("Write unit tests for the login form", include_history=False)
+    hit = agent.chat("write unit tests for the login form.", include_history=False)
+    agent.chat("Write unit tests for the login form.", include_history=True)
+
+    assert hit.content == "answer 1"
+    # Requests carrying history never match semantically.
+    assert agent.calls == 2
+
+
+def test_role_cacheable_flag_controls_claude_system_cache_marker(monkeypatch):
+    from dataclasses import replace as dc_replace
+
+    from agents.factory import AgentFactory, Provider, Role
+
+    config = AgentFactory._resolve_role(Role.BA)[2]
+    monkeypatch.setattr(AgentFactory, "_resolve_role", staticmethod(
+        lambda role: (Provider.ANTHROPIC, "claude-test", dc_replace(config, cacheable=False))
+    ))
+    messages = [Message(MessageRole.USER, "hi")]
+
+    uncached = AgentFactory.create_by_role(Role.BA)
+    assert uncached.prompt_caching is False
+    assert isinstance(uncached._build_request_params(messages)["system"], str)
+
+    cached = AgentFactory.create_by_provider(Provider.ANTHROPIC, "claude-test", system_prompt="static")
+    assert cached._build_request_params(messages)["system"][0]["cache_control"] == {"type": "ephemeral"}
+
+
+def test_response_cache_reads_through_to_sqlite_store(tmp_path):
+    from agents.cache import ResponseCache, SQLiteCacheStore
+
+    path = tmp_path / "cache.db"
+    reply = AgentResponse(content="persisted", model="m", provider="p", usage={"total_tokens": 7})
+    ResponseCache(store=SQLiteCacheStore(str(path))).put("key", reply)
+
+    # A new process starts with an empty in-memory tier.
+    fresh = ResponseCache(store=SQLiteCacheStore(str(path)))
+    hit = fresh.get("key")
+
+    assert hit.content == "persisted" and hit.usage == {}
+    assert fresh.stats()["tokens_saved"] == 7
+    assert fresh.get("missing") is None
+
+    expired = SQLiteCacheStore(str(path), ttl_seconds=-1)
+    expired.put("old", reply)
+    assert expired.get("old") is None
+
+
+def test_response_cache_compresses_long_content_in_both_tiers(tmp_path):
+    import sqlite3
+    from agents.cache import ResponseCache, SQLiteCacheStore
+
+    text = "The BA reviewed the plan and agreed. " * 40
+    path = tmp_path / "cache.db"
+    cache = ResponseCache(store=SQLiteCacheStore(str(path)))
+    cache.put("key", AgentResponse(content=text, model="m", provider="p"))
+
+    _, packed, _ = cache._entries["key"]
+    assert packed is not None and len(packed) < len(text) // 3
+    assert cache.get("key").content == text
+
+    with sqlite3.connect(str(path)) as conn:
+        (blob,) = conn.execute("SELECT payload FROM responses").fetchone()
+    assert len(blob) < len(text)
+    assert ResponseCache(store=SQLiteCacheStore(str(path))).get("key").content == text
+
+
+def test_role_lookup_imports_only_that_role_module():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys;"
+        "from roles import get_role_config;"
+        "from roles.base import list_roles;"
+        "get_role_config('qa');"
+        "print(sorted(m for m in sys.modules if m.startswith('roles.')));"
+        "print(len(list_roles()))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.split("\n")[:2] == ["['roles.base', 'roles.qa']", "7"]
+
+
+def test_role_configs_resolve_by_enum_or_key_and_list_read_only():
+    from agents.factory import Role
+    from roles.base import get_role_config, list_roles
+
+    assert get_role_config(Role.QA) is get_role_config("qa") is get_role_config(Role.QA)
+    roles = list_roles()
+    assert roles["qa"] is get_role_config("qa")
+    try:
+        roles["qa"] = None
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("list_roles() must not expose the registry for writes")
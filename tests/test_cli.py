@@ -0,0 +1,35 @@
+from click.testing import CliRunner
+
+import cli
+from agents.base import AgentResponse
+from core import WorkflowResult, WorkflowStatus
+
+
+def test_workflow_batch_runs_every_input_and_honours_no_cache(tmp_path, monkeypatch):
+    batch = tmp_path / "inputs.jsonl"
+    batch.write_text('"login page"\n{"requirement": "signup page"}\n', encoding="utf-8")
+    built = []
+
+    class FakeOrchestrator:
+        async def run_workflow_batch(self, workflow_name, contexts):
+            return [
+                WorkflowResult(
+                    status=WorkflowStatus.COMPLETED,
+                    steps_completed=1,
+                    outputs={"step_0_ba": AgentResponse(content=f"plan for {c['requirement']}", model="m", provider="p")},
+                )
+                for c in contexts
+            ]
+
+    def fake_get_orchestrator(verbose=False, use_cache=True):
+        built.append(use_cache)
+        return FakeOrchestrator()
+
+    monkeypatch.setattr(cli, "get_orchestrator", fake_get_orchestrator)
+
+    result = CliRunner().invoke(cli.cli, ["--no-cache", "workflow", "feature", "--batch", str(batch)])
+
+    assert result.exit_code == 0, result.output
+    assert "plan for login page" in result.output
+    assert "plan for signup page" in result.output
+    assert built == [False]
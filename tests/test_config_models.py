@@ -103,3 +103,47 @@ def test_team_presets_cover_every_role_and_use_valid_providers():
         for role_config in preset["roles"].values():
             assert role_config["provider"] in provider_keys
             assert role_config["model"].strip()
+
+
+def test_missing_api_key_only_fails_for_that_provider():
+    from config import Settings
+
+    settings = Settings(_env_file=None, anthropic_api_key="sk-ant", openai_api_key=None)
+
+    assert settings.require_api_key("anthropic") == "sk-ant"
+    try:
+        settings.require_api_key("openai")
+    except RuntimeError as exc:
+        assert "OPENAI_API_KEY" in str(exc)
+    else:
+        raise AssertionError("a missing key must raise when its provider is used")
+
+    assert settings.configured_providers["anthropic"] is True
+    assert settings.configured_providers["openai"] is False
+    assert settings.api_keys["anthropic"] == "sk-ant"
+    assert "sk-ant" not in repr(settings)
+
+
+def test_clai_toml_is_read_below_env_vars_and_above_dotenv(monkeypatch, tmp_path):
+    from config import Settings
+
+    (tmp_path / "clai.toml").write_text('qa_model = "toml-qa"\nba_model = "toml-ba"\n', encoding="utf-8")
+    (tmp_path / ".env").write_text("QA_MODEL=dotenv-qa\nCODER_MODEL=dotenv-coder\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BA_MODEL", "env-ba")
+
+    settings = Settings()
+
+    assert settings.qa_model == "toml-qa"
+    assert settings.ba_model == "env-ba"
+    assert settings.coder_model == "dotenv-coder"
+
+
+def test_workspace_path_is_resolved_and_created_once(monkeypatch, tmp_path):
+    from config import Settings
+
+    settings = Settings(_env_file=None, mcp_workspace_root=str(tmp_path / "ws"))
+
+    first = settings.workspace_path
+    assert first == (tmp_path / "ws").resolve() and first.is_dir()
+    assert settings.workspace_path is first
@@ -0,0 +1,193 @@
+import os
+import pytest
+
+from core.filesystem import FileSystemTools
+
+
+@pytest.fixture
+def fs(tmp_path):
+    return FileSystemTools(str(tmp_path))
+
+
+def test_resolve_path_stays_inside_workspace(fs, tmp_path):
+    assert fs._resolve_path("a/b.txt") == tmp_path.resolve() / "a" / "b.txt"
+    assert fs._resolve_path("/a/b.txt") == fs._resolve_path("a/b.txt")
+    with pytest.raises(ValueError):
+        fs._resolve_path("../outside.txt")
+
+
+def test_symlink_swapped_in_after_a_write_cannot_escape(fs, tmp_path):
+    outside = tmp_path.parent / f"{tmp_path.name}-outside"
+    outside.mkdir()
+    assert fs.write_file("sub/a.txt", "inside").success
+
+    sub = tmp_path / "sub"
+    (sub / "a.txt").unlink()
+    sub.rmdir()
+    sub.symlink_to(outside, target_is_directory=True)
+
+    assert not fs.write_file("sub/a.txt", "ESCAPED").success
+    assert not (outside / "a.txt").exists()
+
+
+def test_write_read_and_delete_round_trip(fs):
+    assert fs.write_file("notes/todo.md", "ship it\n").success
+    assert fs.read_file("notes/todo.md").data == "ship it\n"
+    assert fs.delete_file("notes/todo.md").success
+    assert not fs.read_file("notes/todo.md").success
+
+
+def test_search_and_grep_skip_hidden_and_dependency_directories(fs):
+    fs.write_file("app/main.py", "import os\nTODO = 1\n")
+    fs.write_file("app/util.py", "x = 2\n")
+    fs.write_file("app/readme.md", "todo: docs\n")
+    fs.write_file(".cache/main.py", "TODO = 3\n")
+    fs.write_file("app/node_modules/lib/index.py", "TODO = 4\n")
+    fs.write_file("__pycache__/main.py", "TODO = 5\n")
+
+    assert fs.search_files("*.py") == ["app/main.py", "app/util.py"]
+    assert fs.grep("todo", file_pattern="*.py") == ["app/main.py:2:TODO = 1"]
+    assert sorted(fs.grep("todo")) == ["app/main.py:2:TODO = 1", "app/readme.md:1:todo: docs"]
+
+
+def test_grep_skips_binary_files_and_folds_case(fs, tmp_path):
+    fs.write_file("data/notes.txt", "Straße\nplain\n")
+    (tmp_path / "data" / "blob.bin").write_bytes(b"\x00\x01needle\n")
+    fs.write_file("data/code.py", "NEEDLE = True\n")
+
+    assert fs.grep("needle", "data") == ["data/code.py:1:NEEDLE = True"]
+    assert fs.grep("STRASSE", "data") == []
+    assert fs.grep("STRAßE", "data") == ["data/notes.txt:1:Straße"]
+
+
+def test_grep_parallel_scan_matches_sequential_scan(fs, monkeypatch):
+    for i in range(40):
+        fs.write_file(f"many/f{i:02d}.txt", f"header\nneedle {i}\n")
+
+    parallel = fs.grep("needle", "many")
+    monkeypatch.setattr("core.filesystem._PARALLEL_MIN_FILES", 1000)
+    sequential = fs.grep("needle", "many")
+
+    assert parallel == sequential
+    assert sorted(parallel) == [f"many/f{i:02d}.txt:2:needle {i}" for i in range(40)]
+
+
+def test_list_directory_sorts_entries_and_reports_sizes(fs):
+    fs.write_file("proj/b.txt", "12345")
+    fs.create_directory("proj/a_dir")
+
+    listing = fs.list_directory("proj")
+
+    assert [(i.path, i.is_dir, i.size) for i in listing] == [
+        ("proj/a_dir", True, 0),
+        ("proj/b.txt", False, 5),
+    ]
+
+
+def test_write_truncates_and_append_extends(fs):
+    fs.write_file("log.txt", "a much longer first line\n")
+    fs.write_file("log.txt", "short\n")
+    result = fs.append_file("log.txt", "é\n")
+
+    assert fs.read_file("log.txt").data == "short\né\n"
+    assert result.message == "Appended 3 bytes"
+
+
+def test_get_tree_lists_directories_first_up_to_max_depth(fs):
+    fs.write_file("proj/z.txt", "")
+    fs.write_file("proj/src/a/deep.txt", "")
+    fs.write_file("proj/src/main.py", "")
+
+    assert fs.get_tree("proj", max_depth=2).splitlines() == [
+        "proj/",
+        "├── src/",
+        "│   ├── a/",
+        "│   └── main.py",
+        "└── z.txt",
+    ]
+
+
+def test_list_projects_reuses_listing_until_workspace_changes(fs, tmp_path, monkeypatch):
+    fs.create_project("alpha")
+    assert fs.list_projects() == ["alpha"]
+
+    scans = []
+    real_iterdir = type(tmp_path).iterdir
+    monkeypatch.setattr(type(tmp_path), "iterdir", lambda self: scans.append(self) or real_iterdir(self))
+
+    assert fs.list_projects() == ["alpha"]
+    assert scans == []
+
+    fs.create_project("beta")
+    assert fs.list_projects() == ["alpha", "beta"]
+    fs.delete_project("alpha")
+    assert fs.list_projects() == ["beta"]
+    assert len(scans) == 2
+
+
+def test_read_file_reports_bytes_and_rejects_binary(fs, tmp_path):
+    fs.write_file("café.txt", "héllo")
+    fs.write_file("crlf.txt", "a\r\nb")
+    result = fs.read_file("café.txt")
+    assert result.data == "héllo"
+    assert result.message == "Read 6 bytes"
+    assert fs.read_file("crlf.txt").data == "a\nb"
+
+    (tmp_path / "blob.bin").write_bytes(b"abc\0def")
+    assert not fs.read_file("blob.bin").success
+    (tmp_path / "latin1.txt").write_bytes(b"caf\xe9")
+    assert "binary" in fs.read_file("latin1.txt").message
+
+
+def test_file_info_and_results_are_slotted_and_render():
+    from core.filesystem import FileInfo, OperationResult
+
+    info = FileInfo(path="a.py", name="a.py", is_dir=False, size=3)
+    assert not hasattr(info, "__dict__")
+    assert not hasattr(OperationResult(True, "ok"), "__dict__")
+    assert info == FileInfo("a.py", "a.py", False, 3)
+    assert str(info) == "[FILE] a.py (3 bytes)"
+    assert str(FileInfo(path="src", name="src", is_dir=True)) == "[DIR]  src"
+
+
+def test_create_project_writes_template_files(fs, tmp_path):
+    assert fs.create_project("demo", "python").success
+
+    project = tmp_path / "demo"
+    assert (project / "src" / "__init__.py").read_text() == '"""demo package."""\n'
+    assert (project / "tests" / "test_main.py").is_file()
+    assert "venv/" in (project / ".gitignore").read_text()
+    assert not fs.create_project("demo").success
+
+
+def test_read_many_and_read_text_files_keep_order_and_skip_binaries(fs, tmp_path, monkeypatch):
+    from core.filesystem import read_text_files
+
+    monkeypatch.setattr("core.filesystem._PARALLEL_MIN_FILES", 2)
+    fs.write_file("a.txt", "alpha\r\n")
+    fs.write_file("b.txt", "beta")
+    (tmp_path / "c.bin").write_bytes(b"\0\1")
+
+    results = fs.read_many(["b.txt", "a.txt", "c.bin", "missing.txt"])
+    assert list(results) == ["b.txt", "a.txt", "c.bin", "missing.txt"]
+    assert [r.data for r in results.values()][:2] == ["beta", "alpha\n"]
+    assert not results["c.bin"].success and not results["missing.txt"].success
+
+    paths = [str(tmp_path / name) for name in ("a.txt", "c.bin", "nope", "b.txt")]
+    assert read_text_files(paths) == ["alpha\n", None, None, "beta"]
+
+
+def test_walk_files_stops_at_max_depth(tmp_path):
+    from core.filesystem import walk_files
+
+    deep = tmp_path / "a" / "b" / "c"
+    deep.mkdir(parents=True)
+    for directory in (tmp_path, tmp_path / "a", tmp_path / "a" / "b", deep):
+        (directory / "f.py").write_text("x")
+
+    def found(max_depth):
+        return sorted(os.path.relpath(e.path, tmp_path) for e in walk_files(str(tmp_path), lambda n: True, max_depth))
+
+    assert found(None) == sorted(["f.py", os.path.join("a", "f.py"), os.path.join("a", "b", "f.py"), os.path.join("a", "b", "c", "f.py")])
+    assert found(1) == sorted(["f.py", os.path.join("a", "f.py")])
+    assert found(0) == ["f.py"]
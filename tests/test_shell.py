@@ -0,0 +1,374 @@
+import os
+
+from agents.base import AgentResponse
+from agents.factory import Role
+from shell.main import CLAIShell
+
+
+def _shell(monkeypatch):
+    shell = CLAIShell()
+    asked = []
+
+    def fake_ask(role, prompt, include_history=False):
+        asked.append((role, prompt))
+        return AgentResponse(content=f"answer {len(asked)}", model="m", provider="p")
+
+    def fake_ask_stream(role, prompt, on_text, include_history=False):
+        response = fake_ask(role, prompt)
+        on_text(response.content)
+        return response
+
+    monkeypatch.setattr(shell.orchestrator, "ask", fake_ask)
+    monkeypatch.setattr(shell.orchestrator, "ask_stream", fake_ask_stream)
+    return shell, asked
+
+
+def test_answer_cache_reuses_similar_questions_with_identical_attachments(monkeypatch, tmp_path):
+    shell, asked = _shell(monkeypatch)
+    shell.process_input("cache on")
+
+    shell.process_input("@qa check this module for bugs")
+    shell.process_input("@qa  Check this module for bugs")
+    assert len(asked) == 1
+    assert shell.last_response.content == "answer 1"
+
+    code = tmp_path / "app.py"
+    code.write_text("print('v1')\n")
+    shell.process_input(f"@qa check this module for bugs < {code}")
+    code.write_text("print('v2')\n")
+    shell.process_input(f"@qa check this module for bugs < {code}")
+    assert len(asked) == 3
+    assert "print('v2')" in asked[-1][1]
+
+    shell.process_input("cache off")
+    shell.process_input("@qa check this module for bugs")
+    assert len(asked) == 4 and asked[-1][0] is Role.QA
+
+
+def test_mentions_match_longest_alias_in_typed_order(monkeypatch):
+    shell, asked = _shell(monkeypatch)
+
+    shell.process_input("@dev2 refactor this")
+    shell.process_input("ping @QA, then @dev")
+    shell.process_input("mail me@qa.example.com")
+
+    assert asked == [(Role.CODER_2, "refactor this"), (Role.QA, "ping , then")]
+
+
+def test_completer_completes_only_the_mention_being_typed():
+    from prompt_toolkit.document import Document
+
+    from shell.completer import MentionCompleter
+
+    def complete(text):
+        return [c.text for c in MentionCompleter().get_completions(Document(text), None)]
+
+    assert complete("ask @dev") == ["@dev", "@dev1", "@developer", "@dev2", "@dev3", "@devteam"]
+    assert complete("@qa check this") == []
+    assert complete("work") == ["workflows", "workflow", "workspace"]
+
+
+def test_prefix_trie_returns_words_under_a_prefix_in_order():
+    from shell.completer import PrefixTrie
+
+    trie = PrefixTrie(["stage", "stages", "save", "Status"])
+
+    assert trie.starting_with("st") == ["stage", "stages", "status"]
+    assert trie.starting_with("") == ["stage", "stages", "save", "status"]
+    assert trie.starting_with("x") == []
+
+    # Extending the previous prefix resumes from its node, misses included
+    assert trie.starting_with("xy") == []
+    assert trie.starting_with("sta") == ["stage", "stages", "status"]
+    assert trie.starting_with("stag") == ["stage", "stages"]
+    trie.add("stagger")
+    assert trie.starting_with("stag") == ["stage", "stages", "stagger"]
+    assert trie.starting_with("s") == ["stage", "stages", "save", "status", "stagger"]
+
+
+def test_all_mention_broadcasts_while_team_keeps_the_roundtable(monkeypatch):
+    shell, _ = _shell(monkeypatch)
+    calls = []
+
+    async def fake_broadcast(prompt, roles=None, combine_same_model=False):
+        calls.append(("broadcast", prompt))
+        yield Role.QA, AgentResponse(content="qa", model="m", provider="p")
+
+    monkeypatch.setattr(shell.orchestrator, "broadcast_async", fake_broadcast)
+    monkeypatch.setattr(
+        shell.orchestrator, "consult_team_discussion", lambda prompt: calls.append(("roundtable", prompt)) or {}
+    )
+
+    shell.process_input("@all status?")
+    shell.process_input("@everyone status?")
+    shell.process_input("@team plan?")
+
+    assert calls == [("broadcast", "status?"), ("broadcast", "status?"), ("roundtable", "plan?")]
+
+
+def test_broadcast_prints_answers_and_errors_as_roles_finish(monkeypatch, capsys):
+    shell, _ = _shell(monkeypatch)
+    asked = []
+
+    async def fake_broadcast(prompt, roles=None, combine_same_model=False):
+        asked.extend(roles)
+        yield Role.QA, AgentResponse(content="edge cases covered", model="m", provider="p")
+        yield Role.BA, RuntimeError("rate limited")
+
+    monkeypatch.setattr(shell.orchestrator, "broadcast_async", fake_broadcast)
+    shell.process_input("@all status?")
+
+    out = capsys.readouterr().out
+    assert asked == list(Role)
+    assert "edge cases covered" in out
+    assert "BA error: rate limited" in out
+
+
+def test_workflow_panels_print_as_steps_finish(monkeypatch, capsys):
+    import asyncio
+
+    from rich.prompt import Prompt
+
+    shell, _ = _shell(monkeypatch)
+    finished = []
+
+    async def fake_ask_async(role, prompt, include_history=False):
+        await asyncio.sleep(0)
+        finished.append(role)
+        return AgentResponse(content=f"{role.value} done", model="m", provider="p")
+
+    monkeypatch.setattr(shell.orchestrator, "ask_async", fake_ask_async)
+    monkeypatch.setattr(Prompt, "ask", staticmethod(lambda *args, **kwargs: "a todo app"))
+    shell.process_input("workflow architecture")
+
+    out = capsys.readouterr().out
+    assert finished == [Role.BA, Role.SENIOR_DEV, Role.QA]
+    assert out.index("ba done") < out.index("senior_dev done") < out.index("qa done") < out.index("Done in")
+
+
+def test_single_role_questions_stream_into_a_live_panel(monkeypatch, capsys):
+    shell = CLAIShell()
+    chunks = []
+
+    def fake_ask_stream(role, prompt, on_text, include_history=False):
+        for chunk in ("Looks ", "good"):
+            chunks.append(chunk)
+            on_text(chunk)
+        return AgentResponse(content="Looks good", model="m", provider="p", usage={"total_tokens": 3})
+
+    monkeypatch.setattr(shell.orchestrator, "ask_stream", fake_ask_stream)
+    shell.process_input("@reviewer ship it?")
+
+    assert chunks == ["Looks ", "good"]
+    assert shell.last_response.content == "Looks good"
+    assert "Looks good" in capsys.readouterr().out
+
+
+def test_shell_starts_without_importing_core_or_markdown():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys;"
+        "from shell import CLAIShell;"
+        "CLAIShell();"
+        "print(sorted(m for m in ('core', 'core.orchestrator', 'rich.markdown', 'rich.syntax') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_buffered_history_writes_in_batches_in_file_history_format(tmp_path):
+    from prompt_toolkit.history import FileHistory
+
+    from shell.history import BufferedFileHistory
+
+    path = tmp_path / "history"
+    history = BufferedFileHistory(str(path), flush_every=2)
+
+    history.append_string("@qa first")
+    assert not path.exists()
+    history.append_string("line one\nline two")
+    history.append_string("@dev third")
+    history.flush()
+
+    assert list(FileHistory(str(path)).load_history_strings()) == [
+        "@dev third", "line one\nline two", "@qa first",
+    ]
+
+
+def test_mention_aliases_are_read_only():
+    import pytest
+
+    from shell.constants import MENTION_ALIASES
+
+    with pytest.raises(TypeError):
+        MENTION_ALIASES["@new"] = Role.QA
+    assert MENTION_ALIASES["@dev2"] is Role.CODER_2
+
+
+def test_directory_context_skips_pruned_dirs_and_large_files(tmp_path):
+    from shell.main import _CONTEXT_MAX_FILE_BYTES
+
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("print('hi')\n")
+    (tmp_path / "notes.md").write_text("# notes\n")
+    (tmp_path / "image.png").write_bytes(b"\x89PNG")
+    (tmp_path / "big.txt").write_text("x" * (_CONTEXT_MAX_FILE_BYTES + 1))
+    for skipped in ("node_modules", ".git", "__pycache__"):
+        (tmp_path / skipped).mkdir()
+        (tmp_path / skipped / "junk.js").write_text("junk")
+
+    context = CLAIShell()._load_file_context(str(tmp_path))
+
+    assert context.startswith(f"\n\n---\nDirectory: {tmp_path}\n")
+    assert f"### {os.path.join('src', 'app.py')}\n```\nprint('hi')\n\n```" in context
+    assert "### notes.md" in context
+    assert "junk" not in context and "image.png" not in context and "big.txt" not in context
+
+
+def test_file_context_is_reread_only_when_mtime_or_size_changes(monkeypatch, tmp_path):
+    import core.filesystem
+
+    reads = []
+    real_read = core.filesystem.read_text_files
+    monkeypatch.setattr(core.filesystem, "read_text_files", lambda paths: reads.extend(paths) or real_read(paths))
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "b.py").write_text("b = 1\n")
+    shell = CLAIShell()
+
+    first = shell._load_file_context(str(tmp_path))
+    assert shell._load_file_context(str(tmp_path)) == first
+    assert shell._load_file_context(str(tmp_path / "a.py")).endswith("```\na = 1\n\n```\n")
+    assert len(reads) == 2
+
+    (tmp_path / "b.py").write_text("b = 22\n")
+    assert "b = 22" in shell._load_file_context(str(tmp_path))
+    assert reads[2:] == [str(tmp_path / "b.py")]
+
+
+def test_saving_replies_recreates_a_deleted_directory(tmp_path):
+    shell = CLAIShell()
+
+    shell._save_to_file("```python\nx = 1\n```", str(tmp_path / "out" / "a.py"))
+    (tmp_path / "out" / "a.py").unlink()
+    (tmp_path / "out").rmdir()
+    shell._save_to_file("notes", str(tmp_path / "out" / "b.md"))
+
+    assert (tmp_path / "out" / "b.md").read_text() == "notes"
+
+
+def test_history_file_is_cut_back_to_the_newest_entries(tmp_path):
+    from prompt_toolkit.history import FileHistory
+
+    from shell.history import BufferedFileHistory
+
+    path = tmp_path / "history"
+    writer = FileHistory(str(path))
+    for i in range(12):
+        writer.store_string(f"cmd {i}\nsecond line" if i == 9 else f"cmd {i}")
+
+    small = BufferedFileHistory(str(path), max_entries=100, keep_entries=4)
+    assert len(list(small.load_history_strings())) == 12
+
+    BufferedFileHistory(str(path), max_entries=10, keep_entries=4)
+    history = list(FileHistory(str(path)).load_history_strings())
+    assert history == ["cmd 11", "cmd 10", "cmd 9\nsecond line", "cmd 8"]
+
+
+def test_plain_replies_skip_the_markdown_renderer():
+    from rich.markdown import Markdown
+    from rich.text import Text
+
+    from shell.main import _markdown
+
+    assert isinstance(_markdown("Looks good to me, ship it."), Text)
+    for formatted in ("Use `x`", "**bold**", "# Title", "- item", "1. step", "| a | b |", "[docs](https://x)", "```py\nx\n```"):
+        assert isinstance(_markdown(f"Intro line\n{formatted}"), Markdown), formatted
+
+
+def test_listing_tables_are_built_once_per_settings(monkeypatch):
+    from agents.factory import AgentFactory
+    from config import clear_settings_cache
+
+    shell = CLAIShell()
+    lookups = []
+    real = AgentFactory.get_role_runtime_config
+    monkeypatch.setattr(AgentFactory, "get_role_runtime_config", staticmethod(lambda role: lookups.append(role) or real(role)))
+
+    shell.print_team()
+    shell.print_team()
+    assert len(lookups) == len(Role)
+    workflows = shell.print_workflows() or shell._workflows_table
+    shell.print_workflows()
+    assert shell._workflows_table is workflows
+
+    clear_settings_cache()
+    shell.print_team()
+    assert len(lookups) == 2 * len(Role)
+
+
+def test_every_command_word_has_a_handler():
+    from shell.constants import COMMANDS
+
+    assert sorted(CLAIShell()._commands) == sorted(COMMANDS)
+
+
+def test_config_reload_picks_up_new_settings(monkeypatch):
+    from config import get_settings
+
+    shell = CLAIShell()
+    orchestrator = shell.orchestrator
+    before = get_settings()
+
+    shell.process_input("config")
+    assert get_settings() is before and shell.orchestrator is orchestrator
+
+    closed = []
+    monkeypatch.setattr(orchestrator, "close", lambda: closed.append(True))
+    from agents.cache import get_response_cache
+    from core.filesystem import get_filesystem
+
+    response_cache, filesystem = get_response_cache(), get_filesystem()
+    shell.process_input("config reload")
+    assert get_settings() is not before
+    assert closed == [True]
+    assert shell.orchestrator is not orchestrator
+    assert get_response_cache() is not response_cache
+    assert get_filesystem() is not filesystem
+
+
+def test_run_reuses_one_prompt_session(monkeypatch):
+    import sys
+
+    sessions = []
+
+    class FakeSession:
+        def __init__(self, **kwargs):
+            sessions.append(kwargs)
+            self.inputs = iter(["help", "team", "exit"])
+
+        def prompt(self, message):
+            return next(self.inputs)
+
+    monkeypatch.setattr(sys.modules["shell.main"], "PromptSession", FakeSession)
+    shell = CLAIShell()
+    shell.run()
+
+    assert not shell.running
+    assert len(sessions) == 1
+    assert sessions[0]["history"] is shell.history and sessions[0]["completer"] is shell.completer
+
+
+def test_redirects_split_at_the_last_angle_bracket(monkeypatch, tmp_path):
+    shell, asked = _shell(monkeypatch)
+    code = tmp_path / "cmp.py"
+    code.write_text("def less(a, b):\n    return a < b\n")
+    out = tmp_path / "answer.md"
+
+    shell.process_input(f"@qa is a < b the same as b > a here? < {code} > {out}")
+
+    role, prompt = asked[0]
+    assert role is Role.QA
+    assert prompt.startswith("is a < b the same as b > a here?\n\n---\nFile: cmp.py\n")
+    assert out.read_text() == "answer 1"
@@ -0,0 +1,544 @@
+import asyncio
+
+from agents.base import AgentResponse
+from agents.factory import Role
+from config import get_settings
+from core import Orchestrator, WorkflowStatus, WorkflowStep
+
+
+def _response(content: str) -> AgentResponse:
+    return AgentResponse(content=content, model="test-model", provider="dummy", finish_reason="stop")
+
+
+def test_topo_levels_group_independent_steps():
+    steps = [
+        WorkflowStep(Role.BA, "a"),
+        WorkflowStep(Role.QA, "b"),
+        WorkflowStep(Role.SENIOR_DEV, "c", depends_on=["step_0_ba", "step_1_qa"]),
+        WorkflowStep(Role.CODER, "d", depends_on=["step_0_ba"]),
+        # Forward references are ignored, exactly like the sequential runner.
+        WorkflowStep(Role.REVIEWER, "e", depends_on=["step_5_qa"]),
+    ]
+
+    assert Orchestrator._topo_levels(steps) == [[0, 1, 4], [2, 3]]
+
+
+def test_run_workflow_async_runs_levels_concurrently_and_keeps_order():
+    orch = Orchestrator()
+    orch.register_workflow("fanout", [
+        WorkflowStep(Role.BA, "Plan {topic}"),
+        WorkflowStep(Role.QA, "Test", depends_on=["step_0_ba"]),
+        WorkflowStep(Role.REVIEWER, "Review", depends_on=["step_0_ba"]),
+        WorkflowStep(Role.SENIOR_DEV, "Merge", depends_on=["step_1_qa", "step_2_reviewer"]),
+    ])
+
+    in_flight = 0
+    peak = 0
+    prompts = {}
+
+    async def fake_ask_async(role, prompt, include_history=False):
+        nonlocal in_flight, peak
+        prompts[role] = prompt
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Finish the later-declared step first to prove outputs are re-ordered.
+        await asyncio.sleep(0.01 if role is Role.QA else 0)
+        in_flight -= 1
+        return _response(f"{role.value} output")
+
+    orch.ask_async = fake_ask_async
+    result = asyncio.run(orch.run_workflow_async("fanout", {"topic": "billing"}))
+
+    assert result.status == WorkflowStatus.COMPLETED
+    assert peak == 2
+    assert list(result.outputs) == ["step_0_ba", "step_1_qa", "step_2_reviewer", "step_3_senior_dev"]
+    assert prompts[Role.BA] == "Plan billing"
+    assert "qa output" in prompts[Role.SENIOR_DEV]
+    assert result.final_output == "senior_dev output"
+
+
+def test_run_workflow_async_starts_steps_when_their_own_deps_finish():
+    orch = Orchestrator()
+    orch.register_workflow("branches", [
+        WorkflowStep(Role.BA, "Slow spec"),
+        WorkflowStep(Role.QA, "Fast spec"),
+        WorkflowStep(Role.CODER, "Build", depends_on=["step_1_qa"]),
+    ])
+
+    events = []
+
+    async def fake_ask_async(role, prompt, include_history=False):
+        events.append(f"start {role.value}")
+        await asyncio.sleep(0.05 if role is Role.BA else 0)
+        events.append(f"end {role.value}")
+        return _response(f"{role.value} output")
+
+    orch.ask_async = fake_ask_async
+    finished = []
+    result = asyncio.run(
+        orch.run_workflow_async("branches", {}, on_step_done=lambda name, _: finished.append(name))
+    )
+
+    assert result.status == WorkflowStatus.COMPLETED
+    # The coder only waited for QA, not for the slow BA step in the same level.
+    assert events.index("start coder") < events.index("end ba")
+    assert finished == ["step_1_qa", "step_2_coder", "step_0_ba"]
+    assert list(result.outputs) == ["step_0_ba", "step_1_qa", "step_2_coder"]
+
+
+def test_run_workflow_async_runs_same_role_steps_one_at_a_time():
+    orch = Orchestrator()
+    orch.register_workflow("double", [
+        WorkflowStep(Role.QA, "Unit tests"),
+        WorkflowStep(Role.QA, "Edge cases"),
+        WorkflowStep(Role.BA, "Stories"),
+    ])
+    in_flight = {}
+    peak = {}
+
+    async def fake_ask_async(role, prompt, include_history=False):
+        in_flight[role] = in_flight.get(role, 0) + 1
+        peak[role] = max(peak.get(role, 0), in_flight[role])
+        await asyncio.sleep(0.01)
+        in_flight[role] -= 1
+        return _response(prompt)
+
+    orch.ask_async = fake_ask_async
+    result = asyncio.run(orch.run_workflow_async("double", {}, use_cache=False))
+
+    assert result.status is WorkflowStatus.COMPLETED
+    assert peak == {Role.QA: 1, Role.BA: 1}
+
+
+def test_run_workflow_async_reports_a_failed_step_once():
+    orch = Orchestrator()
+    orch.register_workflow("broken", [
+        WorkflowStep(Role.BA, "Spec"),
+        WorkflowStep(Role.QA, "Test", depends_on=["step_0_ba"]),
+    ])
+
+    async def failing_ask_async(role, prompt, include_history=False):
+        raise RuntimeError("boom")
+
+    orch.ask_async = failing_ask_async
+    result = asyncio.run(orch.run_workflow_async("broken", {}))
+
+    assert result.status == WorkflowStatus.FAILED
+    assert result.errors == ["Step step_0_ba failed: boom"]
+    assert result.steps_completed == 0
+
+
+def test_consult_team_asks_roles_concurrently_in_order():
+    import threading
+
+    orch = Orchestrator()
+    roles = [Role.QA, Role.BA, Role.REVIEWER]
+    barrier = threading.Barrier(len(roles), timeout=5)
+
+    def fake_ask(role, prompt, include_history=False):
+        # Deadlocks (and times out) unless every role is in flight at once.
+        barrier.wait()
+        return _response(f"{role.value}: {prompt}")
+
+    orch.ask = fake_ask
+    results = orch.consult_team("ship?", roles=roles)
+
+    assert list(results) == roles
+    assert results[Role.BA].content == "ba: ship?"
+
+
+def test_run_workflow_runs_independent_steps_concurrently():
+    import threading
+
+    orch = Orchestrator()
+    orch.register_workflow("fanout", [
+        WorkflowStep(Role.BA, "Plan {topic}"),
+        WorkflowStep(Role.QA, "Test", depends_on=["step_0_ba"]),
+        WorkflowStep(Role.REVIEWER, "Review", depends_on=["step_0_ba"]),
+        WorkflowStep(Role.SENIOR_DEV, "Merge", depends_on=["step_1_qa", "step_2_reviewer"]),
+    ])
+    siblings = threading.Barrier(2, timeout=5)
+    prompts = {}
+
+    def fake_ask(role, prompt, include_history=False):
+        prompts[role] = prompt
+        if role in (Role.QA, Role.REVIEWER):
+            siblings.wait()
+        return _response(f"{role.value} output")
+
+    orch.ask = fake_ask
+    result = orch.run_workflow("fanout", {"topic": "billing"})
+
+    assert result.status == WorkflowStatus.COMPLETED
+    assert list(result.outputs) == ["step_0_ba", "step_1_qa", "step_2_reviewer", "step_3_senior_dev"]
+    assert prompts[Role.BA] == "Plan billing"
+    assert "reviewer output" in prompts[Role.SENIOR_DEV]
+
+
+def test_run_workflow_stops_after_a_failed_level():
+    orch = Orchestrator()
+    orch.register_workflow("broken", [
+        WorkflowStep(Role.BA, "Plan"),
+        WorkflowStep(Role.QA, "Test"),
+        WorkflowStep(Role.REVIEWER, "Review", depends_on=["step_0_ba"]),
+    ])
+    asked = []
+
+    def fake_ask(role, prompt, include_history=False):
+        asked.append(role)
+        if role is Role.QA:
+            raise RuntimeError("boom")
+        return _response(f"{role.value} output")
+
+    orch.ask = fake_ask
+    result = orch.run_workflow("broken", {})
+
+    assert result.status == WorkflowStatus.FAILED
+    assert result.errors == ["Step step_1_qa failed: boom"]
+    assert list(result.outputs) == ["step_0_ba"] and result.steps_completed == 1
+    assert Role.REVIEWER not in asked
+
+
+def test_cache_stats_reports_the_shared_response_cache():
+    from agents.cache import get_response_cache
+
+    get_response_cache().clear()
+    assert Orchestrator().cache_stats() == {"entries": 0, "hits": 0, "misses": 0, "tokens_saved": 0}
+
+
+def test_step_prompt_interpolates_context_in_one_pass():
+    orch = Orchestrator()
+    step = WorkflowStep(Role.BA, "Plan {topic} for {team} using {unknown}")
+
+    prompt = orch._build_step_prompt(step, {"topic": "{team}", "team": "core"}, {})
+
+    # Substituted values are not re-scanned for placeholders.
+    assert prompt == "Plan {team} for core using {unknown}"
+
+
+def test_step_prompt_appends_dependency_outputs_in_declared_order():
+    orch = Orchestrator()
+    step = WorkflowStep(Role.SENIOR_DEV, "Merge", depends_on=["step_1_qa", "step_0_ba", "step_9_qa"])
+    outputs = {"step_0_ba": _response("plan"), "step_1_qa": _response("tests")}
+
+    prompt = orch._build_step_prompt(step, {}, outputs)
+
+    assert prompt.startswith("Merge\n\n---\nPrevious outputs:\n\n[step_1_qa]:\ntests\n\n[step_0_ba]:\nplan\n")
+    assert "step_9_qa" not in prompt
+    assert prompt.endswith("- Keep response actionable and concise.\n")
+
+
+def test_run_workflow_reuses_identical_completed_runs(monkeypatch):
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", True)
+    orch = Orchestrator()
+    orch.register_workflow("plan", [WorkflowStep(Role.BA, "Plan {topic}")])
+    asked = []
+
+    def fake_ask(role, prompt, include_history=False):
+        asked.append(prompt)
+        return _response(f"plan #{len(asked)}")
+
+    orch.ask = fake_ask
+    first = orch.run_workflow("plan", {"topic": "billing"})
+    again = orch.run_workflow("plan", {"topic": "billing"})
+
+    assert asked == ["Plan billing"]
+    assert again.final_output == first.final_output == "plan #1"
+    assert again.duration == 0.0
+    again.outputs["step_0_ba"].content = "edited"
+    assert orch.run_workflow("plan", {"topic": "billing"}).final_output == "plan #1"
+
+    orch.run_workflow("plan", {"topic": "search"})
+    orch.run_workflow("plan", {"topic": "billing"}, use_cache=False)
+    assert len(asked) == 3
+
+    orch.clear_workflow_cache()
+    orch.run_workflow("plan", {"topic": "billing"})
+    assert len(asked) == 4
+
+
+def test_orchestrator_without_cache_skips_workflow_and_response_caches(monkeypatch):
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", True)
+    orch = Orchestrator(use_cache=False)
+    orch.register_workflow("plan", [WorkflowStep(Role.BA, "Plan {topic}")])
+    asked = []
+
+    def fake_ask(role, prompt, include_history=False):
+        asked.append(prompt)
+        return _response(f"plan #{len(asked)}")
+
+    orch.ask = fake_ask
+    orch.run_workflow("plan", {"topic": "billing"})
+    orch.run_workflow("plan", {"topic": "billing"})
+
+    assert len(asked) == 2
+    assert orch._get_agent(Role.BA).use_response_cache is False
+    assert get_settings().response_cache_enabled is True
+
+
+def test_run_workflow_async_shares_the_workflow_cache(monkeypatch):
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", True)
+    orch = Orchestrator()
+    orch.register_workflow("plan", [WorkflowStep(Role.BA, "Plan {topic}")])
+    asked = []
+
+    async def fake_ask_async(role, prompt, include_history=False):
+        asked.append(prompt)
+        return _response(f"plan #{len(asked)}")
+
+    orch.ask_async = fake_ask_async
+    orch.ask = lambda role, prompt, include_history=False: asyncio.run(fake_ask_async(role, prompt))
+    first = asyncio.run(orch.run_workflow_async("plan", {"topic": "billing"}))
+    replayed = []
+    again = asyncio.run(
+        orch.run_workflow_async("plan", {"topic": "billing"}, on_step_done=lambda name, r: replayed.append(name))
+    )
+
+    assert asked == ["Plan billing"]
+    assert again.final_output == first.final_output == "plan #1"
+    assert replayed == ["step_0_ba"]
+    assert orch.run_workflow("plan", {"topic": "billing"}).final_output == "plan #1"
+    assert len(asked) == 1
+
+
+def test_final_output_is_the_last_step_output():
+    from core import WorkflowResult
+
+    assert WorkflowResult(WorkflowStatus.COMPLETED, 0).final_output is None
+    single = WorkflowResult(WorkflowStatus.COMPLETED, 1, outputs={"step_0_ba": _response("only")})
+    assert single.final_output == "only"
+    many = WorkflowResult(
+        WorkflowStatus.COMPLETED, 2,
+        outputs={"step_0_ba": _response("first"), "step_1_qa": _response("last")},
+    )
+    assert many.final_output == "last"
+
+
+def test_register_workflow_names_steps_and_rejects_unknown_deps():
+    import pytest
+
+    orch = Orchestrator()
+    shared = WorkflowStep(Role.QA, "Test", depends_on=["step_0_ba"])
+    orch.register_workflow("ok", [WorkflowStep(Role.BA, "Spec"), shared])
+
+    assert [step.name for step in orch._workflows["ok"]] == ["step_0_ba", "step_1_qa"]
+    first, second = orch._workflows["ok"]
+    assert second.depends_on[0] is first.name
+    assert shared.name == ""
+
+    with pytest.raises(ValueError, match="step_0_qa"):
+        orch.register_workflow("typo", [WorkflowStep(Role.BA, "Spec"), WorkflowStep(Role.QA, "T", depends_on=["step_0_qa"])])
+    with pytest.raises(ValueError, match="step_1_qa"):
+        orch.register_workflow("forward", [WorkflowStep(Role.BA, "Spec", depends_on=["step_1_qa"]), WorkflowStep(Role.QA, "T")])
+    assert "typo" not in orch._workflows
+
+
+def test_prewarm_builds_each_workflow_role_once():
+    orch = Orchestrator()
+    built = []
+
+    class _Agent:
+        _client = object()
+
+    def fake_get_agent(role):
+        built.append(role)
+        orch._agents[role] = _Agent()
+        return orch._agents[role]
+
+    orch._get_agent = fake_get_agent
+    orch.prewarm("bugfix")
+    orch.prewarm("bugfix")
+
+    assert sorted(built, key=lambda r: r.value) == [Role.CODER, Role.QA, Role.SENIOR_DEV]
+
+
+def test_run_workflow_async_prewarms_async_clients():
+    orch = Orchestrator()
+    orch.register_workflow("plan", [WorkflowStep(Role.BA, "Plan {topic}")])
+    warmed = []
+
+    class _Agent:
+        _client = object()
+        _async_client = None
+
+        def _initialize_async_client(self):
+            warmed.append(True)
+            self._async_client = object()
+
+    orch._agents[Role.BA] = _Agent()
+
+    async def fake_ask_async(role, prompt, include_history=False):
+        return _response("plan")
+
+    orch.ask_async = fake_ask_async
+    asyncio.run(orch.run_workflow_async("plan", {"topic": "billing"}, use_cache=False))
+    asyncio.run(orch.run_workflow_async("plan", {"topic": "billing"}, use_cache=False))
+
+    assert warmed == [True]
+
+
+def test_run_workflow_returns_on_first_failure_without_waiting_for_siblings(monkeypatch):
+    import threading
+    import time
+
+    import core.orchestrator as orchestrator_module
+
+    monkeypatch.setattr(orchestrator_module, "_CANCEL_DRAIN_SECONDS", 0.01)
+    orch = Orchestrator()
+    orch.register_workflow("slow_sibling", [
+        WorkflowStep(Role.BA, "Slow spec"),
+        WorkflowStep(Role.QA, "Broken test plan"),
+        WorkflowStep(Role.BA, "Second spec"),
+    ])
+    release = threading.Event()
+    asked = []
+
+    def fake_ask(role, prompt, include_history=False):
+        asked.append(prompt)
+        if role is Role.QA:
+            raise RuntimeError("boom")
+        release.wait(timeout=5)
+        return _response("spec")
+
+    orch.ask = fake_ask
+    started = time.perf_counter()
+    result = orch.run_workflow("slow_sibling", {})
+    elapsed = time.perf_counter() - started
+    release.set()
+
+    assert elapsed < 2
+    assert result.errors == ["Step step_1_qa failed: boom"]
+    assert result.outputs == {}
+    assert "Second spec" not in asked
+
+
+def test_verbose_progress_is_printed_only_by_verbose_orchestrators(capsys):
+    from core.orchestrator import progress_logger
+
+    level, propagate = progress_logger.level, progress_logger.propagate
+    verbose = Orchestrator(verbose=True)
+    quiet = Orchestrator(verbose=False)
+    for orch in (verbose, quiet):
+        orch.register_workflow("plan", [WorkflowStep(Role.BA, "Plan")])
+        orch.ask = lambda role, prompt, include_history=False: _response("plan")
+
+    verbose.run_workflow("plan", {}, use_cache=False)
+    out = capsys.readouterr().out
+    assert "Starting workflow: plan (1 steps)" in out
+    assert "  Step 1/1: ba" in out
+
+    quiet.run_workflow("plan", {}, use_cache=False)
+    assert capsys.readouterr().out == ""
+    assert (progress_logger.level, progress_logger.propagate, progress_logger.handlers) == (level, propagate, [])
+
+
+def test_broadcast_async_yields_roles_as_they_finish():
+    orch = Orchestrator()
+    delays = {Role.BA: 0.05, Role.QA: 0.0, Role.REVIEWER: 0.02}
+
+    async def fake_ask_async(role, prompt, include_history=False):
+        await asyncio.sleep(delays[role])
+        if role is Role.REVIEWER:
+            raise RuntimeError("rate limited")
+        return _response(f"{role.value}: {prompt}")
+
+    orch.ask_async = fake_ask_async
+
+    async def collect():
+        return [item async for item in orch.broadcast_async("ship?", roles=list(delays))]
+
+    results = asyncio.run(collect())
+
+    assert [role for role, _ in results] == [Role.QA, Role.REVIEWER, Role.BA]
+    assert results[0][1].content == "qa: ship?"
+    assert isinstance(results[1][1], RuntimeError)
+
+
+def test_broadcast_combines_roles_that_share_a_model(monkeypatch):
+    from agents import AgentFactory
+
+    orch = Orchestrator()
+    requests = []
+
+    class CombinedAgent:
+        async def achat(self, prompt, include_history=True):
+            requests.append(prompt)
+            return AgentResponse(
+                content='```json\n{"ba": "scope it", "qa": "test it"}\n```',
+                model="m", provider="p", usage={"total_tokens": 9},
+            )
+
+    runtime = {Role.BA: ("anthropic", "m"), Role.QA: ("anthropic", "m"), Role.REVIEWER: ("openai", "x")}
+    monkeypatch.setattr(AgentFactory, "get_role_runtime_config", staticmethod(runtime.__getitem__))
+    monkeypatch.setattr(AgentFactory, "provider_groups", staticmethod(
+        lambda: {("anthropic", "m"): (Role.SENIOR_DEV, Role.BA, Role.QA), ("openai", "x"): (Role.REVIEWER,)}
+    ))
+    monkeypatch.setattr(AgentFactory, "create_by_provider", staticmethod(lambda **kwargs: CombinedAgent()))
+
+    async def fake_ask_async(role, prompt, include_history=False):
+        requests.append((role, prompt))
+        return _response(f"{role.value}: {prompt}")
+
+    orch.ask_async = fake_ask_async
+
+    async def collect(roles):
+        return dict([item async for item in orch.broadcast_async("ship?", roles=roles, combine_same_model=True)])
+
+    results = asyncio.run(collect(list(runtime)))
+
+    assert requests == ["ship?", (Role.REVIEWER, "ship?")] or requests == [(Role.REVIEWER, "ship?"), "ship?"]
+    assert results[Role.BA].content == "scope it"
+    assert results[Role.QA].content == "test it"
+    assert results[Role.BA].usage == {"total_tokens": 9} and results[Role.QA].usage == {}
+    assert results[Role.REVIEWER].content == "reviewer: ship?"
+
+    # A reply that is not the expected JSON falls back to one request per role.
+    CombinedAgent.achat = lambda self, prompt, include_history=True: asyncio.sleep(0, _response("not json"))
+    requests.clear()
+    results = asyncio.run(collect([Role.BA, Role.QA]))
+
+    assert sorted(r[0].value for r in requests) == ["ba", "qa"]
+    assert results[Role.QA].content == "qa: ship?"
+
+
+def test_close_disconnects_github_and_stops_the_pool():
+    orch = Orchestrator()
+    disconnected = []
+
+    class FakeMCP:
+        def disconnect_sync(self):
+            disconnected.append(True)
+
+    orch._github_client = FakeMCP()
+    orch._github_registries["ba"] = object()
+    orch._pool.submit(lambda: None).result()
+
+    orch.close()
+
+    assert disconnected == [True]
+    assert orch._github_client is None and not orch._github_registries
+    assert orch._pool._shutdown
+
+
+def test_consult_team_batch_runs_on_the_callers_loop(monkeypatch):
+    from agents.batch import BatchProcessor
+
+    orch = Orchestrator()
+    orch._get_agent = lambda role: role
+    loops = []
+
+    async def fake_run_requests(self, requests):
+        loops.append(asyncio.get_running_loop())
+        return [_response(f"{role.value}: {prompt}") for role, prompt in requests]
+
+    monkeypatch.setattr(BatchProcessor, "run_requests", fake_run_requests)
+
+    async def main():
+        results = await orch.consult_team_batch("ship?", roles=[Role.QA, Role.BA, Role.QA])
+        return asyncio.get_running_loop(), results
+
+    loop, results = asyncio.run(main())
+
+    assert loops == [loop]
+    assert list(results) == [Role.QA, Role.BA]
+    assert results[Role.BA].content == "ba: ship?"
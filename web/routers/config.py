@@ -126,17 +126,10 @@ def _validate_role_config(role_key: str, cfg: RoleConfig) -> None:
 
 def _onboarding_warnings(roles: dict[str, RoleConfig], tools: ToolConfig) -> list[str]:
     settings = get_settings()
-    key_status = {
-        "anthropic": settings.anthropic_api_key,
-        "openai": settings.openai_api_key,
-        "google": settings.google_api_key,
-        "kimi": settings.kimi_api_key,
-        "openrouter": settings.openrouter_api_key,
-    }
+    configured = settings.configured_providers
     warnings: list[str] = []
     for provider in sorted({cfg.provider for cfg in roles.values()}):
-        key = key_status.get(provider)
-        if key is None or not key.get_secret_value():
+        if not configured.get(provider):
             warnings.append(f"{provider} is selected but its API key is not configured.")
     if tools.github_mcp and not settings.github_token:
         warnings.append("GitHub MCP is enabled but GITHUB_TOKEN is not configured.")